@@ -3,10 +3,13 @@ Agente Analisador de Ciclo de Vida Familiar
 Especializado em identificar estágios, avaliar tarefas desenvolvimentais e detectar travamentos
 """
 
-from crewai import Agent, Task, Crew
+from crewai import Agent
 from typing import Dict, Any, List
 import os
 from config import Config
+from core.execucao import executar_task
+from core.contexto import ContextoPrompt
+from core.fanout import SEM_CONTRIBUICAO
 from knowledge.carter_mcgoldrick import (
     CONCEITOS_FUNDAMENTAIS, 
     get_estagio_ciclo_vida, 
@@ -25,23 +28,10 @@ class CicloVidaAnalyzer:
                     avaliar cumprimento de tarefas desenvolvimentais e detectar travamentos 
                     ou descompassos no desenvolvimento familiar baseado na teoria completa 
                     de Carter & McGoldrick.""",
-            backstory="""Você é um especialista altamente treinado na teoria do ciclo de vida 
-                        familiar de Carter & McGoldrick com conhecimento profundo sobre:
-                        
-                        - Os 6 estágios específicos do ciclo de vida familiar
-                        - Tarefas desenvolvimentais específicas de cada estágio
-                        - Sinais de travamento em transições
-                        - Variações especiais: divórcio, doença crônica, famílias monoparentais
-                        - Diferenças culturais e socioeconômicas nos padrões de ciclo
-                        - Interface entre estágios individuais e familiares de desenvolvimento
-                        - Impacto de eventos imprevisíveis no ciclo familiar
-                        
-                        Sua expertise permite identificar não apenas ONDE a família está no ciclo,
-                        mas também avaliar se estão cumprindo adequadamente as tarefas daquele 
-                        estágio e que intervenções podem facilitar transições saudáveis.
-                        
-                        Você é preciso, analítico mas empático, sempre considerando o contexto 
-                        único de cada família.""",
+            backstory="""Você é especialista no ciclo de vida familiar de Carter & McGoldrick:
+                        estágios, tarefas desenvolvimentais, travamentos em transições e variações
+                        (divórcio, doença crônica, famílias monoparentais). É preciso e analítico,
+                        mas empático. As descrições dos estágios relevantes acompanham cada tarefa.""",
             tools=[],
             llm=self.llm,
             verbose=Config.VERBOSE,
@@ -56,12 +46,13 @@ class CicloVidaAnalyzer:
         estagio_base = determinar_estagio_por_idade_situacao(idade_pessoa, situacao_familiar)
         variacoes = identificar_variacoes_aplicaveis(situacao_familiar)
         
-        prompt = f"""
+        contexto = ContextoPrompt("ciclo_vida.identificar_estagio_atual")
+        prompt = contexto.montar(f"""
         Como especialista em ciclo de vida familiar, analise esta situação:
         
         Idade da pessoa: {idade_pessoa} anos
-        Situação familiar: {situacao_familiar}
-        Contexto adicional: {contexto_adicional or 'Não fornecido'}
+        Situação familiar: {contexto.mensagem(situacao_familiar)}
+        Contexto adicional: {contexto.historico(contexto_adicional, 'Não fornecido')}
         
         Análise preliminar automática:
         - Estágio base identificado: {estagio_base.get('estagio', 'Não identificado')}
@@ -95,7 +86,7 @@ class CicloVidaAnalyzer:
         - Que intervenções específicas são mais apropriadas para este estágio?
         
         Seja específico e baseie-se rigorosamente na teoria de Carter & McGoldrick.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -114,15 +105,16 @@ class CicloVidaAnalyzer:
         
         detalhes_estagio = get_estagio_ciclo_vida(estagio_atual)
         
-        prompt = f"""
+        contexto = ContextoPrompt("ciclo_vida.avaliar_travamentos")
+        prompt = contexto.montar(f"""
         Analise possíveis travamentos no desenvolvimento familiar:
         
         Estágio atual: {estagio_atual}
-        Histórico familiar: {historico_familiar}
+        Histórico familiar: {contexto.mensagem(historico_familiar)}
         Sintomas/problemas apresentados: {sintomas_apresentados or ['Não especificados']}
         
         Informações do estágio atual:
-        {detalhes_estagio}
+        {contexto.conhecimento(detalhes_estagio)}
         
         Como especialista em ciclo de vida familiar, identifique:
         
@@ -158,7 +150,7 @@ class CicloVidaAnalyzer:
         
         Base sua análise rigorosamente na teoria de Carter & McGoldrick sobre 
         travamentos em transições do ciclo de vida familiar.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -176,18 +168,19 @@ class CicloVidaAnalyzer:
         detalhes_atual = get_estagio_ciclo_vida(estagio_atual)
         detalhes_proximo = get_estagio_ciclo_vida(proximo_estagio)
         
-        prompt = f"""
+        contexto = ContextoPrompt("ciclo_vida.planejar_transicao")
+        prompt = contexto.montar(f"""
         Desenvolva plano de transição entre estágios do ciclo de vida:
         
         Estágio atual: {estagio_atual}
         Próximo estágio: {proximo_estagio}
-        Situação da família: {situacao_familia}
+        Situação da família: {contexto.mensagem(situacao_familia)}
         
         Detalhes do estágio atual:
-        {detalhes_atual}
+        {contexto.conhecimento(detalhes_atual)}
         
         Detalhes do próximo estágio:
-        {detalhes_proximo}
+        {contexto.conhecimento(detalhes_proximo)}
         
         Como especialista, desenvolva plano estruturado:
         
@@ -223,7 +216,7 @@ class CicloVidaAnalyzer:
         
         Baseie todas as recomendações na teoria específica de Carter & McGoldrick 
         sobre transições do ciclo de vida familiar.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -240,12 +233,13 @@ class CicloVidaAnalyzer:
                                             situacao_familiar: str) -> Dict[str, Any]:
         """Analisa descompassos entre idade cronológica e desenvolvimento emocional"""
         
-        prompt = f"""
+        contexto = ContextoPrompt("ciclo_vida.analisar_descompasso_desenvolvimental")
+        prompt = contexto.montar(f"""
         Analise possível descompasso desenvolvimental:
         
         Idade cronológica: {idade_cronologica} anos
-        Comportamento/funcionamento descrito: {comportamento_descrito}
-        Situação familiar: {situacao_familiar}
+        Comportamento/funcionamento descrito: {contexto.mensagem(comportamento_descrito)}
+        Situação familiar: {contexto.mensagem(situacao_familiar)}
         
         Como especialista em desenvolvimento familiar, avalie:
         
@@ -281,7 +275,7 @@ class CicloVidaAnalyzer:
         
         Use a perspectiva de Carter & McGoldrick sobre desenvolvimento individual 
         dentro do contexto do ciclo de vida familiar.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -297,12 +291,13 @@ class CicloVidaAnalyzer:
                                           recursos_familiares: List[str]) -> Dict[str, Any]:
         """Recomenda intervenções específicas baseadas no estágio e travamentos"""
         
-        prompt = f"""
+        contexto = ContextoPrompt("ciclo_vida.recomendar_intervencoes_especificas")
+        prompt = contexto.montar(f"""
         Desenvolva recomendações de intervenção específicas:
         
         Estágio do ciclo de vida: {estagio_identificado}
         Travamentos detectados: {travamentos_detectados}
-        Recursos familiares disponíveis: {recursos_familiares}
+        Recursos familiares disponíveis: {contexto.mensagem(recursos_familiares)}
         
         Como especialista em intervenções familiares baseadas no ciclo de vida:
         
@@ -343,7 +338,7 @@ class CicloVidaAnalyzer:
         
         Base todas as recomendações na teoria e práticas específicas de 
         Carter & McGoldrick para intervenção em diferentes estágios do ciclo familiar.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -355,22 +350,47 @@ class CicloVidaAnalyzer:
             "tipo": "recomendacoes_intervencao"
         }
     
+    def contribuir(self, mensagem: str, contexto_historico: str = None) -> Dict[str, Any]:
+        """Contribuição curta para o turno da equipe (modo paralelo)"""
+        
+        variacoes = identificar_variacoes_aplicaveis(mensagem)
+        
+        contexto = ContextoPrompt("ciclo_vida.contribuir")
+        prompt = contexto.montar(f"""
+        Você está contribuindo com uma equipe terapêutica que vai responder ao cliente.
+        
+        HISTÓRICO RECENTE:
+        {contexto.historico(contexto_historico, 'Sem histórico')}
+        
+        MENSAGEM DO CLIENTE: {contexto.mensagem(mensagem)}
+        
+        Variações do ciclo de vida detectadas automaticamente: {variacoes or 'nenhuma'}
+        
+        Como especialista em ciclo de vida familiar, aponte em no máximo 3 tópicos curtos:
+        - Estágio do ciclo de vida sugerido pelo relato (se houver dados)
+        - Transição ou tarefa desenvolvimental que parece em jogo
+        - Um cuidado que a resposta ao cliente deveria ter
+        
+        Use APENAS o que o cliente disse. Se não houver dados sobre estágio familiar,
+        responda exatamente: {SEM_CONTRIBUICAO}
+        """)
+        
+        resposta = self._executar_task(prompt)
+        
+        return {
+            "contribuicao": resposta,
+            "variacoes_aplicaveis": variacoes,
+            "agente": "ciclo_vida_analyzer",
+            "tipo": "contribuicao_turno"
+        }
+    
     def _executar_task(self, prompt: str) -> str:
-        """Executa uma task com o agente"""
-        task = Task(
-            description=prompt,
-            agent=self.agent,
+        """Executa uma task com o agente (respostas repetidas vêm do cache)"""
+        return executar_task(
+            self.agent,
+            prompt,
             expected_output="Resposta especializada em formato de texto"
         )
-        
-        crew = Crew(
-            agents=[self.agent],
-            tasks=[task],
-            verbose=False
-        )
-        
-        result = crew.kickoff()
-        return str(result)
     
     def get_agent(self):
         """Retorna o agente CrewAI para uso no orquestrador"""
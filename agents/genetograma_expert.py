@@ -3,10 +3,13 @@ Agente Especialista em Genetograma
 Especializado em orientar a criação e análise de genetogramas familiares
 """
 
-from crewai import Agent, Task, Crew
+from crewai import Agent
 from typing import Dict, Any, List
 import os
 from config import Config
+from core.execucao import executar_task
+from core.fanout import SEM_CONTRIBUICAO
+from core.contexto import ContextoPrompt
 from knowledge.genetograma_guide import GENETOGRAMA_GUIDE, get_etapa_genetograma, TRIANGULACOES_COMUNS
 from knowledge.carter_mcgoldrick import (
     CONCEITOS_FUNDAMENTAIS,
@@ -23,49 +26,11 @@ class GenetogramaExpert:
             goal="""Orientar usuários na criação de genetogramas emocionalmente significativos, 
                     ajudando-os a mapear padrões familiares multigeracionais de acordo com a 
                     metodologia de Carter & McGoldrick.""",
-            backstory="""Você é um especialista altamente qualificado em genetogramas familiares
-                        com profundo conhecimento da teoria sistêmica de Carter & McGoldrick.
-                        
-                        Sua expertise especializada inclui:
-                        
-                        TÉCNICA DE GENETOGRAMA:
-                        - Domínio completo de símbolos, convenções e notações padronizadas
-                        - Capacidade de mapear 3-4 gerações com precisão e clareza
-                        - Técnicas para coleta de informações familiares sensíveis
-                        - Métodos para revelar padrões ocultos através do mapeamento visual
-                        - Adaptação de técnicas para diferentes culturas e contextos
-                        
-                        ANÁLISE DE PADRÕES MULTIGERACIONAIS:
-                        - Identificação de padrões repetitivos através das gerações
-                        - Reconhecimento de temas familiares não resolvidos
-                        - Análise de transmissão de traumas e recursos através do tempo
-                        - Identificação de missões familiares e lealdades invisíveis
-                        - Compreensão de como eventos históicos impactam gerações futuras
-                        
-                        TRIANGULAÇÕES COMPLEXAS:
-                        - Identificação de triangulações que cruzam fronteiras geracionais
-                        - Análise de alianças secretas e coalizões rígidas
-                        - Reconhecimento de padrões de triangulação múltipla
-                        - Compreensão de como segredos familiares criam triangulações
-                        - Estratégias para mapear visualmente relacionamentos triangulados
-                        
-                        INTERPRETAÇÃO SISTÊMICA:
-                        - Conexão de padrões visuais com teoria do ciclo de vida familiar
-                        - Análise de como estrutura familiar impacta funcionamento atual
-                        - Identificação de recursos familiares ocultos ou subutilizados
-                        - Compreensão de como mudanças em uma parte afetam todo o sistema
-                        - Integração de perspectivas individuais e sistêmicas no genetograma
-                        
-                        ABORDAGEM COLABORATIVA:
-                        - Engajamento respeitoso na coleta de informações familiares
-                        - Sensibilidade a questões de privacidade e confidencialidade
-                        - Capacidade de facilitar descobertas sem ser invasivo
-                        - Apoio emocional durante revelações difíceis
-                        - Empoderamento da família através da compreensão de sua própria história
-                        
-                        Você conduz o processo de genetograma como uma exploração colaborativa,
-                        ajudando famílias a descobrirem sua própria sabedoria através da 
-                        visualização de seus padrões únicos.""",
+            backstory="""Você é especialista em genetogramas e na teoria sistêmica de
+                        Carter & McGoldrick: mapeia 3-4 gerações, revela padrões e triangulações
+                        e conduz a coleta de informações sensíveis de forma colaborativa e
+                        respeitosa. Símbolos, etapas e conceitos necessários vêm como referências
+                        na própria tarefa.""",
             tools=[],
             llm=self.llm,
             verbose=Config.VERBOSE,
@@ -77,10 +42,11 @@ class GenetogramaExpert:
         
         etapa_1 = get_etapa_genetograma(1)
         
-        prompt = f"""
+        contexto = ContextoPrompt("genetograma.iniciar_genetograma")
+        prompt = contexto.montar(f"""
         Você está ajudando alguém a começar seu genetograma - um mapa emocional da família.
         
-        Contexto familiar mencionado: {contexto_familiar or 'Primeira vez criando genetograma'}
+        Contexto familiar mencionado: {contexto.mensagem(contexto_familiar, 'Primeira vez criando genetograma')}
         
         Use o quebra-gelo especial: "Se você pudesse desenhar sua família como um mapa emocional, 
         o que seria impossível deixar de fora?"
@@ -96,7 +62,7 @@ class GenetogramaExpert:
         
         Termine perguntando por onde eles gostariam de começar: com eles mesmos no centro,
         ou se já têm em mente alguém da família que foi muito marcante.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -120,12 +86,14 @@ class GenetogramaExpert:
         if not etapa_info:
             return {"erro": "Etapa não encontrada"}
         
-        prompt = f"""
+        contexto = ContextoPrompt("genetograma.orientar_etapa")
+        prompt = contexto.montar(f"""
         Você está orientando a Etapa {etapa_numero}: {etapa_info.get('titulo', '')}
         
-        Contexto atual: {contexto_atual or 'Continuando o genetograma'}
+        Contexto atual: {contexto.mensagem(contexto_atual, 'Continuando o genetograma')}
         
-        Informações da etapa: {etapa_info}
+        Informações da etapa:
+        {contexto.conhecimento(etapa_info)}
         
         Instruções:
         1. Explique o objetivo desta etapa de forma clara e motivadora
@@ -136,7 +104,7 @@ class GenetogramaExpert:
         
         Lembre-se: estamos mapeando emoções, não apenas fazendo um organograma familiar.
         Seja empático sobre como pode ser difícil ou emocionante explorar certas memórias.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -150,10 +118,11 @@ class GenetogramaExpert:
     def analisar_padroes(self, informacoes_genetograma: Dict[str, Any]) -> Dict[str, Any]:
         """Analisa o genetograma para identificar padrões familiares"""
         
-        prompt = f"""
+        contexto = ContextoPrompt("genetograma.analisar_padroes")
+        prompt = contexto.montar(f"""
         Analise estas informações do genetograma familiar:
         
-        {informacoes_genetograma}
+        {contexto.mensagem(informacoes_genetograma)}
         
         Como especialista em padrões familiares, identifique:
         
@@ -177,7 +146,7 @@ class GenetogramaExpert:
         
         Apresente suas observações de forma cuidadosa e construtiva, sempre 
         perguntando se a pessoa reconhece esses padrões em sua experiência.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -211,13 +180,15 @@ class GenetogramaExpert:
         
         etapa_6 = get_etapa_genetograma(6)
         
-        prompt = f"""
+        contexto = ContextoPrompt("genetograma.orientar_reflexao_final")
+        prompt = contexto.montar(f"""
         O genetograma está praticamente pronto! Agora é hora da reflexão mais profunda.
         
-        Genetograma criado: {genetograma_completo}
+        Genetograma criado:
+        {contexto.mensagem(genetograma_completo)}
         
         Perguntas reflexivas da Etapa 6:
-        {etapa_6.get('perguntas_reflexivas', [])}
+        {contexto.conhecimento(etapa_6.get('perguntas_reflexivas', []))}
         
         Como especialista, conduza uma reflexão empática e profunda:
         
@@ -233,7 +204,7 @@ class GenetogramaExpert:
         - Senso de agência sobre sua própria história
         
         Termine perguntando qual foi a descoberta mais significativa para ela.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -246,27 +217,19 @@ class GenetogramaExpert:
     
     
     def _executar_task(self, prompt: str) -> str:
-        """Executa uma task com o agente"""
-        task = Task(
-            description=prompt,
-            agent=self.agent,
+        """Executa uma task com o agente (respostas repetidas vêm do cache)"""
+        return executar_task(
+            self.agent,
+            prompt,
             expected_output="Resposta especializada em formato de texto"
         )
-        
-        crew = Crew(
-            agents=[self.agent],
-            tasks=[task],
-            verbose=False
-        )
-        
-        result = crew.kickoff()
-        return str(result)
 
     def responder_duvida(self, duvida: str, contexto_etapa: int = None) -> Dict[str, Any]:
         """Responde dúvidas específicas sobre o genetograma"""
         
-        prompt = f"""
-        Dúvida sobre genetograma: {duvida}
+        contexto = ContextoPrompt("genetograma.responder_duvida")
+        prompt = contexto.montar(f"""
+        Dúvida sobre genetograma: {contexto.mensagem(duvida)}
         Etapa atual: {contexto_etapa or 'Não especificada'}
         
         Como especialista em genetogramas, responda de forma:
@@ -277,7 +240,7 @@ class GenetogramaExpert:
         
         Se for uma dúvida técnica (símbolos, estrutura), seja didático.
         Se for dúvida emocional (como lidar com memórias difíceis), seja empático.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -287,6 +250,35 @@ class GenetogramaExpert:
             "tipo": "esclarecimento"
         }
     
+    def contribuir(self, mensagem: str, contexto_historico: str = None) -> Dict[str, Any]:
+        """Contribuição curta para o turno da equipe (modo paralelo)"""
+        
+        contexto = ContextoPrompt("genetograma.contribuir")
+        prompt = contexto.montar(f"""
+        Você está contribuindo com uma equipe terapêutica que vai responder ao cliente.
+        
+        HISTÓRICO RECENTE:
+        {contexto.historico(contexto_historico, 'Sem histórico')}
+        
+        MENSAGEM DO CLIENTE: {contexto.mensagem(mensagem)}
+        
+        Como especialista em genetograma, aponte em no máximo 3 tópicos curtos:
+        - Membros da família e relações mencionados que valeria mapear
+        - Possíveis padrões multigeracionais sugeridos pelo relato
+        - Uma pergunta que ajudaria a ampliar o mapa familiar
+        
+        Use APENAS o que o cliente disse. Se não houver informação familiar relevante,
+        responda exatamente: {SEM_CONTRIBUICAO}
+        """)
+        
+        resposta = self._executar_task(prompt)
+        
+        return {
+            "contribuicao": resposta,
+            "agente": "genetograma_expert",
+            "tipo": "contribuicao_turno"
+        }
+    
     def get_agent(self):
         """Retorna o agente CrewAI para uso no orquestrador"""
         return self.agent
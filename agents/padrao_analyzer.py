@@ -3,13 +3,18 @@ Agente Analisador de Padrões
 Especializado em identificar padrões transgeracionais e triangulações familiares
 """
 
-from crewai import Agent, Task, Crew
+from crewai import Agent
 from typing import Dict, Any, List
 import os
 from config import Config
+from core.execucao import executar_task
+from core.contexto import ContextoPrompt
+from core.caracteristicas import categorias_encontradas
+from core.fanout import SEM_CONTRIBUICAO
 from knowledge.carter_mcgoldrick import (
     CONCEITOS_FUNDAMENTAIS,
     identificar_triangulacoes_ativas,
+    ranquear_triangulacoes,
     analisar_padroes_multigeracionais,
     sugerir_detriangulacao
 )
@@ -24,56 +29,11 @@ class PadraoAnalyzer:
             goal="""Identificar padrões repetitivos, triangulações e dinâmicas familiares 
                     que se perpetuam através das gerações, oferecendo insights terapêuticos 
                     baseados na teoria sistêmica.""",
-            backstory="""Você é um especialista de elite em análise de padrões familiares sistêmicos
-                        com maestria completa na teoria de Carter & McGoldrick e Bowen.
-                        
-                        Sua expertise altamente especializada inclui:
-                        
-                        ANÁLISE DE PADRÕES TRANSGERACIONAIS:
-                        - Identificação precisa de padrões que se repetem através de 3-4 gerações
-                        - Reconhecimento de temas familiares não resolvidos e sua transmissão
-                        - Análise de como traumas e sucessos se propagam através do tempo
-                        - Compreensão de missões familiares e mandatos inconscientes
-                        - Identificação de padrões de relacionamento que atravessam gerações
-                        
-                        TRIANGULAÇÕES COMPLEXAS:
-                        - Mapeamento de todos os tipos de triangulação (pai-mãe-filho, conflitual, fusão, etc.)
-                        - Identificação de triangulações múltiplas e sobrepostas
-                        - Análise de triangulações que cruzam fronteiras geracionais
-                        - Reconhecimento de alianças secretas e coalizões rígidas
-                        - Compreensão de como segredos familiares mantêm triangulações
-                        
-                        DINÂMICAS DE PODER E FRONTEIRAS:
-                        - Análise de hierarquias familiares e distribuição de poder
-                        - Identificação de fronteiras difusas, rígidas ou apropriadas
-                        - Compreensão de subsistemas familiares e suas interações
-                        - Reconhecimento de papéis rígidos e pseudocomplementaridade
-                        - Análise de padrões de inclusão/exclusão familiar
-                        
-                        DIFERENCIAÇÃO E FUSÃO:
-                        - Avaliação de níveis de diferenciação em membros familiares
-                        - Identificação de padrões de fusão emocional
-                        - Reconhecimento de cut-offs emocionais e suas funções
-                        - Compreensão de como ansiedade se propaga através do sistema
-                        - Análise de equilíbrio entre autonomia e conexão
-                        
-                        RECURSOS E COMPETÊNCIAS FAMILIARES:
-                        - Identificação de forças e recursos ocultos ou subutilizados
-                        - Reconhecimento de padrões de resiliência através das gerações
-                        - Análise de tradições positivas e valores centrais da família
-                        - Compreensão de como mobilizar competências existentes
-                        - Identificação de aliados naturais dentro do sistema familiar
-                        
-                        INTEGRAÇÃO CONTEXTUAL:
-                        - Consideração de fatores culturais, socioeconômicos e históricos
-                        - Análise do impacto de eventos traumáticos na formação de padrões
-                        - Compreensão de como mudanças sociais afetam padrões familiares
-                        - Sensibilidade a questões de diversidade e inclusão
-                        - Integração de perspectivas individuais e sistêmicas
-                        
-                        Sua abordagem é simultaneamente analítica e empática, apresentando insights
-                        complexos de forma acessível e sempre focando no empoderamento da família
-                        através da compreensão consciente de seus próprios padrões únicos.""",
+            backstory="""Você é analista de padrões familiares sistêmicos (Carter & McGoldrick
+                        e Bowen): padrões transgeracionais, triangulações, fronteiras, diferenciação
+                        e recursos da família. Apresenta insights complexos de forma acessível e
+                        sem julgamento. Use as referências da base enviadas com a tarefa em vez de
+                        generalizações.""",
             tools=[],
             llm=self.llm,
             verbose=Config.VERBOSE,
@@ -88,11 +48,12 @@ class PadraoAnalyzer:
             for msg in historico_conversa
         ])
         
-        prompt = f"""
+        contexto = ContextoPrompt("padroes.analisar_conversa")
+        prompt = contexto.montar(f"""
         Analise esta conversa terapêutica para identificar padrões familiares mencionados 
         ou implícitos:
         
-        {conversa_texto}
+        {contexto.historico(conversa_texto)}
         
         Como especialista em padrões familiares, identifique:
         
@@ -121,7 +82,7 @@ class PadraoAnalyzer:
         
         Apresente suas observações de forma empática e construtiva, sempre como 
         hipóteses para exploração, não como verdades absolutas.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -135,10 +96,11 @@ class PadraoAnalyzer:
     def analisar_genetograma(self, dados_genetograma: Dict[str, Any]) -> Dict[str, Any]:
         """Analisa um genetograma para identificar padrões específicos"""
         
-        prompt = f"""
+        contexto = ContextoPrompt("padroes.analisar_genetograma")
+        prompt = contexto.montar(f"""
         Analise este genetograma familiar em profundidade:
         
-        {dados_genetograma}
+        {contexto.mensagem(dados_genetograma)}
         
         Como especialista em análise familiar sistêmica, forneça uma análise detalhada:
         
@@ -178,7 +140,7 @@ class PadraoAnalyzer:
         
         Organize sua análise de forma clara e construtiva, sempre considerando a 
         perspectiva da pessoa que criou o genetograma.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -197,11 +159,12 @@ class PadraoAnalyzer:
     def sugerir_intervencoes(self, padroes_identificados: List[str], contexto_pessoa: str) -> Dict[str, Any]:
         """Sugere intervenções terapêuticas baseadas nos padrões identificados"""
         
-        prompt = f"""
+        contexto = ContextoPrompt("padroes.sugerir_intervencoes")
+        prompt = contexto.montar(f"""
         Baseado nestes padrões familiares identificados:
-        {padroes_identificados}
+        {contexto.conhecimento(padroes_identificados)}
         
-        Contexto da pessoa: {contexto_pessoa}
+        Contexto da pessoa: {contexto.mensagem(contexto_pessoa)}
         
         Sugira intervenções terapêuticas sistêmicas apropriadas:
         
@@ -227,7 +190,7 @@ class PadraoAnalyzer:
         
         Apresente as sugestões como possibilidades para reflexão, não como 
         obrigações. Seja sensível ao ritmo e capacidade da pessoa.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -240,18 +203,8 @@ class PadraoAnalyzer:
     def _extrair_padroes(self, analise_texto: str) -> List[str]:
         """Extrai padrões específicos do texto de análise"""
         # Implementação simplificada - em produção seria mais sofisticada
-        padroes = []
-        
-        keywords_padroes = [
-            "triangulação", "coalição", "papéis rígidos", "lealdade invisível",
-            "padrão repetitivo", "herança emocional", "segredo familiar"
-        ]
-        
-        for keyword in keywords_padroes:
-            if keyword in analise_texto.lower():
-                padroes.append(keyword)
-        
-        return padroes
+        # Termos em knowledge.vocabularios.PADROES_ANALISE
+        return categorias_encontradas("padroes_analise", analise_texto)
     
     def _identificar_triangulacoes_detalhadas(self, dados_genetograma: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Identifica triangulações específicas no genetograma"""
@@ -282,8 +235,9 @@ class PadraoAnalyzer:
         # Determinar estágio do ciclo de vida baseado na idade e situação
         estagio_esperado = self._determinar_estagio_ciclo_vida(idade_pessoa, situacao_atual)
         
-        prompt = f"""
-        Pessoa com {idade_pessoa} anos, situação atual: {situacao_atual}
+        contexto = ContextoPrompt("padroes.comparar_com_ciclo_vida")
+        prompt = contexto.montar(f"""
+        Pessoa com {idade_pessoa} anos, situação atual: {contexto.mensagem(situacao_atual)}
         
         Estágio esperado do ciclo de vida: {estagio_esperado}
         
@@ -295,7 +249,7 @@ class PadraoAnalyzer:
         5. Que apoio é necessário para avançar desenvolimentalmente?
         
         Base sua análise na teoria do ciclo de vida familiar de Carter & McGoldrick.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -307,22 +261,56 @@ class PadraoAnalyzer:
         }
     
     
-    def _executar_task(self, prompt: str) -> str:
-        """Executa uma task com o agente"""
-        task = Task(
-            description=prompt,
-            agent=self.agent,
-            expected_output="Resposta especializada em formato de texto"
+    def contribuir(self, mensagem: str, contexto_historico: str = None) -> Dict[str, Any]:
+        """Contribuição curta para o turno da equipe (modo paralelo)"""
+        
+        triangulacoes = identificar_triangulacoes_ativas(mensagem)
+        triangulacoes_provaveis = ranquear_triangulacoes(mensagem)
+        padroes = analisar_padroes_multigeracionais(mensagem).get("padroes_identificados", [])
+        provaveis = "; ".join(
+            f"{item['tipo']} ({item['score']:.2f}, sinal: \"{item['sinal']}\")" for item in triangulacoes_provaveis
         )
         
-        crew = Crew(
-            agents=[self.agent],
-            tasks=[task],
-            verbose=False
-        )
+        contexto = ContextoPrompt("padroes.contribuir")
+        prompt = contexto.montar(f"""
+        Você está contribuindo com uma equipe terapêutica que vai responder ao cliente.
+        
+        HISTÓRICO RECENTE:
+        {contexto.historico(contexto_historico, 'Sem histórico')}
+        
+        MENSAGEM DO CLIENTE: {contexto.mensagem(mensagem)}
+        
+        Indicadores detectados automaticamente:
+        - Triangulações: {triangulacoes or 'nenhuma'}
+        - Triangulações por semelhança com sinais da base (score 0-1): {provaveis or 'nenhuma'}
+        - Padrões multigeracionais: {padroes or 'nenhum'}
+        
+        Como analista de padrões familiares, aponte em no máximo 3 tópicos curtos:
+        - Padrões, papéis ou triangulações que aparecem de fato no relato
+        - Como apresentá-los ao cliente como hipótese, não como verdade
+        
+        Use APENAS o que o cliente disse. Se não houver padrões reais na mensagem,
+        responda exatamente: {SEM_CONTRIBUICAO}
+        """)
         
-        result = crew.kickoff()
-        return str(result)
+        resposta = self._executar_task(prompt)
+        
+        return {
+            "contribuicao": resposta,
+            "triangulacoes_detectadas": triangulacoes,
+            "triangulacoes_provaveis": triangulacoes_provaveis,
+            "padroes_detectados": padroes,
+            "agente": "padrao_analyzer",
+            "tipo": "contribuicao_turno"
+        }
+    
+    def _executar_task(self, prompt: str) -> str:
+        """Executa uma task com o agente (respostas repetidas vêm do cache)"""
+        return executar_task(
+            self.agent,
+            prompt,
+            expected_output="Resposta especializada em formato de texto"
+        )
 
     def _determinar_estagio_ciclo_vida(self, idade: int, situacao: str) -> str:
         """Determina o estágio do ciclo de vida baseado em idade e situação"""
@@ -3,10 +3,13 @@ Agente Facilitador de Reflexão
 Especializado em aplicar quebra-gelos e facilitar reflexões profundas
 """
 
-from crewai import Agent, Task, Crew
+from crewai import Agent
 from typing import Dict, Any, List
 import os
 from config import Config
+from core.execucao import executar_task
+from core.contexto import ContextoPrompt
+from core.caracteristicas import categorias_encontradas, extrair_caracteristicas
 from knowledge.quebra_gelos import QUEBRA_GELOS, get_quebra_gelo_by_context
 from knowledge.carter_mcgoldrick import (
     CONCEITOS_FUNDAMENTAIS,
@@ -23,56 +26,10 @@ class ReflexaoFacilitator:
             goal="""Facilitar momentos de reflexão profunda através de quebra-gelos 
                     estratégicos e perguntas que ajudem as pessoas a conectarem 
                     com suas experiências familiares de forma significativa.""",
-            backstory="""Você é um facilitador mestre de reflexões terapêuticas profundas
-                        com expertise especializada na teoria sistêmica de Carter & McGoldrick.
-                        
-                        Sua maestria única inclui:
-                        
-                        FACILITAÇÃO DE REFLEXÃO SISTÊMICA:
-                        - Capacidade excepcional de formular perguntas que revelam padrões familiares
-                        - Habilidade de conectar experiências pessoais com dinâmicas sistêmicas
-                        - Técnicas para facilitar insights sobre ciclo de vida familiar
-                        - Métodos para explorar significados familiares de forma não invasiva
-                        - Criação de espaço seguro para descobertas emocionalmente significativas
-                        
-                        QUEBRA-GELOS TERAPÊUTICOS ESPECIALIZADOS:
-                        - Domínio completo dos quebra-gelos específicos para diferentes contextos familiares
-                        - Adaptação criativa de perguntas para diferentes estágios do ciclo de vida
-                        - Técnicas para iniciar conversas sobre temas familiares sensíveis
-                        - Métodos para criar conexão antes de explorar padrões complexos
-                        - Habilidade de usar humor e leveza para facilitar abertura emocional
-                        
-                        APROFUNDAMENTO ESTRATÉGICO:
-                        - Sequenciamento hábil de perguntas do superficial ao profundo
-                        - Reconhecimento de momentos apropriados para aprofundar exploração
-                        - Técnicas para manter segurança emocional durante revelações difíceis
-                        - Habilidade de conectar diferentes temas familiares em insights coerentes
-                        - Métodos para facilitar conexões entre gerações através de reflexão
-                        
-                        INTEGRAÇÃO TEÓRICA:
-                        - Conexão natural entre experiências pessoais e conceitos de Carter & McGoldrick
-                        - Facilitação de insights sobre tarefas desenvolvimentais através de reflexão
-                        - Exploração de triangulações familiares através de perguntas estratégicas
-                        - Revelação de padrões multigeracionais através de storytelling familiar
-                        - Integração de perspectivas individuais e sistêmicas durante reflexão
-                        
-                        PRESENÇA TERAPÊUTICA:
-                        - Criação de ambiente emocional seguro e acolhedor
-                        - Demonstração de curiosidade genuína sem julgamento
-                        - Validação empática de experiências familiares únicas
-                        - Celebração de recursos e forças familiares descobertos
-                        - Apoio emocional durante processos de autodescoberta
-                        
-                        ADAPTAÇÃO CONTEXTUAL:
-                        - Sensibilidade a diferenças culturais na facilitação de reflexões
-                        - Adaptação de abordagem para diferentes estilos de comunicação familiar
-                        - Respeito por limites pessoais e familiares durante exploração
-                        - Flexibilidade para trabalhar com diferentes níveis de abertura emocional
-                        - Integração respeitosa de valores e crenças familiares na reflexão
-                        
-                        Seu estilo é simultaneamente caloroso e profissionalmente focado,
-                        combinando presença empática com direcionamento terapêutico strategico
-                        para facilitar descobertas familiares transformadoras.""",
+            backstory="""Você é facilitador de reflexões terapêuticas na linha de
+                        Carter & McGoldrick: formula perguntas e quebra-gelos que vão do superficial
+                        ao profundo, mantendo um espaço seguro, caloroso e sem julgamento. Conceitos
+                        da teoria relacionados ao relato são anexados à tarefa quando pertinentes.""",
             tools=[],
             llm=self.llm,
             verbose=Config.VERBOSE,
@@ -86,14 +43,15 @@ class ReflexaoFacilitator:
         if not quebra_gelo:
             return {"erro": "Tipo de quebra-gelo não encontrado"}
         
-        prompt = f"""
+        contexto = ContextoPrompt("reflexao.aplicar_quebra_gelo")
+        prompt = contexto.montar(f"""
         Você vai aplicar este quebra-gelo terapêutico:
         
         Pergunta: {quebra_gelo['pergunta']}
         Foco: {quebra_gelo['foco']}
         Objetivo: {quebra_gelo['objetivo']}
         
-        Contexto da pessoa: {contexto_pessoa or 'Primeira interação'}
+        Contexto da pessoa: {contexto.mensagem(contexto_pessoa, 'Primeira interação')}
         
         Instruções:
         1. Apresente a pergunta de forma natural e acolhedora
@@ -106,7 +64,7 @@ class ReflexaoFacilitator:
         seja mais gentil. Se está aberta, pode ser mais direto.
         
         Lembre-se: o objetivo é criar conexão e insight, não interrogar.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -120,9 +78,10 @@ class ReflexaoFacilitator:
     def aprofundar_reflexao(self, resposta_usuario: str, quebra_gelo_original: str) -> Dict[str, Any]:
         """Aprofunda uma reflexão baseada na resposta do usuário"""
         
-        prompt = f"""
+        contexto = ContextoPrompt("reflexao.aprofundar_reflexao")
+        prompt = contexto.montar(f"""
         A pessoa respondeu ao quebra-gelo "{quebra_gelo_original}" com:
-        "{resposta_usuario}"
+        "{contexto.mensagem(resposta_usuario)}"
         
         Como facilitador experiente, aprofunde esta reflexão:
         
@@ -147,7 +106,7 @@ class ReflexaoFacilitator:
         
         Seja empático, curioso e respeitoso. Se a pessoa tocou em algo doloroso,
         seja especialmente cuidadoso e acolhedor.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -163,10 +122,11 @@ class ReflexaoFacilitator:
         
         elementos_texto = "\n".join([f"- {elemento}" for elemento in elementos_reflexao])
         
-        prompt = f"""
+        contexto = ContextoPrompt("reflexao.facilitar_insights")
+        prompt = contexto.montar(f"""
         A pessoa teve estas reflexões durante nossa conversa:
         
-        {elementos_texto}
+        {contexto.historico(elementos_texto)}
         
         Como facilitador de insights, ajude-a a integrar essas descobertas:
         
@@ -188,7 +148,7 @@ class ReflexaoFacilitator:
         
         Apresente suas observações como ofertas para consideração, não como 
         verdades absolutas. Mantenha o foco no empoderamento da pessoa.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -202,9 +162,10 @@ class ReflexaoFacilitator:
     def criar_ritual_reflexao(self, tema_central: str, situacao_familia: str) -> Dict[str, Any]:
         """Cria um ritual personalizado de reflexão para a pessoa levar"""
         
-        prompt = f"""
+        contexto = ContextoPrompt("reflexao.criar_ritual_reflexao")
+        prompt = contexto.montar(f"""
         Tema central da reflexão: {tema_central}
-        Situação familiar: {situacao_familia}
+        Situação familiar: {contexto.mensagem(situacao_familia)}
         
         Crie um ritual de reflexão personalizado que a pessoa possa fazer 
         regularmente para continuar explorando este tema:
@@ -232,7 +193,7 @@ class ReflexaoFacilitator:
         
         Seja criativo mas prático. O ritual deve ser algo que a pessoa 
         realmente possa e queira fazer regularmente.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -248,9 +209,10 @@ class ReflexaoFacilitator:
         
         conversa_resumida = " ".join(historico_conversa[-3:])  # Últimas 3 mensagens
         
-        prompt = f"""
+        contexto = ContextoPrompt("reflexao.sugerir_quebra_gelo_sequencia")
+        prompt = contexto.montar(f"""
         Baseado neste histórico recente da conversa:
-        "{conversa_resumida}"
+        "{contexto.historico(conversa_resumida)}"
         
         Quebra-gelos disponíveis:
         1. Transições atuais: "O que mudou recentemente na sua família..."
@@ -268,7 +230,7 @@ class ReflexaoFacilitator:
         - O que a pessoa parece pronta para explorar?
         
         Explique sua recomendação e como introduzir o quebra-gelo de forma natural.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -284,10 +246,11 @@ class ReflexaoFacilitator:
     def _avaliar_profundidade(self, resposta_usuario: str) -> str:
         """Avalia o nível de profundidade da reflexão do usuário"""
         
-        if len(resposta_usuario) > 200 and any(palavra in resposta_usuario.lower() 
-                                               for palavra in ["sinto", "percebo", "descobri", "nunca"]):
+        # Marcadores em knowledge.vocabularios.MARCADORES_PROFUNDIDADE
+        caracteristicas = extrair_caracteristicas(resposta_usuario)
+        if caracteristicas.num_caracteres > 200 and caracteristicas.categorias_de("profundidade"):
             return "profunda"
-        elif len(resposta_usuario) > 100:
+        elif caracteristicas.num_caracteres > 100:
             return "moderada"
         else:
             return "superficial"
@@ -296,37 +259,48 @@ class ReflexaoFacilitator:
         """Extrai temas principais das reflexões"""
         
         # Implementação simplificada - em produção seria mais sofisticada
-        temas_comuns = [
-            "relacionamentos", "família de origem", "papéis", "expectativas",
-            "padrões", "mudanças", "perdas", "crescimento", "conflitos"
-        ]
+        # Temas em knowledge.vocabularios.TEMAS_REFLEXAO
+        return categorias_encontradas("temas_reflexao", " ".join(elementos_reflexao))
+    
+    
+    def contribuir(self, mensagem: str, contexto_historico: str = None) -> Dict[str, Any]:
+        """Contribuição curta para o turno da equipe (modo paralelo)"""
         
-        temas_encontrados = []
-        texto_completo = " ".join(elementos_reflexao).lower()
+        quebra_gelo = get_quebra_gelo_by_context(mensagem)
         
-        for tema in temas_comuns:
-            if tema in texto_completo:
-                temas_encontrados.append(tema)
+        contexto = ContextoPrompt("reflexao.contribuir")
+        prompt = contexto.montar(f"""
+        Você está contribuindo com uma equipe terapêutica que vai responder ao cliente.
         
-        return temas_encontrados
-    
+        HISTÓRICO RECENTE:
+        {contexto.historico(contexto_historico, 'Sem histórico')}
+        
+        MENSAGEM DO CLIENTE: {contexto.mensagem(mensagem)}
+        
+        Quebra-gelo de referência: {quebra_gelo['pergunta']}
+        
+        Como facilitador de reflexão, proponha no máximo 2 perguntas abertas,
+        proporcionais ao que foi compartilhado, que convidem o cliente a refletir.
+        Se a mensagem for apenas um cumprimento, proponha um convite simples para
+        a pessoa contar o que a trouxe.
+        """)
+        
+        resposta = self._executar_task(prompt)
+        
+        return {
+            "contribuicao": resposta,
+            "quebra_gelo_referencia": quebra_gelo,
+            "agente": "reflexao_facilitator",
+            "tipo": "contribuicao_turno"
+        }
     
     def _executar_task(self, prompt: str) -> str:
-        """Executa uma task com o agente"""
-        task = Task(
-            description=prompt,
-            agent=self.agent,
+        """Executa uma task com o agente (respostas repetidas vêm do cache)"""
+        return executar_task(
+            self.agent,
+            prompt,
             expected_output="Resposta especializada em formato de texto"
         )
-        
-        crew = Crew(
-            agents=[self.agent],
-            tasks=[task],
-            verbose=False
-        )
-        
-        result = crew.kickoff()
-        return str(result)
 
     def _extrair_recomendacao(self, resposta_agente: str) -> str:
         """Extrai a recomendação de quebra-gelo da resposta do agente"""
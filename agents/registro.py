@@ -0,0 +1,80 @@
+"""
+Registro preguiçoso dos agentes da equipe terapêutica
+Cada agente (persona, Agent do CrewAI e LLM) só é construído no primeiro acesso,
+então a sessão paga apenas pelos agentes que de fato usa. As definições não guardam
+estado de conversa, por isso um único registro é compartilhado por todas as sessões
+do processo (get_registro_agentes)
+"""
+
+import importlib
+import threading
+import logging
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Nome do agente -> (módulo, classe); mesmas chaves do agente_map e de core.roteador.ESPECIALISTAS
+AGENTES_DISPONIVEIS: Dict[str, Tuple[str, str]] = {
+    "terapeuta": ("agents.terapeuta_principal", "TerapeutaPrincipal"),
+    "genetograma": ("agents.genetograma_expert", "GenetogramaExpert"),
+    "ciclo_vida": ("agents.ciclo_vida_analyzer", "CicloVidaAnalyzer"),
+    "padroes": ("agents.padrao_analyzer", "PadraoAnalyzer"),
+    "reflexao": ("agents.reflexao_facilitator", "ReflexaoFacilitator")
+}
+
+
+class RegistroAgentes(Mapping):
+    """Mapa nome -> agente que instancia cada agente sob demanda
+
+    Funciona como o antigo agente_map: `registro["terapeuta"]` devolve o TerapeutaPrincipal,
+    construído (e importado) apenas na primeira vez.
+    """
+
+    def __init__(self, agentes: Dict[str, Tuple[str, str]] = None):
+        self._definicoes = dict(AGENTES_DISPONIVEIS if agentes is None else agentes)
+        self._instancias: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, nome: str) -> Any:
+        instancia = self._instancias.get(nome)
+        if instancia is not None:
+            return instancia
+
+        modulo, classe = self._definicoes[nome]
+        with self._lock:
+            # Outro thread (ex: fan-out dos especialistas) pode ter criado enquanto esperávamos
+            if nome not in self._instancias:
+                fabrica = getattr(importlib.import_module(modulo), classe)
+                self._instancias[nome] = fabrica()
+                logger.info(f"🧩 Agente '{nome}' instanciado sob demanda")
+            return self._instancias[nome]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._definicoes)
+
+    def __len__(self) -> int:
+        return len(self._definicoes)
+
+    def get_agent(self, nome: str) -> Any:
+        """Agent do CrewAI do agente `nome` (materializa o agente se preciso)"""
+        return self[nome].get_agent()
+
+    def instanciados(self) -> List[str]:
+        """Nomes dos agentes já construídos"""
+        return [nome for nome in self._definicoes if nome in self._instancias]
+
+
+_registro: Optional[RegistroAgentes] = None
+_registro_lock = threading.Lock()
+
+def get_registro_agentes() -> RegistroAgentes:
+    """Retorna o registro de agentes compartilhado pelo processo (todas as sessões)"""
+    global _registro
+
+    if _registro is None:
+        with _registro_lock:
+            if _registro is None:
+                _registro = RegistroAgentes()
+    return _registro
@@ -3,10 +3,16 @@ Agente Terapeuta Principal
 Especializado em conduzir sessões terapêuticas empáticas baseadas no modelo Carter & McGoldrick
 """
 
-from crewai import Agent, Task, Crew
-from typing import Dict, Any, List
+from crewai import Agent
+from typing import Dict, Any, List, Callable, Optional
 import os
+import re
+import logging
 from config import Config
+from core.execucao import executar_task
+from core.contexto import ContextoPrompt
+from core.fanout import submeter_background
+from core.streaming import MARCADOR_ANALISE
 from knowledge.carter_mcgoldrick import (
     CONCEITOS_FUNDAMENTAIS,
     get_estagio_ciclo_vida,
@@ -16,6 +22,57 @@ from knowledge.carter_mcgoldrick import (
 from knowledge.quebra_gelos import QUEBRA_GELOS, get_quebra_gelo_by_context
 from knowledge.genetograma_guide import GENETOGRAMA_GUIDE
 
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+MODO_INSIGHTS_SINCRONO = "sincrono"
+MODO_INSIGHTS_BACKGROUND = "background"
+MODO_INSIGHTS_ESTRUTURADO = "estruturado"
+
+# Formato da análise, compartilhado pelo prompt de insights e pelo modo estruturado
+FORMATO_ANALISE = """INSIGHTS: [lista de insights identificados]
+        GENETOGRAMA: [sim/não e por quê]
+        QUEBRA_GELO: [tipo recomendado ou nenhum]
+        PROXIMOS_PASSOS: [lista de próximos passos naturais]"""
+
+_PADRAO_SECAO_ANALISE = re.compile(
+    r"^\W*(INSIGHTS|GENETOGRAMA|QUEBRA_GELO|PROXIMOS_PASSOS)\W*:\s*",
+    re.MULTILINE | re.IGNORECASE
+)
+_PADRAO_MARCADOR_ITEM = re.compile(r"^\s*(?:[-•*]|\d+[.)])\s*")
+
+def _itens_secao(texto: str) -> List[str]:
+    """Converte o texto de uma seção da análise em lista de itens"""
+    itens = []
+    for linha in re.split(r"\n|;", texto):
+        item = _PADRAO_MARCADOR_ITEM.sub("", linha).strip().strip("[]").strip()
+        if item and item.lower().rstrip(".") not in ("nenhum", "nenhuma", "n/a"):
+            itens.append(item)
+    return itens
+
+def interpretar_analise(analise: str) -> Dict[str, Any]:
+    """Converte a análise no formato FORMATO_ANALISE em insights, quebra-gelo e próximos passos"""
+    secoes = {}
+    marcas = list(_PADRAO_SECAO_ANALISE.finditer(analise))
+    for i, marca in enumerate(marcas):
+        fim = marcas[i + 1].start() if i + 1 < len(marcas) else len(analise)
+        secoes[marca.group(1).upper()] = analise[marca.end():fim].strip()
+
+    quebra_gelo = None
+    texto_quebra_gelo = secoes.get("QUEBRA_GELO", "").lower()
+    for chave in QUEBRA_GELOS:
+        if chave in texto_quebra_gelo or chave.replace("_", " ") in texto_quebra_gelo:
+            quebra_gelo = QUEBRA_GELOS[chave]
+            break
+    if quebra_gelo is None and secoes.get("GENETOGRAMA", "").lower().lstrip("[ ").startswith("sim"):
+        quebra_gelo = QUEBRA_GELOS["genetograma_intro"]
+
+    return {
+        "insights": _itens_secao(secoes.get("INSIGHTS", "")),
+        "quebra_gelo": quebra_gelo,
+        "proximos_passos": _itens_secao(secoes.get("PROXIMOS_PASSOS", ""))
+    }
+
 class TerapeutaPrincipal:
     def __init__(self):
         self.llm = Config.get_llm()
@@ -26,42 +83,11 @@ class TerapeutaPrincipal:
             goal="""Conduzir sessões terapêuticas familiares eficazes usando a teoria completa 
                     de Carter & McGoldrick, facilitando insights transformadores e promovendo 
                     mudanças positivas nas dinâmicas familiares.""",
-            backstory="""Você é um terapeuta familiar experiente especializado na abordagem 
-                        sistêmica de Carter & McGoldrick, com profundo conhecimento do ciclo de vida familiar.
-                        
-                        Sua expertise inclui:
-                        
-                        TEORIA DO CICLO DE VIDA:
-                        - Domínio completo dos 6 estágios do ciclo de vida familiar
-                        - Identificação precisa de tarefas desenvolvimentais por estágio
-                        - Reconhecimento de sinais de travamento em transições
-                        - Compreensão das variações: divórcio, doença crônica, famílias monoparentais
-                        - Sensibilidade a diferenças culturais e socioeconômicas
-                        
-                        PADRÕES RELACIONAIS:
-                        - Identificação de triangulações familiares complexas
-                        - Análise de padrões multigeracionais de funcionamento
-                        - Compreensão de lealdades invisíveis e segredos familiares
-                        - Reconhecimento de fronteiras difusas ou rígidas
-                        - Avaliação de sistemas de poder e tomada de decisão
-                        
-                        INTERVENÇÕES ESPECIALIZADAS:
-                        - Intervenções específicas para cada estágio do ciclo de vida
-                        - Técnicas de detriangulação para diferentes padrões
-                        - Estratégias para facilitar transições travadas
-                        - Abordagens adaptadas para variações familiares especiais
-                        - Integração de perspectivas individuais e sistêmicas
-                        
-                        ABORDAGEM TERAPÊUTICA:
-                        - Empático mas direto quando necessário
-                        - Foco em recursos e competências familiares
-                        - Respeito pela autonomia e valores da família
-                        - Colaborativo na definição de objetivos terapêuticos
-                        - Atento a questões de diversidade e inclusão
-                        
-                        Você inicia conversas de forma acolhedora mas mantém foco terapêutico claro,
-                        sempre considerando o estágio do ciclo de vida e padrões sistêmicos únicos
-                        de cada família.""",
+            backstory="""Você é um terapeuta familiar experiente, de abordagem sistêmica
+                        (Carter & McGoldrick). Acolhe com empatia, é direto quando necessário,
+                        trabalha com os recursos da família e respeita sua autonomia e seus valores.
+                        Os trechos da teoria pertinentes a cada mensagem chegam junto com a tarefa;
+                        fundamente-se neles e no que o cliente de fato contou.""",
             tools=[],
             llm=self.llm,  # Usar o objeto LLM do Config
             verbose=Config.VERBOSE,
@@ -73,10 +99,11 @@ class TerapeutaPrincipal:
         
         quebra_gelo = get_quebra_gelo_by_context(contexto_inicial or "")
         
-        prompt = f"""
+        contexto = ContextoPrompt("terapeuta.iniciar_sessao")
+        prompt = contexto.montar(f"""
         Você está iniciando uma nova sessão de apoio emocional. 
         
-        Contexto inicial: {contexto_inicial or 'Primeira sessão'}
+        Contexto inicial: {contexto.mensagem(contexto_inicial, 'Primeira sessão')}
         
         Quebra-gelo sugerido: {quebra_gelo['pergunta']}
         
@@ -89,7 +116,7 @@ class TerapeutaPrincipal:
         
         Lembre-se: Você está aqui para ouvir, acolher e apoiar. Não é uma consulta médica,
         mas um espaço seguro para reflexão sobre dinâmicas familiares.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -100,21 +127,12 @@ class TerapeutaPrincipal:
         }
     
     def _executar_task(self, prompt: str) -> str:
-        """Executa uma task com o agente"""
-        task = Task(
-            description=prompt,
-            agent=self.agent,
+        """Executa uma task com o agente (respostas repetidas vêm do cache)"""
+        return executar_task(
+            self.agent,
+            prompt,
             expected_output="Resposta empática e terapêutica em formato de texto"
         )
-        
-        crew = Crew(
-            agents=[self.agent],
-            tasks=[task],
-            verbose=False
-        )
-        
-        result = crew.kickoff()
-        return str(result)
     
     def avaliar_familia_inicial(self, informacoes_familia: str, 
                                contexto_inicial: str = None) -> Dict[str, Any]:
@@ -122,16 +140,17 @@ class TerapeutaPrincipal:
         
         quebra_gelo = get_quebra_gelo_by_context(contexto_inicial or "")
         
-        prompt = f"""
+        contexto = ContextoPrompt("terapeuta.avaliar_familia_inicial")
+        prompt = contexto.montar(f"""
         {quebra_gelo['pergunta']}
         
         Como terapeuta familiar especializado na abordagem de Carter & McGoldrick,
         faça uma avaliação inicial abrangente desta família:
         
         INFORMAÇÕES DA FAMÍLIA:
-        {informacoes_familia}
+        {contexto.mensagem(informacoes_familia)}
         
-        Contexto inicial: {contexto_inicial or 'Não fornecido'}
+        Contexto inicial: {contexto.historico(contexto_inicial, 'Não fornecido')}
         
         Realize uma avaliação estruturada seguindo rigorosamente a teoria completa
         de Carter & McGoldrick:
@@ -180,7 +199,7 @@ class TerapeutaPrincipal:
         
         Mantenha tom empático e acolhedor, mas seja específico e teoricamente fundamentado.
         Base toda análise rigorosamente nos conceitos completos de Carter & McGoldrick.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -195,14 +214,15 @@ class TerapeutaPrincipal:
                                        problema_atual: str) -> Dict[str, Any]:
         """Analisa padrões que se repetem através das gerações"""
         
-        prompt = f"""
+        contexto = ContextoPrompt("terapeuta.analisar_padrao_intergeracional")
+        prompt = contexto.montar(f"""
         Como terapeuta familiar especialista em padrões multigeracionais:
         
         HISTÓRICO FAMILIAR:
-        {historico_familiar}
+        {contexto.mensagem(historico_familiar)}
         
         PROBLEMA ATUAL:
-        {problema_atual}
+        {contexto.mensagem(problema_atual)}
         
         Analise os padrões multigeracionais seguindo os conceitos de Carter & McGoldrick:
         
@@ -238,7 +258,7 @@ class TerapeutaPrincipal:
         
         Base sua análise nos conceitos específicos de Carter & McGoldrick sobre 
         transmissão multigeracional e dinâmicas familiares.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -255,19 +275,20 @@ class TerapeutaPrincipal:
         estagio_info = get_estagio_ciclo_vida(estagio_atual)
         intervencoes = sugerir_intervencoes_por_estagio(estagio_atual)
         
-        prompt = f"""
+        contexto = ContextoPrompt("terapeuta.facilitar_transicao_ciclo_vida")
+        prompt = contexto.montar(f"""
         Como terapeuta especialista em transições do ciclo de vida familiar:
         
         ESTÁGIO ATUAL: {estagio_atual}
         
         INFORMAÇÕES DO ESTÁGIO:
-        {estagio_info}
+        {contexto.conhecimento(estagio_info)}
         
         DESAFIOS NA TRANSIÇÃO:
-        {desafios_transicao}
+        {contexto.mensagem(desafios_transicao)}
         
         INTERVENÇÕES RECOMENDADAS:
-        {intervencoes}
+        {contexto.conhecimento(intervencoes)}
         
         Desenvolva estratégias específicas para facilitar esta transição:
         
@@ -302,7 +323,7 @@ class TerapeutaPrincipal:
         - Que sequência de intervenções seria mais efetiva?
         
         Mantenha foco na capacidade da família de navegar mudanças com suporte apropriado.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
@@ -313,19 +334,37 @@ class TerapeutaPrincipal:
             "agente": "terapeuta_principal"
         }
     
-    def processar_mensagem(self, mensagem: str, contexto_sessao: List[Dict] = None) -> Dict[str, Any]:
-        """Processa uma mensagem durante a sessão"""
+    def processar_mensagem(self, mensagem: str, contexto_sessao: List[Dict] = None,
+                           modo_insights: str = None,
+                           ao_concluir_insights: Optional[Callable[[Dict[str, Any]], None]] = None,
+                           resumo_sessao: str = None) -> Dict[str, Any]:
+        """Processa uma mensagem durante a sessão
+        
+        contexto_sessao traz os últimos turnos literais; resumo_sessao, o resumo
+        incremental dos anteriores (core.resumo).
+        
+        modo_insights (padrão Config.INSIGHTS_MODE):
+        - "sincrono": resposta e análise de insights em duas chamadas seguidas
+        - "background": retorna após a resposta; a análise roda no pool e atualiza o
+          dict retornado quando termina, chamando ao_concluir_insights(resultado)
+        - "estruturado": resposta e análise numa única chamada, separadas localmente
+        """
+        modo = (modo_insights or Config.INSIGHTS_MODE).lower()
         
         historico = "\n".join([
             f"{msg.get('tipo', 'user')}: {msg.get('conteudo', '')}" 
             for msg in (contexto_sessao or [])
         ])
         
+        contexto = ContextoPrompt("terapeuta.processar_mensagem")
         prompt = f"""
+        Resumo da conversa até aqui:
+        {contexto.historico(resumo_sessao, 'Sem resumo (início da conversa)')}
+        
         Histórico da conversa:
-        {historico}
+        {contexto.historico(historico)}
         
-        Nova mensagem do usuário: {mensagem}
+        Nova mensagem do usuário: {contexto.mensagem(mensagem)}
         
         Como terapeuta familiar sistêmico, responda considerando:
         
@@ -358,11 +397,42 @@ class TerapeutaPrincipal:
         Sua resposta deve ser calorosa, reflexiva e que convide à continuidade da conversa.
         """
         
+        if modo == MODO_INSIGHTS_ESTRUTURADO:
+            prompt += f"""
+        Depois da resposta ao cliente, escreva uma linha contendo apenas
+        {MARCADOR_ANALISE}
+        e, abaixo dela, sua análise interna desta interação (não será mostrada ao cliente):
+        {FORMATO_ANALISE}
+        """
+        # A instrução do modo estruturado conta no orçamento do prompt
+        prompt = contexto.montar(prompt)
+        
+        if modo == MODO_INSIGHTS_ESTRUTURADO:
+            saida = self._executar_task(prompt)
+            resposta, _, analise = saida.partition(MARCADOR_ANALISE)
+            resposta = resposta.strip()
+            insights = interpretar_analise(analise)
+            return self._montar_resultado(resposta, insights)
+        
         resposta = self._executar_task(prompt)
         
+        if modo == MODO_INSIGHTS_BACKGROUND:
+            # Insights fora do caminho da resposta: o cliente não espera pela segunda chamada
+            resultado = self._montar_resultado(resposta, {})
+            resultado["insights_pendentes"] = True
+            # A análise não está no caminho da resposta: pool e prazo próprios (core.fanout)
+            futuro = submeter_background(lambda: self._analisar_insights(mensagem, resposta))
+            futuro.add_done_callback(
+                lambda f: self._anexar_insights(resultado, f, ao_concluir_insights)
+            )
+            return resultado
+        
         # Analisar se é momento para sugerir genetograma ou quebra-gelos específicos
         insights = self._analisar_insights(mensagem, resposta)
         
+        return self._montar_resultado(resposta, insights)
+    
+    def _montar_resultado(self, resposta: str, insights: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "resposta": resposta,
             "agente": "terapeuta_principal",
@@ -371,14 +441,37 @@ class TerapeutaPrincipal:
             "proximos_passos": insights.get("proximos_passos", [])
         }
     
+    def _anexar_insights(self, resultado: Dict[str, Any], futuro,
+                         ao_concluir: Optional[Callable[[Dict[str, Any]], None]]):
+        """Atualiza o resultado do turno quando a análise em background termina"""
+        try:
+            insights = futuro.result()
+        except Exception as e:
+            logger.error(f"❌ Análise de insights em background falhou: {e}")
+            insights = {}
+        
+        resultado.update({
+            "insights_detectados": insights.get("insights", []),
+            "quebra_gelo_sugerido": insights.get("quebra_gelo"),
+            "proximos_passos": insights.get("proximos_passos", []),
+            "insights_pendentes": False
+        })
+        
+        if ao_concluir:
+            try:
+                ao_concluir(resultado)
+            except Exception as e:
+                logger.error(f"❌ Erro ao anexar insights à sessão: {e}")
+    
     def _analisar_insights(self, mensagem_usuario: str, resposta_agente: str) -> Dict[str, Any]:
         """Analisa a conversa para identificar insights e próximos passos"""
         
-        prompt = f"""
+        contexto = ContextoPrompt("terapeuta._analisar_insights")
+        prompt = contexto.montar(f"""
         Analise esta interação terapêutica:
         
-        Usuário: {mensagem_usuario}
-        Terapeuta: {resposta_agente}
+        Usuário: {contexto.mensagem(mensagem_usuario)}
+        Terapeuta: {contexto.historico(resposta_agente)}
         
         Identifique:
         1. Insights sobre padrões familiares mencionados ou implícitos
@@ -387,34 +480,89 @@ class TerapeutaPrincipal:
         4. Próximos passos terapêuticos naturais
         
         Retorne em formato:
-        INSIGHTS: [lista de insights identificados]
-        GENETOGRAMA: [sim/não e por quê]
-        QUEBRA_GELO: [tipo recomendado ou nenhum]
-        PROXIMOS_PASSOS: [lista de próximos passos naturais]
-        """
+        {FORMATO_ANALISE}
+        """)
         
         analise = self._executar_task(prompt)
         
-        # Processar a resposta estruturada (implementação simplificada)
-        insights = {
-            "insights": [],
-            "quebra_gelo": None, 
-            "proximos_passos": []
+        return interpretar_analise(analise)
+    
+    def sintetizar_contribuicoes(self, mensagem: str, contribuicoes: Dict[str, str],
+                                 contexto_historico: str = None,
+                                 contexto_sessao: str = None) -> Dict[str, Any]:
+        """Integra as contribuições dos especialistas em uma única resposta ao cliente"""
+        
+        notas = "\n\n".join([
+            f"[{especialista}]\n{texto}" for especialista, texto in contribuicoes.items()
+        ]) or "Nenhum especialista trouxe contribuição para esta mensagem."
+        
+        contexto = ContextoPrompt("terapeuta.sintetizar_contribuicoes")
+        prompt = contexto.montar(f"""
+        CONTEXTO DA SESSÃO: {contexto.historico(contexto_sessao, 'Não informado')}
+        
+        HISTÓRICO RECENTE:
+        {contexto.historico(contexto_historico, 'Sem histórico')}
+        
+        NOVA MENSAGEM DO CLIENTE: {contexto.mensagem(mensagem)}
+        
+        NOTAS DOS ESPECIALISTAS DA EQUIPE (uso interno, não cite os especialistas):
+        {contexto.conhecimento(notas)}
+        
+        Como terapeuta principal, escreva a resposta única da equipe ao cliente:
+        - Demonstre escuta ativa do que foi realmente dito
+        - Incorpore apenas as notas que se apoiam no relato do cliente
+        - Seja empático mas não excessivo, proporcional à mensagem
+        - Termine com no máximo uma pergunta que convide ao diálogo
+        
+        IMPORTANTE: Se a mensagem é simples, responda de forma simples e acolhedora.
+        """)
+        
+        resposta = self._executar_task(prompt)
+        
+        return {
+            "resposta": resposta,
+            "especialistas_considerados": list(contribuicoes.keys()),
+            "agente": "terapeuta_principal",
+            "tipo": "sintese_equipe"
         }
+    
+    def resumir_historico(self, resumo_anterior: str, turnos: List[str],
+                          max_palavras: int = 150) -> Dict[str, Any]:
+        """Incorpora novos turnos ao resumo corrente da sessão (resumo incremental)"""
+        novos_turnos = "\n\n".join(turnos)
+        
+        contexto = ContextoPrompt("terapeuta.resumir_historico")
+        prompt = contexto.montar(f"""
+        RESUMO ATUAL DA CONVERSA:
+        {contexto.conhecimento(resumo_anterior, 'Ainda não há resumo.')}
         
-        # Aqui você implementaria parsing mais sofisticado da análise
-        if "genetograma" in analise.lower():
-            insights["quebra_gelo"] = QUEBRA_GELOS["genetograma_intro"]
+        NOVAS INTERAÇÕES:
+        {contexto.historico(novos_turnos)}
         
-        return insights
+        Atualize o resumo incorporando as novas interações:
+        - Registre apenas o que o cliente relatou: membros da família, gerações,
+          estágio do ciclo de vida, padrões, triangulações, perdas e sentimentos
+        - Preserve os fatos do resumo atual que continuam relevantes
+        - Não acrescente interpretações nem hipóteses novas
+        - No máximo {max_palavras} palavras, em texto corrido
+        
+        Responda apenas com o resumo atualizado.
+        """)
+        
+        return {
+            "resumo": self._executar_task(prompt),
+            "agente": "terapeuta_principal",
+            "tipo": "resumo_sessao"
+        }
     
     def finalizar_sessao(self, resumo_sessao: str) -> Dict[str, Any]:
         """Finaliza a sessão com um fechamento empático"""
         
-        prompt = f"""
+        contexto = ContextoPrompt("terapeuta.finalizar_sessao")
+        prompt = contexto.montar(f"""
         Você está finalizando uma sessão de apoio emocional.
         
-        Resumo da sessão: {resumo_sessao}
+        Resumo da sessão: {contexto.mensagem(resumo_sessao)}
         
         Crie um fechamento que:
         1. Reconheça o que a pessoa compartilhou
@@ -424,7 +572,7 @@ class TerapeutaPrincipal:
         5. Seja genuinamente empático e esperançoso
         
         Evite resumos técnicos ou interpretações - foque no aspecto humano e relacional.
-        """
+        """)
         
         resposta = self._executar_task(prompt)
         
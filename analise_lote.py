@@ -0,0 +1,496 @@
+"""
+Análise em lote de relatos históricos (JSONL), fora da interface
+A análise local (idade, estágio base, variações, triangulações, padrões multigeracionais)
+roda num pool de processos, em blocos de registros; as etapas com LLM
+(CicloVidaAnalyzer.identificar_estagio_atual e PadraoAnalyzer.analisar_conversa) passam
+por um executor de threads com concorrência limitada, pelo mesmo caminho de cache, cota
+e referências dos turnos da interface (core.execucao)
+
+Uso:
+    python analise_lote.py relatos.jsonl --saida resultados.jsonl
+    python analise_lote.py relatos.jsonl --saida resultados/ --formato parquet --etapas-llm ciclo_vida
+
+Entrada: um objeto por linha com o texto em "texto" (ou uma "conversa" no formato
+[{"tipo", "conteudo"}]) e, opcionalmente, "id", "idade" e "contexto". Sem "id", o número
+da linha identifica o registro.
+
+Retomada: a própria saída é o checkpoint. Registros gravados (linhas completas do JSONL
+ou partes .parquet) são pulados ao rodar de novo com a mesma saída; com --repetir-erros,
+os que tiveram alguma etapa com erro são refeitos (vale a linha/parte mais recente do id).
+"""
+
+import os
+import io
+import json
+import time
+import argparse
+import threading
+import multiprocessing
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from config import Config
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+FORMATO_JSONL = "jsonl"
+FORMATO_PARQUET = "parquet"
+
+# Idade usada quando o registro não informa e o texto não cita nenhuma (como no orquestrador)
+IDADE_PADRAO = 35
+
+# Sessão de cota (core.agendador) das chamadas do lote
+SESSAO_LOTE = "analise_lote"
+
+# Registros por bloco enviado a um processo do pool (amortiza o envio entre processos)
+REGISTROS_POR_BLOCO = 32
+
+# Progresso no log a cada N registros gravados
+INTERVALO_PROGRESSO = 100
+
+
+# ---------------------------------------------------------------------------
+# Análise local (roda nos processos do pool: sem CrewAI nem LLM)
+# ---------------------------------------------------------------------------
+
+def _iniciar_processo():
+    """Abre snapshot, autômato e índice vetorial uma vez por processo do pool"""
+    from core.palavras_chave import get_automato
+    from knowledge.indice_vetorial import get_indice_vetorial
+    get_automato()
+    get_indice_vetorial()
+
+def analisar_local(texto: str, idade: Optional[int] = None) -> Dict[str, Any]:
+    """Indicadores locais de um relato (funções de knowledge.carter_mcgoldrick)"""
+    from core.caracteristicas import extrair_caracteristicas
+    from knowledge.carter_mcgoldrick import (
+        determinar_estagio_por_idade_situacao,
+        identificar_variacoes_aplicaveis,
+        identificar_triangulacoes_ativas,
+        ranquear_triangulacoes,
+        analisar_padroes_multigeracionais
+    )
+
+    caracteristicas = extrair_caracteristicas(texto)
+    if idade is None:
+        idade = IDADE_PADRAO if caracteristicas.idade is None else caracteristicas.idade
+    return {
+        "idade": idade,
+        "num_palavras": caracteristicas.num_palavras,
+        "estagio_base": determinar_estagio_por_idade_situacao(idade, texto).get("estagio"),
+        "variacoes": identificar_variacoes_aplicaveis(texto),
+        "triangulacoes": identificar_triangulacoes_ativas(texto),
+        "triangulacoes_provaveis": ranquear_triangulacoes(texto),
+        "padroes_multigeracionais": analisar_padroes_multigeracionais(texto)["padroes_identificados"]
+    }
+
+def analisar_bloco_local(bloco: List[Tuple[str, str, Optional[int]]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """(id, análise local) de cada (id, texto, idade) do bloco; erros ficam no próprio registro"""
+    resultados = []
+    for id_registro, texto, idade in bloco:
+        try:
+            resultados.append((id_registro, analisar_local(texto, idade)))
+        except Exception as e:
+            resultados.append((id_registro, {"erros": {"local": f"{type(e).__name__}: {e}"}}))
+    return resultados
+
+
+# ---------------------------------------------------------------------------
+# Etapas com LLM (threads do processo principal)
+# ---------------------------------------------------------------------------
+
+def _etapa_ciclo_vida(agentes, registro: Dict[str, Any], local: Dict[str, Any]) -> Dict[str, Any]:
+    return agentes["ciclo_vida"].identificar_estagio_atual(
+        local.get("idade", IDADE_PADRAO), registro["texto"], registro.get("contexto")
+    )
+
+def _etapa_padroes(agentes, registro: Dict[str, Any], local: Dict[str, Any]) -> Dict[str, Any]:
+    conversa = registro.get("conversa") or [{"tipo": "user", "conteudo": registro["texto"]}]
+    return agentes["padroes"].analisar_conversa(conversa)
+
+ETAPAS_LLM: Dict[str, Callable] = {
+    "ciclo_vida": _etapa_ciclo_vida,
+    "padroes": _etapa_padroes
+}
+
+
+# ---------------------------------------------------------------------------
+# Entrada e saída
+# ---------------------------------------------------------------------------
+
+def ler_registros(caminho: str, campo_id: str = "id", campo_texto: str = "texto") -> Iterator[Dict[str, Any]]:
+    """Registros do JSONL, um por vez, com id (ou número da linha) e texto normalizados"""
+    with open(caminho, encoding="utf-8") as f:
+        for numero, linha in enumerate(f, start=1):
+            if not linha.strip():
+                continue
+            try:
+                dados = json.loads(linha)
+            except json.JSONDecodeError as e:
+                logger.warning(f"⚠️ Linha {numero} ignorada: JSON inválido ({e})")
+                continue
+
+            texto = dados.get(campo_texto)
+            if not texto and dados.get("conversa"):
+                texto = "\n".join(str(msg.get("conteudo", "")) for msg in dados["conversa"])
+            if not texto:
+                logger.warning(f"⚠️ Linha {numero} ignorada: sem '{campo_texto}' nem 'conversa'")
+                continue
+
+            idade = dados.get("idade")
+            if idade is not None:
+                try:
+                    idade = int(idade)
+                except (TypeError, ValueError):
+                    # Sem idade válida, a análise usa a citada no texto (ou IDADE_PADRAO)
+                    logger.warning(f"⚠️ Linha {numero}: idade inválida ({idade!r}), ignorando o campo")
+                    idade = None
+            yield {
+                "id": str(dados.get(campo_id, f"linha-{numero}")),
+                "texto": str(texto),
+                "idade": idade,
+                "contexto": dados.get("contexto"),
+                "conversa": dados.get("conversa")
+            }
+
+
+class SaidaJSONL:
+    """Um resultado por linha, gravado assim que o registro termina"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+
+    def concluidos(self, repetir_erros: bool = False) -> Set[str]:
+        """Ids já gravados (descarta uma última linha incompleta de uma execução interrompida)"""
+        if not os.path.exists(self.caminho):
+            return set()
+
+        status: Dict[str, bool] = {}
+        valido_ate = 0
+        with open(self.caminho, "rb") as f:
+            for linha in f:
+                try:
+                    resultado = json.loads(linha)
+                except ValueError:
+                    break
+                status[resultado["id"]] = bool(resultado.get("erros"))
+                valido_ate += len(linha)
+
+        if valido_ate < os.path.getsize(self.caminho):
+            logger.warning(f"⚠️ Descartando linha incompleta no fim de {self.caminho}")
+            with open(self.caminho, "r+b") as f:
+                f.truncate(valido_ate)
+        return {id_registro for id_registro, com_erro in status.items() if not (repetir_erros and com_erro)}
+
+    def abrir(self):
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        self._arquivo = open(self.caminho, "a", encoding="utf-8")
+
+    def gravar(self, resultado: Dict[str, Any]):
+        self._arquivo.write(json.dumps(resultado, ensure_ascii=False, default=str) + "\n")
+        self._arquivo.flush()
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class SaidaParquet:
+    """Partes parte-NNNNN.parquet de até `registros_por_parte` resultados, gravadas de forma atômica
+
+    Campos aninhados (análises dos agentes, triangulações ranqueadas, erros) vão como JSON.
+    """
+
+    COLUNAS_JSON = ("triangulacoes_provaveis", "ciclo_vida", "padroes", "erros")
+
+    def __init__(self, diretorio: str, registros_por_parte: int = 500):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Saída parquet requer o pacote pyarrow (pip install pyarrow)")
+        self.diretorio = diretorio
+        self.registros_por_parte = registros_por_parte
+        self._pendentes: List[Dict[str, Any]] = []
+        self._proxima_parte = 0
+
+    def _partes(self) -> List[str]:
+        if not os.path.isdir(self.diretorio):
+            return []
+        return sorted(
+            nome for nome in os.listdir(self.diretorio)
+            if nome.startswith("parte-") and nome.endswith(".parquet")
+        )
+
+    def concluidos(self, repetir_erros: bool = False) -> Set[str]:
+        import pyarrow.parquet as pq
+        status: Dict[str, bool] = {}
+        for nome in self._partes():
+            tabela = pq.read_table(os.path.join(self.diretorio, nome), columns=["id", "erros"])
+            for id_registro, erros in zip(tabela.column("id").to_pylist(), tabela.column("erros").to_pylist()):
+                status[id_registro] = bool(erros)
+        return {id_registro for id_registro, com_erro in status.items() if not (repetir_erros and com_erro)}
+
+    def abrir(self):
+        os.makedirs(self.diretorio, exist_ok=True)
+        partes = self._partes()
+        self._proxima_parte = int(partes[-1][len("parte-"):-len(".parquet")]) + 1 if partes else 0
+
+    def gravar(self, resultado: Dict[str, Any]):
+        self._pendentes.append(resultado)
+        if len(self._pendentes) >= self.registros_por_parte:
+            self._gravar_parte()
+
+    def _gravar_parte(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from knowledge.base_compilada import gravar
+
+        linhas = [
+            {
+                coluna: (json.dumps(valor, ensure_ascii=False, default=str) if valor else None)
+                if coluna in self.COLUNAS_JSON else valor
+                for coluna, valor in resultado.items()
+            }
+            for resultado in self._pendentes
+        ]
+        buffer = io.BytesIO()
+        pq.write_table(pa.Table.from_pylist(linhas, schema=_esquema_parquet()), buffer)
+        gravar(buffer.getvalue(), os.path.join(self.diretorio, f"parte-{self._proxima_parte:05d}.parquet"))
+        self._proxima_parte += 1
+        self._pendentes = []
+
+    def fechar(self):
+        if self._pendentes:
+            self._gravar_parte()
+
+def _esquema_parquet():
+    """Esquema fixo: partes com colunas todas nulas continuam compatíveis entre si"""
+    import pyarrow as pa
+    return pa.schema([
+        ("id", pa.string()),
+        ("idade", pa.int64()),
+        ("num_palavras", pa.int64()),
+        ("estagio_base", pa.string()),
+        ("variacoes", pa.list_(pa.string())),
+        ("triangulacoes", pa.list_(pa.string())),
+        ("triangulacoes_provaveis", pa.string()),
+        ("padroes_multigeracionais", pa.list_(pa.string())),
+        ("ciclo_vida", pa.string()),
+        ("padroes", pa.string()),
+        ("erros", pa.string()),
+        ("duracao_ms", pa.float64())
+    ])
+
+
+# ---------------------------------------------------------------------------
+# Execução
+# ---------------------------------------------------------------------------
+
+class _RegistroEmAndamento:
+    """Resultado de um registro enquanto as etapas com LLM não terminam"""
+
+    def __init__(self, registro: Dict[str, Any], local: Dict[str, Any], inicio: float):
+        self.registro = registro
+        self.inicio = inicio
+        self.resultado: Dict[str, Any] = {
+            "id": registro["id"],
+            "idade": local.get("idade"),
+            "num_palavras": local.get("num_palavras"),
+            "estagio_base": local.get("estagio_base"),
+            "variacoes": local.get("variacoes", []),
+            "triangulacoes": local.get("triangulacoes", []),
+            "triangulacoes_provaveis": local.get("triangulacoes_provaveis", []),
+            "padroes_multigeracionais": local.get("padroes_multigeracionais", []),
+            "ciclo_vida": None,
+            "padroes": None,
+            "erros": dict(local.get("erros", {}))
+        }
+        self.faltando = 0
+
+    def finalizar(self) -> Dict[str, Any]:
+        self.resultado["duracao_ms"] = round((time.perf_counter() - self.inicio) * 1000, 1)
+        return self.resultado
+
+
+class AnaliseLote:
+    """Pipeline: leitura em streaming -> pool de processos (local) -> executor limitado (LLM) -> saída"""
+
+    def __init__(self, processos: int = None, concorrencia_llm: int = None,
+                 etapas_llm: List[str] = None, registros_por_bloco: int = REGISTROS_POR_BLOCO):
+        self.processos = processos or Config.BATCH_PROCESSES or os.cpu_count() or 1
+        self.concorrencia_llm = concorrencia_llm or Config.BATCH_LLM_CONCURRENCY
+        self.etapas_llm = list(ETAPAS_LLM) if etapas_llm is None else etapas_llm
+        desconhecidas = set(self.etapas_llm) - set(ETAPAS_LLM)
+        if desconhecidas:
+            raise ValueError(f"Etapas desconhecidas: {sorted(desconhecidas)} (disponíveis: {list(ETAPAS_LLM)})")
+        self.registros_por_bloco = registros_por_bloco
+        # Registros lidos e ainda não gravados: limita a memória com a entrada inteira em disco
+        self.janela = max(self.processos * registros_por_bloco * 2, self.concorrencia_llm * 4)
+        self.estatisticas = {"lidos": 0, "pulados": 0, "gravados": 0, "com_erro": 0, "chamadas_llm": 0}
+
+    def executar(self, registros: Iterator[Dict[str, Any]], saida, concluidos: Set[str] = frozenset()) -> dict:
+        inicio = time.perf_counter()
+        agentes = None
+        if self.etapas_llm:
+            from agents.registro import get_registro_agentes
+            agentes = get_registro_agentes()
+
+        # spawn: o processo principal já tem threads (executor de LLM, clientes HTTP)
+        pool_local = ProcessPoolExecutor(
+            max_workers=self.processos,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_iniciar_processo
+        )
+        pool_llm = ThreadPoolExecutor(max_workers=self.concorrencia_llm, thread_name_prefix="lote_llm")
+        # Etapas aguardando vaga no executor de LLM não ocupam memória da fila do pool
+        vagas_llm = threading.BoundedSemaphore(self.concorrencia_llm * 2)
+
+        blocos: Dict[Future, Dict[str, Tuple[Dict[str, Any], float]]] = {}
+        etapas: Dict[Future, Tuple[_RegistroEmAndamento, str]] = {}
+        em_andamento = 0
+        entrada = iter(registros)
+        esgotada = False
+
+        def proximo_bloco() -> Dict[str, Tuple[Dict[str, Any], float]]:
+            nonlocal esgotada
+            bloco: Dict[str, Tuple[Dict[str, Any], float]] = {}
+            while len(bloco) < self.registros_por_bloco:
+                registro = next(entrada, None)
+                if registro is None:
+                    esgotada = True
+                    break
+                self.estatisticas["lidos"] += 1
+                if registro["id"] in concluidos or registro["id"] in bloco:
+                    self.estatisticas["pulados"] += 1
+                    continue
+                bloco[registro["id"]] = (registro, time.perf_counter())
+            return bloco
+
+        def executar_etapa(nome: str, registro: Dict[str, Any], local: Dict[str, Any]) -> Dict[str, Any]:
+            from core.agendador import definir_sessao_llm
+            from core.recuperacao import definir_consulta_turno
+            try:
+                definir_sessao_llm(SESSAO_LOTE)
+                definir_consulta_turno(registro["texto"])
+                return ETAPAS_LLM[nome](agentes, registro, local)
+            finally:
+                vagas_llm.release()
+
+        def gravar(andamento: _RegistroEmAndamento):
+            nonlocal em_andamento
+            resultado = andamento.finalizar()
+            saida.gravar(resultado)
+            em_andamento -= 1
+            self.estatisticas["gravados"] += 1
+            self.estatisticas["com_erro"] += int(bool(resultado["erros"]))
+            if self.estatisticas["gravados"] % INTERVALO_PROGRESSO == 0:
+                decorrido = time.perf_counter() - inicio
+                logger.info(f"🔄 {self.estatisticas['gravados']} registros gravados "
+                            f"({self.estatisticas['gravados'] / decorrido:.1f}/s, {self.estatisticas['com_erro']} com erro)")
+
+        try:
+            while True:
+                while not esgotada and em_andamento < self.janela:
+                    bloco = proximo_bloco()
+                    if bloco:
+                        futuro = pool_local.submit(analisar_bloco_local, [
+                            (registro["id"], registro["texto"], registro["idade"]) for registro, _ in bloco.values()
+                        ])
+                        blocos[futuro] = bloco
+                        em_andamento += len(bloco)
+
+                if not blocos and not etapas:
+                    break
+
+                prontos, _ = wait(list(blocos) + list(etapas), return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    if futuro in blocos:
+                        bloco = blocos.pop(futuro)
+                        try:
+                            analises = futuro.result()
+                        except Exception as e:
+                            # Processo do pool morreu: o bloco inteiro fica com erro local
+                            analises = [(id_registro, {"erros": {"local": f"{type(e).__name__}: {e}"}})
+                                        for id_registro in bloco]
+                        for id_registro, local in analises:
+                            registro, lido_em = bloco[id_registro]
+                            andamento = _RegistroEmAndamento(registro, local, lido_em)
+                            if "local" in andamento.resultado["erros"] or not self.etapas_llm:
+                                gravar(andamento)
+                                continue
+                            for nome in self.etapas_llm:
+                                vagas_llm.acquire()
+                                etapas[pool_llm.submit(executar_etapa, nome, registro, local)] = (andamento, nome)
+                                andamento.faltando += 1
+                                self.estatisticas["chamadas_llm"] += 1
+                    else:
+                        andamento, nome = etapas.pop(futuro)
+                        try:
+                            andamento.resultado[nome] = futuro.result()
+                        except Exception as e:
+                            logger.warning(f"⚠️ Etapa {nome} falhou para {andamento.registro['id']}: {e}")
+                            andamento.resultado["erros"][nome] = f"{type(e).__name__}: {e}"
+                        andamento.faltando -= 1
+                        if andamento.faltando == 0:
+                            gravar(andamento)
+        except KeyboardInterrupt:
+            logger.warning("⏹️ Interrompido: registros já gravados ficam no checkpoint da saída")
+            for futuro in list(blocos) + list(etapas):
+                futuro.cancel()
+            raise
+        finally:
+            pool_local.shutdown(wait=True, cancel_futures=True)
+            pool_llm.shutdown(wait=True, cancel_futures=True)
+
+        self.estatisticas["segundos"] = round(time.perf_counter() - inicio, 2)
+        return self.estatisticas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análise em lote de relatos em JSONL")
+    parser.add_argument("entrada", help="Arquivo JSONL com um relato por linha")
+    parser.add_argument("--saida", required=True, help="Arquivo .jsonl ou diretório das partes .parquet")
+    parser.add_argument("--formato", choices=(FORMATO_JSONL, FORMATO_PARQUET), default=FORMATO_JSONL,
+                        help="Padrão: jsonl (parquet requer o pacote pyarrow)")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="Processos da análise local (padrão: BATCH_PROCESSES ou número de CPUs)")
+    parser.add_argument("--concorrencia-llm", type=int, default=None,
+                        help="Chamadas simultâneas ao LLM (padrão: BATCH_LLM_CONCURRENCY)")
+    parser.add_argument("--etapas-llm", default=",".join(ETAPAS_LLM),
+                        help=f"Etapas com LLM separadas por vírgula ({', '.join(ETAPAS_LLM)}); vazio = só local")
+    parser.add_argument("--campo-id", default="id")
+    parser.add_argument("--campo-texto", default="texto")
+    parser.add_argument("--registros-por-parte", type=int, default=500, help="Tamanho das partes .parquet")
+    parser.add_argument("--repetir-erros", action="store_true", help="Refaz registros gravados com erro")
+    args = parser.parse_args()
+
+    if args.formato == FORMATO_JSONL:
+        saida = SaidaJSONL(args.saida)
+    else:
+        saida = SaidaParquet(args.saida, registros_por_parte=args.registros_por_parte)
+
+    etapas = [nome.strip() for nome in args.etapas_llm.split(",") if nome.strip()]
+    if etapas:
+        Config.validate_config()
+
+    concluidos = saida.concluidos(repetir_erros=args.repetir_erros)
+    if concluidos:
+        logger.info(f"⏩ Retomando: {len(concluidos)} registros já gravados em {args.saida}")
+
+    lote = AnaliseLote(processos=args.processos, concorrencia_llm=args.concorrencia_llm, etapas_llm=etapas)
+    logger.info(f"🚀 Análise em lote: {lote.processos} processos locais, "
+                f"{lote.concorrencia_llm} chamadas simultâneas ao LLM, etapas {etapas or 'nenhuma'}")
+
+    saida.abrir()
+    try:
+        estatisticas = lote.executar(ler_registros(args.entrada, args.campo_id, args.campo_texto), saida, concluidos)
+    finally:
+        saida.fechar()
+
+    print(json.dumps(estatisticas, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,18 @@ Interface Web para o MVP de Terapia Familiar
 
 import streamlit as st
 import os
+import importlib
+import threading
 from config import Config
+from agents.registro import AGENTES_DISPONIVEIS, get_registro_agentes
+
+# Configuração da página
+st.set_page_config(
+    page_title="Terapia Familiar MVP",
+    page_icon="🧠",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
 
 # Validar configuração na inicialização apenas uma vez
 if 'config_validated' not in st.session_state:
@@ -15,14 +26,6 @@ if 'config_validated' not in st.session_state:
         st.error(f"Erro na configuração: {e}")
         st.stop()
 
-# Configuração da página
-st.set_page_config(
-    page_title="Terapia Familiar MVP",
-    page_icon="🧠",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
 # CSS personalizado simplificado
 st.markdown("""
 <style>
@@ -84,20 +87,77 @@ st.markdown("""
 
 def initialize_session_state():
     """Inicializa o estado da sessão"""
-    if 'messages' not in st.session_state:
-        st.session_state.messages = []
+    # As mensagens exibidas vêm do histórico do orquestrador (anel com os turnos recentes);
+    # aqui ficam só os turnos mais antigos que o usuário pediu para carregar
+    if 'turnos_anteriores' not in st.session_state:
+        st.session_state.turnos_anteriores = []
     
     if 'session_started' not in st.session_state:
         st.session_state.session_started = False
     
+    # Link com ?sessao=<id>: retoma a conversa do armazenamento de sessões, mesmo que
+    # tenha começado em outra instância
+    if 'orchestrator' not in st.session_state and st.query_params.get("sessao"):
+        retomar_sessao(obter_orquestrador())
+
+def retomar_sessao(orchestrator):
+    """Marca a sessão como iniciada se o armazenamento já tem turnos dela"""
+    st.session_state.session_started = orchestrator.session_state["num_interacoes"] > 0
+
+def turnos_exibidos():
+    """Turnos carregados do log mais os do anel em memória, em ordem cronológica"""
+    if 'orchestrator' not in st.session_state:
+        return []
+    return st.session_state.turnos_anteriores + list(st.session_state.orchestrator.session_state["historico"])
+
+def posicao_primeiro_turno_exibido():
+    """Posição (desde o início da sessão) do turno mais antigo já exibido"""
+    estado = st.session_state.orchestrator.session_state
+    return estado["num_interacoes"] - len(estado["historico"]) - len(st.session_state.turnos_anteriores)
+
+@st.cache_resource(show_spinner=False)
+def obter_equipe_compartilhada():
+    """Agentes da equipe, um conjunto por processo compartilhado por todas as abas"""
+    return get_registro_agentes()
+
+def obter_orquestrador():
+    """Orquestrador da sessão, criado no primeiro uso (não atrasa a primeira tela)
+    
+    Guarda só o estado da conversa desta aba; os agentes vêm da equipe compartilhada.
+    """
     if 'orchestrator' not in st.session_state:
         try:
             from crew_orchestrator import TerapiaCrewOrchestrator
             with st.spinner("Inicializando sistema..."):
-                st.session_state.orchestrator = TerapiaCrewOrchestrator()
+                st.session_state.orchestrator = TerapiaCrewOrchestrator(
+                    agentes=obter_equipe_compartilhada(),
+                    session_id=st.query_params.get("sessao")
+                )
+            # O id na URL permite que qualquer instância retome a sessão (sem sticky sessions)
+            st.query_params["sessao"] = st.session_state.orchestrator.session_id
         except Exception as e:
             st.error(f"Erro ao inicializar o sistema: {e}")
             st.stop()
+    return st.session_state.orchestrator
+
+def _importar_dependencias_pesadas():
+    """Importa CrewAI/litellm e os módulos dos agentes e abre os índices da base de conhecimento"""
+    importlib.import_module("core.llm_streaming")
+    for modulo, _ in AGENTES_DISPONIVEIS.values():
+        importlib.import_module(modulo)
+    importlib.import_module("core.recuperacao").get_indice_conhecimento()
+    importlib.import_module("knowledge.indice_vetorial").get_indice_vetorial()
+
+@st.cache_resource(show_spinner=False)
+def aquecer_dependencias():
+    """Carrega as dependências pesadas em segundo plano, uma vez por processo
+    
+    Chamado depois de renderizar a tela, para que o cold start mostre a interface
+    antes do CrewAI terminar de carregar.
+    """
+    thread = threading.Thread(target=_importar_dependencias_pesadas, name="aquecimento", daemon=True)
+    thread.start()
+    return thread
 
 def display_message(message, is_user=True):
     """Exibe uma mensagem na interface com layout de chat"""
@@ -123,6 +183,29 @@ def display_message(message, is_user=True):
         </div>
         """, unsafe_allow_html=True)
 
+def display_turno(turno):
+    """Exibe um turno do histórico (mensagem do usuário e resposta da equipe)"""
+    agente = "🤝 Equipe Terapêutica Completa" if turno.get("tipo") == "inicio_sessao" else "🤝 Equipe Terapêutica"
+    display_message(turno.get("contexto", ""), is_user=True)
+    display_message({"agente": agente, "resposta": turno.get("resposta_crew", "")}, is_user=False)
+
+def display_message_stream(stream, agent_name, area=None):
+    """Exibe a resposta do agente incrementalmente conforme os fragmentos chegam"""
+    placeholder = (area or st).empty()
+    texto = ""
+    
+    for fragmento in stream:
+        texto += fragmento
+        placeholder.markdown(f"""
+        <div class="agent-response">
+            <span class="agent-badge">{agent_name}</span><br>
+            {texto}▌
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Após o stream, o resultado completo fica disponível para o histórico
+    return stream.resultado or {"success": False, "error": "Resposta vazia"}
+
 def main():
     """Função principal da aplicação"""
     initialize_session_state()
@@ -169,11 +252,19 @@ def main():
     
     with col1:
         # Mostrar mensagens se existirem
-        if st.session_state.session_started and st.session_state.messages:
+        if st.session_state.session_started and turnos_exibidos():
+            # Turnos anteriores ao anel em memória são lidos do log sob demanda
+            inicio = posicao_primeiro_turno_exibido()
+            if inicio > 0 and st.button(f"⬆️ Carregar mensagens anteriores ({inicio})"):
+                st.session_state.turnos_anteriores = (
+                    st.session_state.orchestrator.obter_turnos_anteriores(inicio)
+                    + st.session_state.turnos_anteriores
+                )
+                st.rerun()
+            
             # Mostrar mensagens em ordem cronológica
-            for i, message in enumerate(st.session_state.messages):
-                display_message(message['user'], is_user=True)
-                display_message(message['agent_response'], is_user=False)
+            for turno in turnos_exibidos():
+                display_turno(turno)
         else:
             # Mensagem de boas-vindas quando não há sessão ativa
             st.markdown("""
@@ -184,6 +275,9 @@ def main():
             </div>
             """, unsafe_allow_html=True)
         
+        # Área onde a resposta em streaming é renderizada (logo após o histórico)
+        area_stream = st.container()
+        
         # Campo de entrada sempre visível na parte inferior
         if st.session_state.session_started:
             # Sessão já iniciada - campo para continuar conversa
@@ -200,8 +294,9 @@ def main():
                 enviar_mensagem = st.button("📤 Enviar", use_container_width=True, type="primary")
             with col_clear:
                 if st.button("🗑️ Nova Conversa", use_container_width=True):
-                    st.session_state.orchestrator.limpar_sessao()
-                    st.session_state.messages = []
+                    if 'orchestrator' in st.session_state:
+                        st.session_state.orchestrator.limpar_sessao()
+                    st.session_state.turnos_anteriores = []
                     st.session_state.session_started = False
                     st.rerun()
             
@@ -219,14 +314,18 @@ def main():
             with col_start:
                 if st.button("🎯 Iniciar Sessão", use_container_width=True, type="primary"):
                     if contexto_inicial.strip():
-                        with st.spinner("Iniciando sua sessão..."):
-                            resultado = st.session_state.orchestrator.iniciar_sessao(contexto_inicial)
+                        if Config.STREAMING_ENABLED:
+                            with area_stream:
+                                display_message(contexto_inicial, is_user=True)
+                            stream = obter_orquestrador().iniciar_sessao_stream(contexto_inicial)
+                            resultado = display_message_stream(
+                                stream, "🤝 Equipe Terapêutica Completa", area=area_stream
+                            )
+                        else:
+                            with st.spinner("Iniciando sua sessão..."):
+                                resultado = obter_orquestrador().iniciar_sessao(contexto_inicial)
                         
                         if resultado['success']:
-                            st.session_state.messages.append({
-                                'user': contexto_inicial,
-                                'agent_response': resultado
-                            })
                             st.session_state.session_started = True
                             st.rerun()
                         else:
@@ -237,14 +336,16 @@ def main():
         # Processar envio de mensagem (se aplicável)
         if st.session_state.session_started and 'enviar_mensagem' in locals() and enviar_mensagem:
             if nova_mensagem and nova_mensagem.strip():
-                with st.spinner("🤝 Equipe processando sua mensagem..."):
-                    resultado = st.session_state.orchestrator.processar_mensagem(nova_mensagem)
+                if Config.STREAMING_ENABLED:
+                    with area_stream:
+                        display_message(nova_mensagem, is_user=True)
+                    stream = obter_orquestrador().processar_mensagem_stream(nova_mensagem)
+                    resultado = display_message_stream(stream, "🤝 Equipe Terapêutica", area=area_stream)
+                else:
+                    with st.spinner("🤝 Equipe processando sua mensagem..."):
+                        resultado = obter_orquestrador().processar_mensagem(nova_mensagem)
                 
                 if resultado['success']:
-                    st.session_state.messages.append({
-                        'user': nova_mensagem,
-                        'agent_response': resultado
-                    })
                     st.rerun()
                 else:
                     st.error(f"Erro: {resultado['error']}")
@@ -255,13 +356,16 @@ def main():
         st.markdown("### 📊 Status da Sessão")
         
         if st.session_state.session_started:
-            num_mensagens = len(st.session_state.messages)
+            num_mensagens = obter_orquestrador().session_state["num_interacoes"]
             st.metric("Mensagens trocadas", num_mensagens)
         
         # Informações sobre a equipe
         st.markdown("### ℹ️ Sobre a Equipe Terapêutica")
         
         st.info("🤝 **Equipe Completa:** Todos os especialistas trabalham juntos usando CrewAI para oferecer uma abordagem integrada baseada na teoria de Carter & McGoldrick.")
+    
+    # Primeira tela já renderizada: carregar o CrewAI enquanto o usuário digita
+    aquecer_dependencias()
 
 if __name__ == "__main__":
     main()
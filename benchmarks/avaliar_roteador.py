@@ -0,0 +1,147 @@
+"""
+Avaliação do roteador local contra o conjunto rotulado em roteador_eval.jsonl
+Mede acurácia de roteamento e estima as chamadas/latência de LLM economizadas
+
+Uso:
+    python benchmarks/avaliar_roteador.py [--segundos-por-chamada 3.0]
+
+Modelo de custo (estimativa, não medição):
+- paralelo: sem roteador, 4 especialistas + 1 síntese (2 etapas de latência);
+  com roteador, N especialistas + 1 síntese, ou 1 chamada direta quando o manager é pulado
+- hierárquico: o manager faz 1 chamada inicial + 1 por delegação e cada delegação
+  custa 1 chamada do especialista, tudo em série; assume-se delegação a todos os
+  especialistas presentes na crew
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.roteador import RoteadorLocal, ESPECIALISTAS
+
+CAMINHO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "roteador_eval.jsonl")
+
+def custo_paralelo(especialistas, pular_manager):
+    """(chamadas, etapas em série) no modo paralelo"""
+    if pular_manager:
+        return 1, 1
+    return len(especialistas) + 1, 2
+
+def custo_hierarquico(especialistas, pular_manager):
+    """(chamadas, etapas em série) no modo hierárquico"""
+    if pular_manager:
+        return 1, 1
+    chamadas = 1 + 2 * len(especialistas)
+    return chamadas, chamadas
+
+def avaliar(caminho: str, segundos_por_chamada: float) -> dict:
+    roteador = RoteadorLocal()
+    casos = [json.loads(linha) for linha in open(caminho, encoding="utf-8") if linha.strip()]
+
+    # Aquecimento para não medir importação/compilação de regex
+    for caso in casos[:5]:
+        roteador.rotear(caso["mensagem"])
+
+    acertos_pular = 0
+    acertos_exatos = 0
+    vp = {e: 0 for e in ESPECIALISTAS}
+    fp = {e: 0 for e in ESPECIALISTAS}
+    fn = {e: 0 for e in ESPECIALISTAS}
+    tempos = []
+    erros = []
+    economia = {"paralelo": [0, 0], "hierarquico": [0, 0]}  # [chamadas, etapas]
+
+    for caso in casos:
+        decisao = roteador.rotear(caso["mensagem"])
+        tempos.append(decisao["tempo_ms"])
+
+        esperado = set(caso["especialistas"])
+        obtido = set(decisao["especialistas"])
+
+        acertos_pular += decisao["pular_manager"] == caso["pular_manager"]
+        exato = obtido == esperado and decisao["pular_manager"] == caso["pular_manager"]
+        acertos_exatos += exato
+        if not exato:
+            erros.append({
+                "mensagem": caso["mensagem"],
+                "esperado": sorted(esperado),
+                "obtido": sorted(obtido),
+                "pular_manager": decisao["pular_manager"]
+            })
+
+        for e in ESPECIALISTAS:
+            if e in obtido and e in esperado:
+                vp[e] += 1
+            elif e in obtido:
+                fp[e] += 1
+            elif e in esperado:
+                fn[e] += 1
+
+        for modo, custo in (("paralelo", custo_paralelo), ("hierarquico", custo_hierarquico)):
+            base_chamadas, base_etapas = custo(ESPECIALISTAS, False)
+            chamadas, etapas = custo(decisao["especialistas"], decisao["pular_manager"])
+            economia[modo][0] += base_chamadas - chamadas
+            economia[modo][1] += base_etapas - etapas
+
+    total = len(casos)
+    tempos_ordenados = sorted(tempos)
+    return {
+        "casos": total,
+        "acuracia_pular_manager": acertos_pular / total,
+        "acuracia_exata": acertos_exatos / total,
+        "por_especialista": {
+            e: {
+                "precisao": vp[e] / (vp[e] + fp[e]) if vp[e] + fp[e] else None,
+                "recall": vp[e] / (vp[e] + fn[e]) if vp[e] + fn[e] else None
+            }
+            for e in ESPECIALISTAS
+        },
+        "latencia_ms": {
+            "media": statistics.mean(tempos),
+            "p50": tempos_ordenados[total // 2],
+            "p99": tempos_ordenados[min(total - 1, int(total * 0.99))],
+            "max": tempos_ordenados[-1]
+        },
+        "economia_por_turno": {
+            modo: {
+                "chamadas_llm": chamadas / total,
+                "segundos_estimados": etapas / total * segundos_por_chamada
+            }
+            for modo, (chamadas, etapas) in economia.items()
+        },
+        "erros": erros
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Avalia o roteador local")
+    parser.add_argument("--dataset", default=CAMINHO_PADRAO)
+    parser.add_argument("--segundos-por-chamada", type=float, default=3.0)
+    parser.add_argument("--json", action="store_true", help="Imprime o relatório completo em JSON")
+    args = parser.parse_args()
+
+    relatorio = avaliar(args.dataset, args.segundos_por_chamada)
+
+    if args.json:
+        print(json.dumps(relatorio, ensure_ascii=False, indent=2))
+        return
+
+    print(f"📋 Casos: {relatorio['casos']}")
+    print(f"🎯 Acurácia pular manager: {relatorio['acuracia_pular_manager']:.1%}")
+    print(f"🎯 Acurácia exata (especialistas + manager): {relatorio['acuracia_exata']:.1%}")
+    for e, m in relatorio["por_especialista"].items():
+        precisao = f"{m['precisao']:.2f}" if m["precisao"] is not None else "-"
+        recall = f"{m['recall']:.2f}" if m["recall"] is not None else "-"
+        print(f"   {e:<12} precisão={precisao} recall={recall}")
+    lat = relatorio["latencia_ms"]
+    print(f"⏱️ Latência do roteador: média={lat['media']:.3f} ms p99={lat['p99']:.3f} ms max={lat['max']:.3f} ms")
+    for modo, eco in relatorio["economia_por_turno"].items():
+        print(f"💰 {modo}: {eco['chamadas_llm']:.2f} chamadas e ~{eco['segundos_estimados']:.1f} s economizados por turno")
+    if relatorio["erros"]:
+        print(f"⚠️ {len(relatorio['erros'])} divergências (use --json para detalhes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Benchmark de cold start: tempo de importação e tempo até a primeira tela interativa
+Cada medida roda em um interpretador novo, como um container recém-iniciado com
+--min-instances 0, e o resultado é checado contra o orçamento versionado
+
+Uso:
+    python benchmarks/inicializacao.py [--repeticoes 5] [--saida resultado.json]
+    python benchmarks/inicializacao.py --comparar anterior.json
+    python benchmarks/inicializacao.py --orcamento benchmarks/orcamento_inicializacao.json
+
+Sai com código 1 se alguma mediana estourar o orçamento
+"""
+
+import os
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIR_BENCH = os.path.dirname(os.path.abspath(__file__))
+DIR_RESULTADOS = os.path.join(DIR_BENCH, "resultados")
+CAMINHO_ORCAMENTO = os.path.join(DIR_BENCH, "orcamento_inicializacao.json")
+
+# Sem chave de API: o LLM falso passa na validação e nenhum teste sai para a rede
+AMBIENTE_BENCH = {
+    "MODEL": "fake/bench",
+    "FAKE_LLM_LATENCY_SECONDS": "0",
+    "FAKE_LLM_TOKEN_LATENCY_SECONDS": "0",
+    "CACHE_ENABLED": "false",
+    "VERBOSE": "false",
+    "DEBUG": "false",
+    "PYTHONDONTWRITEBYTECODE": "1",
+}
+
+# Código de cada medida; imprime um JSON na última linha da saída
+_IMPORTACAO = """
+import sys, time, json
+inicio = time.perf_counter()
+import {modulo}
+print(json.dumps({{"ms": (time.perf_counter() - inicio) * 1000, "crewai": "crewai" in sys.modules}}))
+"""
+
+_PRIMEIRA_RENDERIZACAO = """
+import sys, time, json
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=120)
+inicio = time.perf_counter()
+app.run()
+ms = (time.perf_counter() - inicio) * 1000
+interativa = len(app.text_area) > 0 and len(app.button) > 0 and not app.exception
+print(json.dumps({"ms": ms, "interativa": interativa}))
+"""
+
+_PRIMEIRO_TURNO = """
+import sys, time, json
+inicio = time.perf_counter()
+from crew_orchestrator import TerapiaCrewOrchestrator
+orquestrador = TerapiaCrewOrchestrator()
+resultado = orquestrador.iniciar_sessao("Oi, tudo bem?")
+print(json.dumps({"ms": (time.perf_counter() - inicio) * 1000, "sucesso": resultado["success"]}))
+"""
+
+MEDIDAS = {
+    "importacao_config_ms": _IMPORTACAO.format(modulo="config"),
+    "importacao_crew_orchestrator_ms": _IMPORTACAO.format(modulo="crew_orchestrator"),
+    "importacao_crewai_ms": _IMPORTACAO.format(modulo="crewai"),
+    "primeira_renderizacao_ms": _PRIMEIRA_RENDERIZACAO,
+    "primeiro_turno_ms": _PRIMEIRO_TURNO,
+}
+
+
+def medir(codigo: str) -> dict:
+    """Roda o código em um interpretador novo e devolve o JSON que ele imprimiu"""
+    ambiente = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+    ambiente.update(AMBIENTE_BENCH)
+    processo = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=RAIZ, env=ambiente,
+        capture_output=True, text=True, timeout=300
+    )
+    if processo.returncode != 0:
+        raise RuntimeError(f"Medida falhou:\n{processo.stderr[-2000:]}")
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def resumir(amostras: dict) -> dict:
+    resumo = {}
+    for nome, lista in amostras.items():
+        tempos = [amostra["ms"] for amostra in lista]
+        resumo[nome] = {
+            "mediana": statistics.median(tempos),
+            "min": min(tempos),
+            "max": max(tempos)
+        }
+    resumo["crewai_na_importacao"] = any(
+        amostra["crewai"]
+        for nome in ("importacao_config_ms", "importacao_crew_orchestrator_ms")
+        for amostra in amostras[nome]
+    )
+    resumo["primeira_tela_interativa"] = all(a["interativa"] for a in amostras["primeira_renderizacao_ms"])
+    resumo["primeiro_turno_sucesso"] = all(a["sucesso"] for a in amostras["primeiro_turno_ms"])
+    return resumo
+
+
+def checar_orcamento(resumo: dict, orcamento: dict) -> list:
+    """Lista das violações do orçamento (vazia se tudo dentro)"""
+    violacoes = []
+    for metrica, limite in orcamento.items():
+        if isinstance(limite, bool):
+            if resumo.get(metrica) != limite:
+                violacoes.append(f"{metrica}: esperado {limite}, obtido {resumo.get(metrica)}")
+        elif resumo[metrica]["mediana"] > limite:
+            violacoes.append(f"{metrica}: {resumo[metrica]['mediana']:.0f} ms > {limite} ms")
+    if not resumo["primeira_tela_interativa"]:
+        violacoes.append("primeira renderização sem campo de entrada/botão ou com exceção")
+    return violacoes
+
+
+def metadados(args) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    try:
+        from importlib.metadata import version
+        versao_crewai = version("crewai")
+    except Exception:
+        versao_crewai = None
+    return {
+        "commit": commit,
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "crewai": versao_crewai,
+        "repeticoes": args.repeticoes
+    }
+
+
+def imprimir(resumo: dict, violacoes: list):
+    print("🚀 Inicialização (mediana de interpretadores novos)")
+    for nome in MEDIDAS:
+        print(f"   {nome:<34} {resumo[nome]['mediana']:>8.0f} ms "
+              f"(min {resumo[nome]['min']:.0f}, max {resumo[nome]['max']:.0f})")
+    print(f"   crewai carregado na importação: {resumo['crewai_na_importacao']}")
+    if violacoes:
+        print("❌ Orçamento estourado:")
+        for violacao in violacoes:
+            print(f"   - {violacao}")
+    else:
+        print("✅ Dentro do orçamento")
+
+
+def comparar(anterior: dict, atual: dict):
+    print(f"🔍 Comparação: {anterior['metadados'].get('commit')} → {atual['metadados'].get('commit')}")
+    for nome in MEDIDAS:
+        if nome not in anterior["resumo"]:
+            continue
+        valor_base = anterior["resumo"][nome]["mediana"]
+        valor = atual["resumo"][nome]["mediana"]
+        variacao = (valor - valor_base) / valor_base * 100 if valor_base else 0.0
+        print(f"   {nome:<34} {valor_base:>8.0f} → {valor:>8.0f} ms ({variacao:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de cold start da aplicação")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--orcamento", default=CAMINHO_ORCAMENTO, help="JSON com os limites por métrica")
+    parser.add_argument("--saida", help="Arquivo JSON de resultado (padrão: benchmarks/resultados/inicializacao_<commit>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    amostras = {nome: [] for nome in MEDIDAS}
+    for _ in range(args.repeticoes):
+        for nome, codigo in MEDIDAS.items():
+            amostras[nome].append(medir(codigo))
+
+    with open(args.orcamento, encoding="utf-8") as arquivo:
+        orcamento = json.load(arquivo)
+
+    resumo = resumir(amostras)
+    violacoes = checar_orcamento(resumo, orcamento)
+    relatorio = {
+        "metadados": metadados(args),
+        "orcamento": orcamento,
+        "resumo": resumo,
+        "violacoes": violacoes,
+        "amostras": amostras
+    }
+
+    imprimir(resumo, violacoes)
+
+    saida = args.saida or os.path.join(
+        DIR_RESULTADOS, f"inicializacao_{relatorio['metadados']['commit'] or 'sem_commit'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"💾 Resultado salvo em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            comparar(json.load(arquivo), relatorio)
+
+    sys.exit(1 if violacoes else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Benchmark do overhead de framework (CrewAI/Python) dos dois orquestradores
+Roda sessões roteirizadas contra o LLM falso com latência zero, então todo o tempo
+medido é da aplicação e do CrewAI, não do modelo
+
+Uso:
+    python benchmarks/overhead_orquestradores.py [--repeticoes 3] [--saida resultado.json]
+    python benchmarks/overhead_orquestradores.py --comparar anterior.json
+
+Por turno: tempo de parede, tempo/contagem de construção de Crew/Task/Agent, bytes de
+prompt, chamadas ao LLM e, numa passada separada com tracemalloc, alocações
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import threading
+import tracemalloc
+from datetime import datetime, timezone
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+CAMINHO_SESSOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessoes_bench.json")
+DIR_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+
+# Ambiente do benchmark: LLM falso sem latência e sem políticas que mascaram o custo
+AMBIENTE_BENCH = {
+    "MODEL": "fake/bench",
+    "FAKE_LLM_LATENCY_SECONDS": "0",
+    "FAKE_LLM_TOKEN_LATENCY_SECONDS": "0",
+    "CACHE_ENABLED": "false",
+    "LLM_REQUESTS_PER_MINUTE": "0",
+    "LLM_TOKENS_PER_MINUTE": "0",
+    "TURN_DEADLINE_SECONDS": "0",
+    "VERBOSE": "false",
+    "DEBUG": "false",
+}
+
+METRICAS_TURNO = ("parede_ms", "construcao_ms", "crews", "tasks", "agents",
+                  "bytes_prompt", "chamadas_llm")
+
+
+class MedidorConstrucao:
+    """Mede o tempo gasto construindo Crew, Task e Agent (só o nível mais externo soma no total)"""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._lock:
+            self.tempo = 0.0
+            self.contagem = {"Crew": 0, "Task": 0, "Agent": 0}
+
+    def instrumentar(self, classe):
+        original = classe.__init__
+        nome = classe.__name__
+        medidor = self
+
+        def __init__(instancia, *args, **kwargs):
+            profundidade = getattr(medidor._local, "profundidade", 0)
+            medidor._local.profundidade = profundidade + 1
+            inicio = time.perf_counter()
+            try:
+                original(instancia, *args, **kwargs)
+            finally:
+                duracao = time.perf_counter() - inicio
+                medidor._local.profundidade = profundidade
+                with medidor._lock:
+                    medidor.contagem[nome] += 1
+                    if profundidade == 0:
+                        medidor.tempo += duracao
+
+        classe.__init__ = __init__
+
+
+def aguardar_insights(resultado: dict, limite_segundos: float = 10.0):
+    """Espera a análise de insights em background do turno (para não vazar no próximo turno)"""
+    resposta = resultado.get("resposta")
+    if not isinstance(resposta, dict):
+        return
+    fim = time.monotonic() + limite_segundos
+    while resposta.get("insights_pendentes") and time.monotonic() < fim:
+        time.sleep(0.001)
+
+
+def executar_turnos(orquestrador, sessao: dict, por_agente: bool, medir_turno) -> list:
+    """Executa a sessão roteirizada e devolve as medições de cada turno"""
+    turnos = [medir_turno("inicio", lambda: orquestrador.iniciar_sessao(sessao["contexto_inicial"]))]
+    for mensagem in sessao["mensagens"]:
+        if por_agente:
+            agente = orquestrador.obter_sugestoes_agente(mensagem)[0]
+            turnos.append(medir_turno(agente, lambda: orquestrador.processar_mensagem(mensagem, agente)))
+        else:
+            turnos.append(medir_turno("crew", lambda: orquestrador.processar_mensagem(mensagem)))
+    return turnos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de overhead dos orquestradores")
+    parser.add_argument("--sessoes", default=CAMINHO_SESSOES)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--modos", default="hierarquico,paralelo",
+                        help="Modos do TerapiaCrewOrchestrator a medir")
+    parser.add_argument("--sem-alocacoes", action="store_true", help="Pula a passada com tracemalloc")
+    parser.add_argument("--saida", help="Arquivo JSON de resultado (padrão: benchmarks/resultados/<commit>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args()
+
+    os.environ.update(AMBIENTE_BENCH)
+
+    from crewai import Crew, Task, Agent
+    from core.llm_fake import contadores_fake
+
+    medidor = MedidorConstrucao()
+    for classe in (Crew, Task, Agent):
+        medidor.instrumentar(classe)
+
+    def medir_turno(rotulo, executar):
+        medidor.zerar()
+        antes = contadores_fake.estatisticas()
+        inicio = time.perf_counter()
+        resultado = executar()
+        parede = time.perf_counter() - inicio
+        aguardar_insights(resultado)
+        depois = contadores_fake.estatisticas()
+        if not resultado.get("success"):
+            raise RuntimeError(f"Turno '{rotulo}' falhou: {resultado.get('error')}")
+        return {
+            "rotulo": rotulo,
+            "parede_ms": parede * 1000,
+            "construcao_ms": medidor.tempo * 1000,
+            "crews": medidor.contagem["Crew"],
+            "tasks": medidor.contagem["Task"],
+            "agents": medidor.contagem["Agent"],
+            "bytes_prompt": depois["bytes_prompt"] - antes["bytes_prompt"],
+            "chamadas_llm": depois["chamadas"] - antes["chamadas"]
+        }
+
+    from orchestrator import TerapiaOrchestrator
+    from crew_orchestrator import TerapiaCrewOrchestrator
+
+    sessoes = json.load(open(args.sessoes, encoding="utf-8"))
+    alvos = [("orchestrator", lambda: TerapiaOrchestrator(), True)] + [
+        (f"crew_{modo}", (lambda modo=modo: TerapiaCrewOrchestrator(modo)), False)
+        for modo in args.modos.split(",") if modo
+    ]
+
+    relatorio = {"metadados": metadados(args), "orquestradores": {}}
+
+    for nome, criar, por_agente in alvos:
+        print(f"⏱️ {nome}...", file=sys.stderr)
+        inicializacoes = []
+        turnos_por_repeticao = []
+
+        for _ in range(args.repeticoes):
+            for sessao in sessoes:
+                medidor.zerar()
+                inicio = time.perf_counter()
+                orquestrador = criar()
+                inicializacoes.append({
+                    "parede_ms": (time.perf_counter() - inicio) * 1000,
+                    "construcao_ms": medidor.tempo * 1000,
+                    "agents": medidor.contagem["Agent"]
+                })
+                turnos_por_repeticao.append(
+                    (sessao["nome"], executar_turnos(orquestrador, sessao, por_agente, medir_turno))
+                )
+
+        alocacoes = None if args.sem_alocacoes else medir_alocacoes(criar, sessoes, por_agente)
+
+        relatorio["orquestradores"][nome] = resumir(inicializacoes, turnos_por_repeticao, alocacoes)
+
+    caminho = args.saida or os.path.join(DIR_RESULTADOS, f"overhead_{relatorio['metadados']['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+
+    imprimir(relatorio)
+    print(f"💾 Resultado salvo em {caminho}")
+
+    if args.comparar:
+        comparar(json.load(open(args.comparar, encoding="utf-8")), relatorio)
+
+
+def medir_alocacoes(criar, sessoes: list, por_agente: bool) -> dict:
+    """Passada separada com tracemalloc (que distorce o tempo): pico e saldo de memória por turno"""
+    picos = []
+    saldos = []
+
+    def medir(rotulo, executar):
+        tracemalloc.reset_peak()
+        antes, _ = tracemalloc.get_traced_memory()
+        resultado = executar()
+        aguardar_insights(resultado)
+        depois, pico = tracemalloc.get_traced_memory()
+        picos.append((pico - antes) / 1024)
+        saldos.append((depois - antes) / 1024)
+        return {}
+
+    tracemalloc.start()
+    try:
+        for sessao in sessoes:
+            executar_turnos(criar(), sessao, por_agente, medir)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "pico_kib_media": statistics.mean(picos),
+        "pico_kib_max": max(picos),
+        "saldo_kib_media": statistics.mean(saldos)
+    }
+
+
+def resumir(inicializacoes: list, turnos_por_repeticao: list, alocacoes: dict) -> dict:
+    todos = [turno for _, turnos in turnos_por_repeticao for turno in turnos]
+
+    # Detalhe por turno: mediana entre as repetições de cada (sessão, posição)
+    detalhe = {}
+    for sessao, turnos in turnos_por_repeticao:
+        for posicao, turno in enumerate(turnos):
+            detalhe.setdefault((sessao, posicao), []).append(turno)
+
+    return {
+        "inicializacao": {
+            "parede_ms_mediana": statistics.median(i["parede_ms"] for i in inicializacoes),
+            "construcao_ms_mediana": statistics.median(i["construcao_ms"] for i in inicializacoes),
+            "agents": inicializacoes[0]["agents"]
+        },
+        "por_turno": {
+            metrica: {
+                "media": statistics.mean(t[metrica] for t in todos),
+                "mediana": statistics.median(t[metrica] for t in todos),
+                "max": max(t[metrica] for t in todos)
+            }
+            for metrica in METRICAS_TURNO
+        },
+        "alocacoes": alocacoes,
+        "turnos": [
+            {
+                "sessao": sessao,
+                "turno": posicao,
+                "rotulo": medicoes[0]["rotulo"],
+                **{m: statistics.median(t[m] for t in medicoes) for m in METRICAS_TURNO}
+            }
+            for (sessao, posicao), medicoes in detalhe.items()
+        ]
+    }
+
+
+def metadados(args) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        commit = None
+    try:
+        from importlib.metadata import version
+        versao_crewai = version("crewai")
+    except Exception:
+        versao_crewai = None
+    return {
+        "commit": commit,
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "crewai": versao_crewai,
+        "repeticoes": args.repeticoes,
+        "sessoes": os.path.basename(args.sessoes)
+    }
+
+
+def imprimir(relatorio: dict):
+    for nome, dados in relatorio["orquestradores"].items():
+        turno = dados["por_turno"]
+        ini = dados["inicializacao"]
+        print(f"📊 {nome}")
+        print(f"   inicialização: {ini['parede_ms_mediana']:.1f} ms ({ini['agents']} agents)")
+        print(f"   turno: parede={turno['parede_ms']['mediana']:.1f} ms "
+              f"construção={turno['construcao_ms']['mediana']:.1f} ms "
+              f"chamadas={turno['chamadas_llm']['media']:.2f} "
+              f"prompt={turno['bytes_prompt']['media'] / 1024:.1f} KiB")
+        if dados["alocacoes"]:
+            print(f"   alocações: pico={dados['alocacoes']['pico_kib_media']:.0f} KiB/turno")
+
+
+def comparar(anterior: dict, atual: dict):
+    """Imprime a variação das métricas principais entre duas execuções"""
+    print(f"🔍 Comparação: {anterior['metadados'].get('commit')} → {atual['metadados'].get('commit')}")
+    for nome, dados in atual["orquestradores"].items():
+        base = anterior["orquestradores"].get(nome)
+        if base is None:
+            continue
+        print(f"   {nome}")
+        pares = [("inicializacao", "parede_ms_mediana")] + [("por_turno", m) for m in METRICAS_TURNO]
+        for secao, metrica in pares:
+            valor_base = base[secao][metrica]
+            valor = dados[secao][metrica]
+            if secao == "por_turno":
+                valor_base, valor = valor_base["mediana"], valor["mediana"]
+            variacao = (valor - valor_base) / valor_base * 100 if valor_base else 0.0
+            print(f"      {metrica:<20} {valor_base:>10.2f} → {valor:>10.2f} ({variacao:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Micro-benchmark da detecção de palavras-chave em relatos longos
+Compara a varredura linear antiga (cada detector normaliza o texto e procura cada palavra
+com `in`) com o autômato de core.palavras_chave (uma passada para todos os vocabulários,
+feita na extração de core.caracteristicas e reaproveitada pelos detectores do mesmo turno)
+
+Uso:
+    python benchmarks/palavras_chave.py [--repeticoes 200] [--tamanhos 300,2000,10000,50000]
+
+Os relatos são montados concatenando as mensagens de roteador_eval.jsonl até o tamanho
+pedido, simulando históricos familiares colados de uma vez na conversa
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.palavras_chave import get_automato, normalizar_texto
+from core.caracteristicas import buscar_palavras_chave, _extrair
+from knowledge.vocabularios import VOCABULARIOS
+
+CAMINHO_MENSAGENS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "roteador_eval.jsonl")
+
+# Detectores que olham a mensagem num turno do modo paralelo: roteador (agentes,
+# triangulações, padrões, variações), contribuições de padrões, ciclo de vida e reflexão
+DETECTORES_POR_TURNO = [
+    "agentes", "triangulacoes", "padroes_geracionais", "variacoes_ciclo_vida",
+    "triangulacoes", "padroes_geracionais",
+    "variacoes_ciclo_vida",
+    "contexto_quebra_gelo"
+]
+
+def varredura_linear(vocabulario: str, texto: str) -> list:
+    """Implementação anterior (com a mesma normalização): um `in` por palavra, a cada chamada"""
+    texto_normalizado = normalizar_texto(texto)
+    return [
+        categoria for categoria, palavras in VOCABULARIOS[vocabulario].items()
+        if any(normalizar_texto(palavra) in texto_normalizado for palavra in palavras)
+    ]
+
+def montar_relato(mensagens: list, tamanho: int) -> str:
+    partes, total, i = [], 0, 0
+    while total < tamanho:
+        mensagem = mensagens[i % len(mensagens)]
+        partes.append(mensagem)
+        total += len(mensagem) + 1
+        i += 1
+    return " ".join(partes)[:tamanho]
+
+def medir_us(funcao, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1e6)
+    return statistics.median(tempos)
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark da detecção de palavras-chave")
+    parser.add_argument("--repeticoes", type=int, default=200)
+    parser.add_argument("--tamanhos", default="300,2000,10000,50000",
+                        help="Tamanhos dos relatos em caracteres, separados por vírgula")
+    args = parser.parse_args()
+
+    mensagens = [json.loads(linha)["mensagem"] for linha in open(CAMINHO_MENSAGENS, encoding="utf-8") if linha.strip()]
+
+    inicio = time.perf_counter()
+    automato = get_automato()
+    print(f"🔤 Autômato: {automato.num_estados} estados, "
+          f"{sum(len(p) for v in VOCABULARIOS.values() for p in v.values())} palavras em "
+          f"{len(VOCABULARIOS)} vocabulários, compilado em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    for tamanho in [int(t) for t in args.tamanhos.split(",")]:
+        relato = montar_relato(mensagens, tamanho)
+
+        # Mesmo resultado que a varredura antiga, vocabulário a vocabulário
+        encontradas = buscar_palavras_chave(relato)
+        for vocabulario in VOCABULARIOS:
+            assert list(encontradas[vocabulario]) == varredura_linear(vocabulario, relato), vocabulario
+
+        def turno_linear():
+            for vocabulario in DETECTORES_POR_TURNO:
+                varredura_linear(vocabulario, relato)
+
+        def todos_linear():
+            for vocabulario in VOCABULARIOS:
+                varredura_linear(vocabulario, relato)
+
+        def turno_automato():
+            # Cache vazio: uma extração; os demais detectores do turno reaproveitam o resultado
+            _extrair.cache_clear()
+            for vocabulario in DETECTORES_POR_TURNO:
+                buscar_palavras_chave(relato)[vocabulario]
+
+        linear_turno = medir_us(turno_linear, args.repeticoes)
+        linear_todos = medir_us(todos_linear, args.repeticoes)
+        automato_turno = medir_us(turno_automato, args.repeticoes)
+
+        print(f"📄 {len(relato):>6} caracteres")
+        print(f"   varredura linear: turno={linear_turno:9.1f} µs  todos os vocabulários={linear_todos:9.1f} µs")
+        print(f"   autômato:         turno={automato_turno:9.1f} µs  "
+              f"({linear_turno / automato_turno:.2f}x do turno, {linear_todos / automato_turno:.2f}x de todos)")
+
+if __name__ == "__main__":
+    main()
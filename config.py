@@ -3,8 +3,13 @@ Configuração centralizada para o MVP de Terapia Familiar
 """
 
 import os
-from crewai import LLM
 import logging
+from typing import TYPE_CHECKING
+from core.llm_pool import llm_pool, eh_modelo_fake
+
+if TYPE_CHECKING:
+    # O CrewAI (e o litellm) só é importado na criação do primeiro LLM (core.llm_pool)
+    from crewai import LLM
 
 # Tentar carregar .env para desenvolvimento local
 try:
@@ -14,6 +19,9 @@ except ImportError:
     # dotenv não disponível - isso é normal no Streamlit Cloud
     pass
 
+# Artefatos compilados da base de conhecimento ficam no projeto, qualquer que seja o diretório atual
+DIR_CACHE_PROJETO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,6 +38,18 @@ class Config:
     LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
     LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "2048"))
     
+    # Orçamento de tokens de entrada por prompt (core.contexto): seções de histórico e
+    # conhecimento são cortadas para caber; nunca passa de MODEL_CONTEXT_TOKENS - LLM_MAX_TOKENS
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "6000"))  # 0 = só o limite do modelo
+    MODEL_CONTEXT_TOKENS = int(os.getenv("MODEL_CONTEXT_TOKENS", "1000000"))  # Gemini 1.5 Flash
+    
+    # LLM falso para execuções offline (MODEL=fake/<perfil>): latência, tokens e roteiro
+    FAKE_LLM_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_LATENCY_SECONDS", "0"))
+    FAKE_LLM_TOKEN_LATENCY_SECONDS = float(os.getenv("FAKE_LLM_TOKEN_LATENCY_SECONDS", "0"))
+    FAKE_LLM_OUTPUT_TOKENS = int(os.getenv("FAKE_LLM_OUTPUT_TOKENS", "60"))
+    FAKE_LLM_MAX_DELEGATIONS = int(os.getenv("FAKE_LLM_MAX_DELEGATIONS", "-1"))  # -1 = todos os colegas
+    FAKE_LLM_SCRIPT = os.getenv("FAKE_LLM_SCRIPT", "")
+    
     # Configurações da aplicação
     APP_TITLE = os.getenv("APP_TITLE", "Terapia Familiar MVP")
     APP_DESCRIPTION = os.getenv("APP_DESCRIPTION", "Sistema de apoio emocional baseado em Carter & McGoldrick")
@@ -39,6 +59,93 @@ class Config:
     MEMORY_PROVIDER = os.getenv("MEMORY_PROVIDER", "local")
     MEMORY_DIR = os.getenv("MEMORY_DIR", "./crew_memory")
     
+    # Cache de respostas dos agentes (LRU em memória + SQLite WAL compartilhado)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "./cache/respostas.sqlite3")
+    CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "86400"))
+    CACHE_MEMORY_ITEMS = int(os.getenv("CACHE_MEMORY_ITEMS", "512"))
+    CACHE_MAX_ROWS = int(os.getenv("CACHE_MAX_ROWS", "50000"))
+    
+    # Snapshot compilado da base de conhecimento (knowledge.base_compilada), aberto com mmap;
+    # gerado no build por `python -m knowledge.base_compilada` ou na primeira abertura
+    KNOWLEDGE_SNAPSHOT_PATH = os.getenv("KNOWLEDGE_SNAPSHOT_PATH", os.path.join(DIR_CACHE_PROJETO, "base_conhecimento.kb"))
+    
+    # Recuperação (core.recuperacao): cada chamada ao LLM recebe as passagens da base mais
+    # relevantes para a mensagem do turno (BM25), até RAG_TOP_K passagens e RAG_MAX_TOKENS
+    RAG_ENABLED = os.getenv("RAG_ENABLED", "true").lower() == "true"
+    RAG_TOP_K = int(os.getenv("RAG_TOP_K", "3"))
+    RAG_MAX_TOKENS = int(os.getenv("RAG_MAX_TOKENS", "600"))
+    
+    # Índice vetorial de quebra-gelos e sinais de triangulação (knowledge.indice_vetorial):
+    # .npy gerados no build por `python -m knowledge.indice_vetorial` ou na primeira abertura
+    VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(DIR_CACHE_PROJETO, "indice_vetorial"))
+    SEMANTIC_MIN_SCORE = float(os.getenv("SEMANTIC_MIN_SCORE", "0.1"))  # cosseno mínimo de um match
+    
+    # Estado das sessões: "memoria" (por processo) ou "sqlite" (arquivo WAL; em volume
+    # compartilhado, qualquer instância retoma a sessão pelo id)
+    SESSION_STORE = os.getenv("SESSION_STORE", "memoria").lower()
+    SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "./cache/sessoes.sqlite3")
+    # Turnos recentes mantidos em memória (anel compartilhado por interface e orquestradores);
+    # os anteriores ficam no log em disco e são lidos de HISTORY_PAGE_SIZE em HISTORY_PAGE_SIZE
+    SESSION_HISTORY_LOAD_LIMIT = int(os.getenv("SESSION_HISTORY_LOAD_LIMIT", "20"))
+    HISTORY_LOG_DIR = os.getenv("HISTORY_LOG_DIR", "./cache/historico")  # Log do store em memória
+    HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "10"))
+    SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "604800"))
+    # Sessões do store em memória (e seus logs em HISTORY_LOG_DIR) expiram após esse
+    # tempo sem atividade: nem a memória do processo nem o disco crescem com as sessões
+    SESSION_MEMORY_TTL_SECONDS = float(os.getenv("SESSION_MEMORY_TTL_SECONDS", "3600"))
+    
+    # Coalescência de chamadas idênticas em andamento (mesma chave do cache)
+    SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    
+    # Agendador de chamadas ao LLM (por instância do Cloud Run): token bucket de
+    # requisições e tokens por minuto com fila justa entre sessões; 0 desativa o limite
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+    LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "250000"))
+    LLM_OUTPUT_TOKENS_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKENS_ESTIMATE", "512"))
+    LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "3"))
+    
+    # Execução da crew: "hierarquico" (manager delega em série) ou "paralelo"
+    # (especialistas em paralelo + síntese do terapeuta principal)
+    EXECUTION_MODE = os.getenv("EXECUTION_MODE", "hierarquico").lower()
+    FANOUT_MAX_WORKERS = int(os.getenv("FANOUT_MAX_WORKERS", "8"))
+    
+    # Trabalho em background (insights, resumos): pool próprio, separado do fan-out do
+    # turno, e prazo por tarefa (0 desativa)
+    BACKGROUND_MAX_WORKERS = int(os.getenv("BACKGROUND_MAX_WORKERS", "2"))
+    BACKGROUND_TIMEOUT_SECONDS = float(os.getenv("BACKGROUND_TIMEOUT_SECONDS", "90"))
+    
+    # Análise em lote (analise_lote.py): processos da análise local (0 = número de CPUs)
+    # e chamadas simultâneas ao LLM (ainda sujeitas à cota do agendador)
+    BATCH_PROCESSES = int(os.getenv("BATCH_PROCESSES", "0"))
+    BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+    
+    # Templates de crew montados uma vez por processo (inputs ligados a cada kickoff)
+    CREW_TEMPLATES_ENABLED = os.getenv("CREW_TEMPLATES_ENABLED", "true").lower() == "true"
+    
+    # Orçamento de latência por turno (0 desativa); os especialistas/crew param
+    # TURN_FALLBACK_RESERVE_SECONDS antes do fim para sobrar tempo à resposta do terapeuta
+    TURN_DEADLINE_SECONDS = float(os.getenv("TURN_DEADLINE_SECONDS", "60"))
+    TURN_FALLBACK_RESERVE_SECONDS = float(os.getenv("TURN_FALLBACK_RESERVE_SECONDS", "15"))
+    
+    # Roteador local que escolhe especialistas e pula o manager em cumprimentos
+    ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "true").lower() == "true"
+    
+    # Streaming da resposta final para a interface
+    STREAMING_ENABLED = os.getenv("STREAMING_ENABLED", "true").lower() == "true"
+    
+    # Resumo incremental do histórico (em background a cada SUMMARY_EVERY_TURNS turnos):
+    # os prompts levam o resumo + os turnos que ele ainda não cobre (no mínimo os
+    # SUMMARY_VERBATIM_TURNS últimos)
+    SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+    SUMMARY_EVERY_TURNS = int(os.getenv("SUMMARY_EVERY_TURNS", "4"))
+    SUMMARY_VERBATIM_TURNS = int(os.getenv("SUMMARY_VERBATIM_TURNS", "3"))
+    SUMMARY_MAX_WORDS = int(os.getenv("SUMMARY_MAX_WORDS", "150"))
+    
+    # Análise de insights do terapeuta principal: "background" (segunda chamada fora
+    # do caminho da resposta), "estruturado" (uma chamada só) ou "sincrono" (legado)
+    INSIGHTS_MODE = os.getenv("INSIGHTS_MODE", "background").lower()
+    
     # Para Cloud Run
     PORT = int(os.getenv("PORT", 8080))
     
@@ -47,26 +154,41 @@ class Config:
     VERBOSE = os.getenv("VERBOSE", "true").lower() == "true"
     
     @classmethod
-    def get_llm(cls, temperature: float = None) -> LLM:
-        """Retorna uma instância configurada do LLM usando CrewAI"""
-        
-        # Configurar variáveis de ambiente necessárias
-        os.environ["GEMINI_API_KEY"] = cls.GEMINI_API_KEY
-        os.environ["OPENAI_API_KEY"] = cls.OPENAI_API_KEY
-        
-        llm = LLM(
+    def get_llm(cls, temperature: float = None) -> "LLM":
+        """Retorna a instância LLM compartilhada do pool do processo"""
+        # Reutiliza clientes (e conexões HTTP) por (modelo, temperatura, max_tokens)
+        # sem reescrever os.environ a cada chamada
+        return llm_pool.obter(
             model=cls.MODEL,
             temperature=temperature or cls.LLM_TEMPERATURE,
+            max_tokens=cls.LLM_MAX_TOKENS,
+            api_key=cls.GEMINI_API_KEY,
+            fallback_openai_key=cls.OPENAI_API_KEY
         )
-        
-        logger.info(f"✅ LLM configurado: {cls.MODEL}")
-        return llm
+    
+    @classmethod
+    def get_manager_llm(cls) -> "LLM":
+        """Retorna a instância LLM dedicada ao manager da crew hierárquica"""
+        return llm_pool.obter(
+            model=cls.MODEL,
+            temperature=cls.LLM_TEMPERATURE,
+            max_tokens=cls.LLM_MAX_TOKENS,
+            api_key=cls.GEMINI_API_KEY,
+            fallback_openai_key=cls.OPENAI_API_KEY,
+            canal="manager"
+        )
+    
+    @classmethod
+    def usa_llm_fake(cls) -> bool:
+        """Indica se o modelo configurado é o LLM falso offline (MODEL=fake/...)"""
+        return eh_modelo_fake(cls.MODEL)
     
     @classmethod
     def validate_config(cls):
         """Valida se todas as configurações necessárias estão presentes"""
         
-        if not cls.GEMINI_API_KEY:
+        # O LLM falso roda offline e não precisa de chave
+        if not cls.GEMINI_API_KEY and not cls.usa_llm_fake():
             # Mensagem mais informativa para deployment
             error_msg = """
 ❌ GEMINI_API_KEY não configurada!
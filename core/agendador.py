@@ -0,0 +1,267 @@
+"""
+Agendador central das chamadas ao LLM
+Token bucket de requisições/min e tokens/min com fila justa (round-robin) entre sessões,
+para que a cota do Gemini vire espera curta em vez de erro 429
+"""
+
+import time
+import threading
+import contextvars
+import logging
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Optional
+
+from core.prazo import prazo_atual, PrazoExcedido
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Aproximação usada para estimar tokens sem tokenizer (português, modelos Gemini)
+CARACTERES_POR_TOKEN = 4
+
+SESSAO_ANONIMA = "anonima"
+
+_sessao_atual: contextvars.ContextVar[str] = contextvars.ContextVar("sessao_llm", default=SESSAO_ANONIMA)
+
+def definir_sessao_llm(sessao_id: str):
+    """Associa as chamadas ao LLM do contexto atual (e das threads derivadas) a uma sessão"""
+    _sessao_atual.set(sessao_id or SESSAO_ANONIMA)
+
+def sessao_llm_atual() -> str:
+    return _sessao_atual.get()
+
+def estimar_tokens(texto: str) -> int:
+    """Estimativa barata de tokens a partir do número de caracteres"""
+    return len(texto or "") // CARACTERES_POR_TOKEN + 1
+
+class ChamadaNaoRepetivel(Exception):
+    """Falha de uma chamada que já entregou tokens à interface: repeti-la duplicaria o trecho"""
+
+
+def eh_erro_limite(erro: Exception) -> bool:
+    """Indica se a exceção do provedor é de cota/rate limit (HTTP 429)"""
+    if isinstance(erro, ChamadaNaoRepetivel):
+        return False
+    try:
+        from litellm.exceptions import RateLimitError
+        if isinstance(erro, RateLimitError):
+            return True
+    except ImportError:
+        pass
+    texto = str(erro)
+    return "429" in texto or "RESOURCE_EXHAUSTED" in texto or "rate limit" in texto.lower()
+
+
+class BaldeTokens:
+    """Token bucket com reposição contínua; não é thread-safe (usado sob o lock do agendador)"""
+
+    def __init__(self, capacidade_por_minuto: float):
+        self.capacidade = float(capacidade_por_minuto)
+        self.taxa_por_segundo = self.capacidade / 60.0
+        self.disponivel = self.capacidade
+        self._ultima_reposicao = time.monotonic()
+
+    def _repor(self):
+        agora = time.monotonic()
+        self.disponivel = min(
+            self.capacidade,
+            self.disponivel + (agora - self._ultima_reposicao) * self.taxa_por_segundo
+        )
+        self._ultima_reposicao = agora
+
+    def tempo_ate_disponivel(self, quantidade: float) -> float:
+        """Segundos até haver `quantidade` disponível (pedidos maiores que o balde esperam enchê-lo)"""
+        self._repor()
+        falta = min(quantidade, self.capacidade) - self.disponivel
+        return max(0.0, falta / self.taxa_por_segundo)
+
+    def consumir(self, quantidade: float):
+        self._repor()
+        self.disponivel -= min(quantidade, self.capacidade)
+
+    def ajustar(self, diferenca: float):
+        """Corrige o consumo após a chamada (diferença entre uso real e estimado); pode ficar negativo"""
+        self._repor()
+        self.disponivel = min(self.capacidade, self.disponivel - diferenca)
+
+    def esvaziar(self):
+        self._repor()
+        self.disponivel = min(self.disponivel, 0.0)
+
+
+class _Pedido:
+    __slots__ = ("sessao", "tokens", "chegada")
+
+    def __init__(self, sessao: str, tokens: int):
+        self.sessao = sessao
+        self.tokens = tokens
+        self.chegada = time.monotonic()
+
+
+class AgendadorLLM:
+    """Libera chamadas ao LLM respeitando a cota, alternando entre sessões com pedidos na fila"""
+
+    def __init__(self, requisicoes_por_minuto: int, tokens_por_minuto: int,
+                 tentativas_limite: int = 3, espera_limite_segundos: float = 2.0):
+        self.balde_requisicoes = BaldeTokens(requisicoes_por_minuto) if requisicoes_por_minuto > 0 else None
+        self.balde_tokens = BaldeTokens(tokens_por_minuto) if tokens_por_minuto > 0 else None
+        self.tentativas_limite = tentativas_limite
+        self.espera_limite_segundos = espera_limite_segundos
+
+        self._cond = threading.Condition()
+        # Uma fila FIFO por sessão; a ordem do OrderedDict é a vez de cada sessão
+        self._filas: "OrderedDict[str, Deque[_Pedido]]" = OrderedDict()
+
+        # Métricas
+        self.chamadas = 0
+        self.esperas_total = 0.0
+        self.espera_maxima = 0.0
+        self.erros_limite = 0
+        self.desistencias = 0
+        self._esperas_recentes: Deque[float] = deque(maxlen=1000)
+
+    def _proximo(self) -> Optional[_Pedido]:
+        if not self._filas:
+            return None
+        return next(iter(self._filas.values()))[0]
+
+    def _tempo_ate_liberar(self, pedido: _Pedido) -> float:
+        espera = 0.0
+        if self.balde_requisicoes is not None:
+            espera = max(espera, self.balde_requisicoes.tempo_ate_disponivel(1))
+        if self.balde_tokens is not None:
+            espera = max(espera, self.balde_tokens.tempo_ate_disponivel(pedido.tokens))
+        return espera
+
+    def _liberar(self, pedido: _Pedido):
+        if self.balde_requisicoes is not None:
+            self.balde_requisicoes.consumir(1)
+        if self.balde_tokens is not None:
+            self.balde_tokens.consumir(pedido.tokens)
+
+        fila = self._filas[pedido.sessao]
+        fila.popleft()
+        if fila:
+            # Sessão volta para o fim da rodada: uma sessão falante não monopoliza a cota
+            self._filas.move_to_end(pedido.sessao)
+        else:
+            del self._filas[pedido.sessao]
+
+    def _desistir(self, pedido: _Pedido):
+        fila = self._filas[pedido.sessao]
+        fila.remove(pedido)
+        if not fila:
+            del self._filas[pedido.sessao]
+        self.desistencias += 1
+        self._cond.notify_all()
+
+    def adquirir(self, tokens_estimados: int) -> float:
+        """Bloqueia até a vez da sessão atual e haver cota; retorna o tempo de espera em segundos"""
+        pedido = _Pedido(_sessao_atual.get(), tokens_estimados)
+        prazo = prazo_atual()
+
+        with self._cond:
+            self._filas.setdefault(pedido.sessao, deque()).append(pedido)
+            while True:
+                if prazo is not None and prazo.expirado():
+                    self._desistir(pedido)
+                    raise PrazoExcedido("Prazo do turno esgotado aguardando cota do LLM")
+
+                if self._proximo() is pedido:
+                    espera = self._tempo_ate_liberar(pedido)
+                    if espera <= 0:
+                        self._liberar(pedido)
+                        self._cond.notify_all()
+                        break
+                else:
+                    espera = None
+
+                if prazo is not None:
+                    espera = prazo.restante() if espera is None else min(espera, prazo.restante())
+                self._cond.wait(espera)
+
+            espera = time.monotonic() - pedido.chegada
+            self.chamadas += 1
+            self.esperas_total += espera
+            self.espera_maxima = max(self.espera_maxima, espera)
+            self._esperas_recentes.append(espera)
+
+        if espera > 0.5:
+            logger.info(f"⏳ Chamada ao LLM aguardou {espera:.2f}s na fila de cota (sessão {pedido.sessao})")
+        return espera
+
+    def ajustar_tokens(self, tokens_estimados: int, tokens_reais: int):
+        if self.balde_tokens is None:
+            return
+        with self._cond:
+            self.balde_tokens.ajustar(tokens_reais - tokens_estimados)
+
+    def registrar_limite(self):
+        """O provedor respondeu 429: esvazia os baldes para que todos aguardem a reposição"""
+        with self._cond:
+            self.erros_limite += 1
+            for balde in (self.balde_requisicoes, self.balde_tokens):
+                if balde is not None:
+                    balde.esvaziar()
+
+    def executar(self, chamada: Callable[[], str], texto_entrada: str, tokens_saida_estimados: int) -> str:
+        """Executa a chamada ao LLM sob a cota, repetindo com espera em caso de 429"""
+        tokens_estimados = estimar_tokens(texto_entrada) + tokens_saida_estimados
+
+        tentativa = 0
+        while True:
+            self.adquirir(tokens_estimados)
+            try:
+                resposta = chamada()
+            except Exception as e:
+                if not eh_erro_limite(e) or tentativa >= self.tentativas_limite:
+                    raise
+                self.registrar_limite()
+                espera = self.espera_limite_segundos * (2 ** tentativa)
+                prazo = prazo_atual()
+                if prazo is not None:
+                    espera = min(espera, prazo.restante())
+                tentativa += 1
+                logger.warning(f"⚠️ Cota do LLM excedida, nova tentativa {tentativa} em {espera:.1f}s")
+                time.sleep(espera)
+                continue
+
+            tokens_reais = estimar_tokens(texto_entrada) + estimar_tokens(resposta)
+            self.ajustar_tokens(tokens_estimados, tokens_reais)
+            return resposta
+
+    def estatisticas(self) -> dict:
+        with self._cond:
+            esperas = sorted(self._esperas_recentes)
+            return {
+                "chamadas": self.chamadas,
+                "espera_media_s": self.esperas_total / self.chamadas if self.chamadas else 0.0,
+                "espera_p95_s": esperas[int(len(esperas) * 0.95)] if esperas else 0.0,
+                "espera_maxima_s": self.espera_maxima,
+                "erros_limite": self.erros_limite,
+                "desistencias_por_prazo": self.desistencias,
+                "na_fila": sum(len(fila) for fila in self._filas.values()),
+                "sessoes_na_fila": len(self._filas)
+            }
+
+
+_agendador: Optional[AgendadorLLM] = None
+_agendador_lock = threading.Lock()
+
+def get_agendador() -> Optional[AgendadorLLM]:
+    """Retorna o agendador do processo conforme Config (None se sem limites configurados)"""
+    global _agendador
+    from config import Config
+
+    if Config.LLM_REQUESTS_PER_MINUTE <= 0 and Config.LLM_TOKENS_PER_MINUTE <= 0:
+        return None
+
+    if _agendador is None:
+        with _agendador_lock:
+            if _agendador is None:
+                _agendador = AgendadorLLM(
+                    requisicoes_por_minuto=Config.LLM_REQUESTS_PER_MINUTE,
+                    tokens_por_minuto=Config.LLM_TOKENS_PER_MINUTE,
+                    tentativas_limite=Config.LLM_RATE_LIMIT_RETRIES
+                )
+    return _agendador
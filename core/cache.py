@@ -0,0 +1,244 @@
+"""
+Cache persistente de prompts/respostas dos agentes
+Duas camadas: LRU em memória (por processo) e SQLite em modo WAL (compartilhado entre workers)
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+def normalizar_prompt(prompt: str) -> str:
+    """Normaliza espaços e indentação para que prompts equivalentes gerem a mesma chave"""
+    return " ".join(prompt.split())
+
+_fingerprint_conhecimento: Optional[str] = None
+
+def fingerprint_conhecimento() -> str:
+    """Versão da base de conhecimento - qualquer edição invalida as entradas do cache"""
+    global _fingerprint_conhecimento
+    if _fingerprint_conhecimento is None:
+        # Hash das fontes gravado no snapshot compilado (sem decodificar as seções)
+        from knowledge.base_compilada import get_base_conhecimento
+        _fingerprint_conhecimento = get_base_conhecimento().versao_conteudo or "sem_versao"
+    return _fingerprint_conhecimento
+
+def gerar_chave(prompt: str, papel: str, modelo: str, temperatura: float,
+                persona: str = "", expected_output: str = "", max_tokens: Optional[int] = None) -> str:
+    """Gera a chave do cache a partir do prompt normalizado, do contrato de saída e da configuração do agente"""
+    persona_hash = hashlib.sha256(persona.encode("utf-8")).hexdigest()[:16]
+    saida_hash = hashlib.sha256(expected_output.encode("utf-8")).hexdigest()[:16]
+    partes = [
+        normalizar_prompt(prompt),
+        papel,
+        modelo,
+        repr(temperatura),
+        repr(max_tokens),
+        persona_hash,
+        saida_hash,
+        fingerprint_conhecimento()
+    ]
+    return hashlib.sha256("\x1f".join(partes).encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Camada em memória com TTL e limite de itens"""
+
+    def __init__(self, max_itens: int, ttl_segundos: float):
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self._dados: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave: str) -> Optional[str]:
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return None
+            valor, expira_em = item
+            if expira_em < time.time():
+                del self._dados[chave]
+                return None
+            self._dados.move_to_end(chave)
+            return valor
+
+    def set(self, chave: str, valor: str, expira_em: Optional[float] = None):
+        with self._lock:
+            self._dados[chave] = (valor, expira_em or time.time() + self.ttl_segundos)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_itens:
+                self._dados.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+
+class SQLiteCache:
+    """Camada persistente em SQLite (WAL) - vários processos podem ler e escrever"""
+
+    # Frequência (em escritas) da rotina de expiração/evicção por tamanho
+    INTERVALO_EVICCAO = 100
+
+    def __init__(self, caminho: str, max_linhas: int, ttl_segundos: float):
+        self.caminho = caminho
+        self.max_linhas = max_linhas
+        self.ttl_segundos = ttl_segundos
+        self._local = threading.local()
+        self._escritas = 0
+        self._lock = threading.Lock()
+
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+
+        conexao = self._conexao()
+        conexao.execute("""
+            CREATE TABLE IF NOT EXISTS respostas (
+                chave TEXT PRIMARY KEY,
+                valor TEXT NOT NULL,
+                criado_em REAL NOT NULL,
+                expira_em REAL NOT NULL
+            )
+        """)
+        conexao.execute("CREATE INDEX IF NOT EXISTS idx_respostas_criado ON respostas(criado_em)")
+        conexao.commit()
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Uma conexão por thread; WAL permite leitores concorrentes com um escritor"""
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=5.0, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+        return conexao
+
+    def get(self, chave: str) -> Optional[Tuple[str, float]]:
+        linha = self._conexao().execute(
+            "SELECT valor, expira_em FROM respostas WHERE chave = ? AND expira_em >= ?",
+            (chave, time.time())
+        ).fetchone()
+        return (linha[0], linha[1]) if linha else None
+
+    def set(self, chave: str, valor: str):
+        agora = time.time()
+        self._conexao().execute(
+            "INSERT OR REPLACE INTO respostas (chave, valor, criado_em, expira_em) VALUES (?, ?, ?, ?)",
+            (chave, valor, agora, agora + self.ttl_segundos)
+        )
+
+        with self._lock:
+            self._escritas += 1
+            executar_eviccao = self._escritas % self.INTERVALO_EVICCAO == 0
+        if executar_eviccao:
+            self.evictar()
+
+    def evictar(self):
+        """Remove entradas expiradas e as mais antigas acima do limite de linhas"""
+        conexao = self._conexao()
+        conexao.execute("DELETE FROM respostas WHERE expira_em < ?", (time.time(),))
+        conexao.execute("""
+            DELETE FROM respostas WHERE chave IN (
+                SELECT chave FROM respostas ORDER BY criado_em DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_linhas,))
+
+    def limpar(self):
+        self._conexao().execute("DELETE FROM respostas")
+
+    def __len__(self) -> int:
+        return self._conexao().execute("SELECT COUNT(*) FROM respostas").fetchone()[0]
+
+
+class CacheRespostas:
+    """Cache em duas camadas consultado antes de cada chamada ao LLM"""
+
+    def __init__(self, caminho_sqlite: Optional[str], max_itens_memoria: int = 512,
+                 ttl_segundos: float = 86400, max_linhas_sqlite: int = 50000):
+        self.memoria = LRUCache(max_itens_memoria, ttl_segundos)
+        self.persistente = None
+        self.hits_memoria = 0
+        self.hits_sqlite = 0
+        self.misses = 0
+
+        if caminho_sqlite:
+            try:
+                self.persistente = SQLiteCache(caminho_sqlite, max_linhas_sqlite, ttl_segundos)
+            except sqlite3.Error as e:
+                # Sem disco gravável (ex: container read-only) seguimos só com memória
+                logger.warning(f"⚠️ Cache SQLite indisponível ({e}), usando apenas memória")
+
+    def get(self, chave: str) -> Optional[str]:
+        valor = self.memoria.get(chave)
+        if valor is not None:
+            self.hits_memoria += 1
+            return valor
+
+        if self.persistente is not None:
+            try:
+                item = self.persistente.get(chave)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Falha ao ler cache SQLite: {e}")
+                item = None
+            if item is not None:
+                valor, expira_em = item
+                self.memoria.set(chave, valor, expira_em)
+                self.hits_sqlite += 1
+                return valor
+
+        self.misses += 1
+        return None
+
+    def set(self, chave: str, valor: str):
+        self.memoria.set(chave, valor)
+        if self.persistente is not None:
+            try:
+                self.persistente.set(chave, valor)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Falha ao gravar cache SQLite: {e}")
+
+    def limpar(self):
+        self.memoria.limpar()
+        if self.persistente is not None:
+            self.persistente.limpar()
+
+    def estatisticas(self) -> dict:
+        return {
+            "hits_memoria": self.hits_memoria,
+            "hits_sqlite": self.hits_sqlite,
+            "misses": self.misses,
+            "itens_memoria": len(self.memoria)
+        }
+
+
+_cache: Optional[CacheRespostas] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> Optional[CacheRespostas]:
+    """Retorna o cache do processo conforme Config (None se desabilitado)"""
+    global _cache
+    from config import Config
+
+    if not Config.CACHE_ENABLED:
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CacheRespostas(
+                    caminho_sqlite=Config.CACHE_SQLITE_PATH or None,
+                    max_itens_memoria=Config.CACHE_MEMORY_ITEMS,
+                    ttl_segundos=Config.CACHE_TTL_SECONDS,
+                    max_linhas_sqlite=Config.CACHE_MAX_ROWS
+                )
+    return _cache
@@ -0,0 +1,109 @@
+"""
+Características de uma mensagem extraídas em uma única passada por turno
+Texto normalizado (minúsculas, sem acentos), tokens, idades citadas, categorias de todos
+os vocabulários (core.palavras_chave) e estatísticas de tamanho ficam num MessageFeatures;
+roteador, orquestradores, agentes e funções da base de conhecimento leem o mesmo objeto
+em vez de baixar e varrer a mensagem cada um por conta própria
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+from core.palavras_chave import get_automato, normalizar_texto
+
+# Mensagens recentes com as características extraídas (a mesma mensagem passa pelo
+# roteador, pelo orquestrador e pelos especialistas do turno)
+TEXTOS_EM_CACHE = 64
+
+# Idades citadas, em ordem de prioridade: "30 anos", "tenho 25", "idade 40", "sou 52".
+# Cada número do texto é testado contra o que vem depois e antes dele, em vez de uma
+# regex com os quatro padrões tentada em cada posição (dominava a extração em relatos longos)
+_PADRAO_NUMERO = re.compile(r"\d+")
+_PADRAO_ANOS = re.compile(r"\s*anos?")
+_PALAVRAS_ANTES_IDADE = ("tenho", "idade", "sou")
+_PADRAO_TOKEN = re.compile(r"\w+")
+_PADRAO_FIM_FRASE = re.compile(r"[.!?]+")
+
+def _extrair_idades(texto_normalizado: str) -> Tuple[List[int], Optional[int]]:
+    """Idades na ordem do texto e a idade mais provável (primeiro padrão que aparece)"""
+    idades = []
+    por_padrao: Dict[int, int] = {}
+    for match in _PADRAO_NUMERO.finditer(texto_normalizado):
+        padroes = []
+        if _PADRAO_ANOS.match(texto_normalizado, match.end()):
+            padroes.append(0)
+        antes = match.start()
+        while antes and texto_normalizado[antes - 1].isspace():
+            antes -= 1
+        padroes.extend(
+            i + 1 for i, palavra in enumerate(_PALAVRAS_ANTES_IDADE)
+            if texto_normalizado.endswith(palavra, 0, antes)
+        )
+        if padroes:
+            idade = int(match.group())
+            idades.append(idade)
+            for padrao in padroes:
+                por_padrao.setdefault(padrao, idade)
+    return idades, por_padrao[min(por_padrao)] if por_padrao else None
+
+
+class MessageFeatures:
+    """Características de uma mensagem, calculadas uma vez e compartilhadas no turno
+
+    Use extrair_caracteristicas(mensagem) em vez de instanciar diretamente, para que
+    todos os detectores do turno recebam o mesmo objeto.
+    """
+
+    def __init__(self, texto: str):
+        self.texto = texto
+        self.texto_normalizado = normalizar_texto(texto)
+        self.num_caracteres = len(texto)
+        self.num_palavras = len(texto.split())
+        self.idades, self.idade = _extrair_idades(self.texto_normalizado)
+        # Uma passada do autômato para todos os vocabulários
+        self.categorias: Dict[str, Tuple[str, ...]] = get_automato().buscar(self.texto_normalizado)
+        self._tokens: Optional[List[str]] = None
+
+    @property
+    def tokens(self) -> List[str]:
+        """Palavras do texto normalizado (calculadas no primeiro acesso)"""
+        if self._tokens is None:
+            self._tokens = _PADRAO_TOKEN.findall(self.texto_normalizado)
+        return self._tokens
+
+    @property
+    def num_frases(self) -> int:
+        return sum(1 for frase in _PADRAO_FIM_FRASE.split(self.texto) if frase.strip())
+
+    def categorias_de(self, vocabulario: str) -> List[str]:
+        """Categorias de um vocabulário presentes no texto, na ordem de definição"""
+        return list(self.categorias[vocabulario])
+
+    def __repr__(self) -> str:
+        encontradas = {nome: list(c) for nome, c in self.categorias.items() if c}
+        return (f"MessageFeatures({self.num_caracteres} caracteres, {self.num_palavras} palavras, "
+                f"idades={self.idades}, categorias={encontradas})")
+
+
+@lru_cache(maxsize=TEXTOS_EM_CACHE)
+def _extrair(texto: str) -> MessageFeatures:
+    return MessageFeatures(texto)
+
+def extrair_caracteristicas(texto: Union[str, MessageFeatures]) -> MessageFeatures:
+    """Características da mensagem (calculadas uma vez por texto)
+
+    O cache usa o próprio texto recebido como chave: passe a mensagem original para que
+    roteador, orquestrador e especialistas compartilhem a mesma extração.
+    """
+    if isinstance(texto, MessageFeatures):
+        return texto
+    return _extrair(texto or "")
+
+def buscar_palavras_chave(texto: Union[str, MessageFeatures]) -> Dict[str, Tuple[str, ...]]:
+    """Categorias encontradas no texto para todos os vocabulários"""
+    return extrair_caracteristicas(texto).categorias
+
+def categorias_encontradas(vocabulario: str, texto: Union[str, MessageFeatures]) -> List[str]:
+    """Categorias de um vocabulário presentes no texto, na ordem de definição"""
+    return extrair_caracteristicas(texto).categorias_de(vocabulario)
@@ -0,0 +1,209 @@
+"""
+Montagem dos prompts dentro de um orçamento de tokens
+Cada trecho variável do prompt (conhecimento, histórico, mensagem) entra como uma seção
+com prioridade; se o prompt passar do orçamento, as seções de menor prioridade são
+resumidas/cortadas primeiro e o total de tokens de cada chamada é registrado
+"""
+
+import threading
+import logging
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional
+
+from core.agendador import estimar_tokens, CARACTERES_POR_TOKEN
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Prioridades das seções (maior número = cortada antes); as instruções (o texto fixo
+# do prompt) nunca são cortadas
+PRIORIDADE_INSTRUCOES = 0
+PRIORIDADE_MENSAGEM = 1
+PRIORIDADE_CONHECIMENTO = 2
+PRIORIDADE_HISTORICO = 3
+
+# Tamanho mínimo que uma seção mantém mesmo com o orçamento estourado
+MINIMO_TOKENS_SECAO = 64
+
+MARCA_CORTE = "[...]"
+
+def formatar_valor(valor: Any, nivel: int = 0) -> str:
+    """Texto compacto de dicts/listas da base de conhecimento (em vez do repr do Python)"""
+    recuo = "  " * nivel
+    if isinstance(valor, Mapping):
+        linhas = []
+        for chave, item in valor.items():
+            if isinstance(item, (Mapping, list, tuple)):
+                linhas.append(f"{recuo}{chave}:")
+                linhas.append(formatar_valor(item, nivel + 1))
+            else:
+                linhas.append(f"{recuo}{chave}: {item}")
+        return "\n".join(linhas)
+    if isinstance(valor, (list, tuple)):
+        return "\n".join(
+            formatar_valor(item, nivel + 1) if isinstance(item, (Mapping, list, tuple)) else f"{recuo}- {item}"
+            for item in valor
+        )
+    return f"{recuo}{valor}" if nivel else str(valor)
+
+
+def _cortar_inicio(texto: str, max_caracteres: int) -> str:
+    """Mantém o começo (conhecimento: o mais geral vem primeiro), em fronteira de linha"""
+    corte = texto[:max_caracteres]
+    quebra = corte.rfind("\n")
+    if quebra > max_caracteres // 2:
+        corte = corte[:quebra]
+    return f"{corte.rstrip()}\n{MARCA_CORTE}"
+
+def _cortar_fim(texto: str, max_caracteres: int) -> str:
+    """Mantém o final (histórico: o mais recente importa mais), em fronteira de linha"""
+    corte = texto[-max_caracteres:]
+    quebra = corte.find("\n")
+    if 0 <= quebra < max_caracteres // 2:
+        corte = corte[quebra + 1:]
+    return f"{MARCA_CORTE}\n{corte.lstrip()}"
+
+def _cortar_meio(texto: str, max_caracteres: int) -> str:
+    """Mantém começo e fim (mensagem do cliente: contexto e pedido costumam estar nas pontas)"""
+    metade = max_caracteres // 2
+    return f"{texto[:metade].rstrip()} {MARCA_CORTE} {texto[-metade:].lstrip()}"
+
+CORTES = {
+    PRIORIDADE_MENSAGEM: _cortar_meio,
+    PRIORIDADE_CONHECIMENTO: _cortar_inicio,
+    PRIORIDADE_HISTORICO: _cortar_fim
+}
+
+
+class _EstatisticasContexto:
+    """Totais de tokens dos prompts montados no processo"""
+
+    def __init__(self):
+        self.prompts = 0
+        self.tokens = 0
+        self.cortados = 0
+        self.acima_orcamento = 0
+        self.maior_prompt = 0
+        self._lock = threading.Lock()
+
+    def registrar(self, tokens: int, cortado: bool, acima_orcamento: bool):
+        with self._lock:
+            self.prompts += 1
+            self.tokens += tokens
+            self.cortados += int(cortado)
+            self.acima_orcamento += int(acima_orcamento)
+            self.maior_prompt = max(self.maior_prompt, tokens)
+
+    def como_dict(self) -> dict:
+        with self._lock:
+            return {
+                "prompts": self.prompts,
+                "tokens_total": self.tokens,
+                "tokens_medio": round(self.tokens / self.prompts, 1) if self.prompts else 0.0,
+                "maior_prompt": self.maior_prompt,
+                "prompts_cortados": self.cortados,
+                "prompts_acima_orcamento": self.acima_orcamento
+            }
+
+
+_estatisticas = _EstatisticasContexto()
+
+def orcamento_padrao() -> int:
+    """Orçamento de tokens de entrada: PROMPT_TOKEN_BUDGET, limitado ao que cabe no contexto do modelo
+
+    Com a recuperação ligada, reserva RAG_MAX_TOKENS para as referências que
+    core.execucao anexa depois de o prompt ser montado.
+    """
+    from config import Config
+    espaco_modelo = Config.MODEL_CONTEXT_TOKENS - Config.LLM_MAX_TOKENS
+    orcamento = espaco_modelo if Config.PROMPT_TOKEN_BUDGET <= 0 else min(Config.PROMPT_TOKEN_BUDGET, espaco_modelo)
+    if Config.RAG_ENABLED:
+        orcamento -= Config.RAG_MAX_TOKENS
+    return orcamento
+
+def estatisticas_contexto() -> dict:
+    return _estatisticas.como_dict()
+
+
+class ContextoPrompt:
+    """Monta um prompt com seções priorizadas dentro de um orçamento de tokens
+
+    Uso: cada trecho variável é registrado e devolve um marcador que vai no f-string
+    do prompt; montar() mede o texto fixo, corta as seções de menor prioridade até
+    caber no orçamento e substitui os marcadores.
+
+        contexto = ContextoPrompt("ciclo_vida.avaliar_travamentos")
+        detalhes = contexto.conhecimento(get_estagio_ciclo_vida(estagio))
+        prompt = contexto.montar(f"... Informações do estágio: {detalhes} ...")
+        contexto.tokens  # tokens estimados do prompt final
+    """
+
+    def __init__(self, nome: str, orcamento_tokens: Optional[int] = None):
+        self.nome = nome
+        self.orcamento_tokens = orcamento_padrao() if orcamento_tokens is None else orcamento_tokens
+        self.tokens = 0
+        self.cortes: Dict[str, int] = {}
+        self._secoes: List[Dict[str, Any]] = []
+        self._prefixo = f"\x00{id(self):x}:"
+
+    def secao(self, valor: Any, prioridade: int, padrao: str = "",
+              minimo_tokens: int = MINIMO_TOKENS_SECAO) -> str:
+        """Registra uma seção e devolve o marcador a usar no texto do prompt"""
+        texto = formatar_valor(valor) if valor not in (None, "", [], {}) else padrao
+        marcador = f"{self._prefixo}{len(self._secoes)}\x00"
+        self._secoes.append({
+            "marcador": marcador,
+            "texto": texto,
+            "prioridade": prioridade,
+            "minimo_tokens": minimo_tokens
+        })
+        return marcador
+
+    def mensagem(self, valor: Any, padrao: str = "") -> str:
+        return self.secao(valor, PRIORIDADE_MENSAGEM, padrao)
+
+    def conhecimento(self, valor: Any, padrao: str = "") -> str:
+        return self.secao(valor, PRIORIDADE_CONHECIMENTO, padrao)
+
+    def historico(self, valor: Any, padrao: str = "") -> str:
+        return self.secao(valor, PRIORIDADE_HISTORICO, padrao)
+
+    def montar(self, modelo: str) -> str:
+        """Prompt final: seções ajustadas ao orçamento no lugar dos marcadores"""
+        fixo = modelo
+        for secao in self._secoes:
+            fixo = fixo.replace(secao["marcador"], "")
+
+        disponivel = self.orcamento_tokens - estimar_tokens(fixo)
+        total = sum(estimar_tokens(secao["texto"]) for secao in self._secoes)
+
+        # Corta da menor para a maior prioridade; entre iguais, a maior seção primeiro
+        for secao in sorted(self._secoes, key=lambda s: (-s["prioridade"], -len(s["texto"]))):
+            excesso = total - disponivel
+            if excesso <= 0:
+                break
+            if secao["prioridade"] == PRIORIDADE_INSTRUCOES:
+                continue
+            atual = estimar_tokens(secao["texto"])
+            alvo = max(atual - excesso, secao["minimo_tokens"])
+            if alvo >= atual:
+                continue
+            secao["texto"] = CORTES[secao["prioridade"]](secao["texto"], alvo * CARACTERES_POR_TOKEN)
+            novo = estimar_tokens(secao["texto"])
+            self.cortes[secao["marcador"]] = atual - novo
+            total -= atual - novo
+
+        prompt = modelo
+        for secao in self._secoes:
+            prompt = prompt.replace(secao["marcador"], secao["texto"])
+
+        self.tokens = estimar_tokens(prompt)
+        acima = self.tokens > self.orcamento_tokens
+        _estatisticas.registrar(self.tokens, bool(self.cortes), acima)
+        if acima:
+            logger.warning(f"⚠️ Prompt '{self.nome}' com {self.tokens} tokens, acima do orçamento de {self.orcamento_tokens}")
+        elif self.cortes:
+            logger.info(f"✂️ Prompt '{self.nome}': {sum(self.cortes.values())} tokens cortados, {self.tokens}/{self.orcamento_tokens}")
+        else:
+            logger.info(f"🧮 Prompt '{self.nome}': {self.tokens} tokens")
+        return prompt
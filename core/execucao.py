@@ -0,0 +1,78 @@
+"""
+Camada de execução de tasks compartilhada pelos agentes
+Centraliza a chamada ao CrewAI para que cache e demais políticas valham para todos
+"""
+
+from typing import Any, Optional
+import logging
+from core.cache import get_cache, gerar_chave
+from core.singleflight import get_single_flight
+from core.agendador import get_agendador
+from core.templates import executar_tarefa_unica, estatisticas_templates
+from core.contexto import estatisticas_contexto
+from core.recuperacao import anexar_referencias, estatisticas_recuperacao
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+def chave_cache_agente(agent: Any, prompt: str, expected_output: str = "") -> str:
+    """Chave de cache considerando papel, modelo, temperatura, limite de tokens, persona e saída esperada"""
+    llm = getattr(agent, "llm", None)
+    return gerar_chave(
+        prompt=prompt,
+        papel=agent.role,
+        modelo=getattr(llm, "model", ""),
+        temperatura=getattr(llm, "temperature", None),
+        persona=f"{agent.goal}\n{agent.backstory}",
+        expected_output=expected_output,
+        max_tokens=getattr(llm, "max_tokens", None)
+    )
+
+def executar_task(agent: Any, prompt: str, expected_output: str) -> str:
+    """Executa o prompt com um agente em uma crew de tarefa única, consultando o cache antes
+    
+    Chamadas concorrentes com a mesma chave de cache compartilham uma única execução.
+    As passagens da base relevantes para a mensagem do turno (core.recuperacao) entram
+    no fim do prompt antes de calcular a chave.
+    """
+    prompt = anexar_referencias(prompt)
+    cache = get_cache()
+    single_flight = get_single_flight()
+    chave: Optional[str] = None
+
+    if cache is not None or single_flight is not None:
+        chave = chave_cache_agente(agent, prompt, expected_output)
+
+    if cache is not None:
+        resposta = cache.get(chave)
+        if resposta is not None:
+            logger.debug(f"⚡ Cache hit para {agent.role}")
+            return resposta
+
+    def executar() -> str:
+        resposta = _executar_crew(agent, prompt, expected_output)
+        if cache is not None:
+            cache.set(chave, resposta)
+        return resposta
+
+    if single_flight is not None:
+        return single_flight.executar(chave, executar)
+    return executar()
+
+def _executar_crew(agent: Any, prompt: str, expected_output: str) -> str:
+    # Crew de tarefa única reaproveitada (core.templates): o prompt entra via kickoff(inputs)
+    return executar_tarefa_unica(agent, prompt, expected_output)
+
+def estatisticas_execucao() -> dict:
+    """Métricas da camada de execução (cache, deduplicação, fila de cota, templates de crew, prompts e recuperação)"""
+    cache = get_cache()
+    single_flight = get_single_flight()
+    agendador = get_agendador()
+    return {
+        "cache": cache.estatisticas() if cache is not None else None,
+        "single_flight": single_flight.estatisticas() if single_flight is not None else None,
+        "agendador": agendador.estatisticas() if agendador is not None else None,
+        "templates": estatisticas_templates(),
+        "contexto": estatisticas_contexto(),
+        "recuperacao": estatisticas_recuperacao()
+    }
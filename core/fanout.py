@@ -0,0 +1,121 @@
+"""
+Execução paralela de especialistas (fan-out) em um pool de threads limitado
+Alternativa ao Process.hierarchical: latência ~ max(especialista) + síntese
+"""
+
+import threading
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.streaming import executar_sem_streaming
+from core.prazo import Prazo, executar_com_prazo
+
+# Motivos pelos quais uma tarefa do fan-out fica fora do turno
+MOTIVO_ERRO = "erro"
+MOTIVO_PRAZO = "prazo"
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Resposta combinada com os especialistas quando não há nada relevante a acrescentar
+SEM_CONTRIBUICAO = "SEM CONTRIBUIÇÃO"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_background: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    """Pool de threads compartilhado pelo processo (limitado por Config.FANOUT_MAX_WORKERS)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from config import Config
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.FANOUT_MAX_WORKERS,
+                    thread_name_prefix="especialista"
+                )
+    return _executor
+
+def get_executor_background() -> ThreadPoolExecutor:
+    """Pool separado para trabalho fora do caminho da resposta (insights, resumos)
+    
+    Limitado por Config.BACKGROUND_MAX_WORKERS: análises em background nunca ocupam as
+    threads dos especialistas do turno seguinte.
+    """
+    global _executor_background
+    if _executor_background is None:
+        with _executor_lock:
+            if _executor_background is None:
+                from config import Config
+                _executor_background = ThreadPoolExecutor(
+                    max_workers=Config.BACKGROUND_MAX_WORKERS,
+                    thread_name_prefix="background"
+                )
+    return _executor_background
+
+def submeter(funcao: Callable[[], Any], com_streaming: bool = False) -> Future:
+    """Submete uma função ao pool preservando o contexto (sessão, prazo)
+    
+    Por padrão o coletor de streaming é desativado na thread auxiliar; com_streaming=True
+    o mantém (ex: crew hierárquica cuja resposta final é transmitida).
+    """
+    contexto = contextvars.copy_context()
+    if com_streaming:
+        return get_executor().submit(contexto.run, funcao)
+    return get_executor().submit(contexto.run, executar_sem_streaming, funcao)
+
+def submeter_background(funcao: Callable[[], Any]) -> Future:
+    """Submete trabalho em background ao pool próprio, sem streaming
+    
+    Não herda o prazo do turno: roda sob um prazo próprio de Config.BACKGROUND_TIMEOUT_SECONDS,
+    contado a partir do início da execução (0 desativa).
+    """
+    from config import Config
+    contexto = contextvars.copy_context()
+    
+    def executar():
+        segundos = Config.BACKGROUND_TIMEOUT_SECONDS
+        prazo = Prazo(segundos) if segundos > 0 else None
+        return executar_com_prazo(prazo, lambda: executar_sem_streaming(funcao))
+    
+    return get_executor_background().submit(contexto.run, executar)
+
+def executar_em_paralelo(tarefas: Dict[str, Callable[[], Any]],
+                         prazo: Optional[Prazo] = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Executa as tarefas concorrentemente; retorna (resultados por nome, motivo por nome descartado)
+    
+    Com prazo, as tarefas rodam sob ele e a espera termina quando ele expira: o que não
+    concluiu a tempo é descartado com motivo "prazo".
+    """
+    if prazo is not None:
+        tarefas = {
+            nome: (lambda funcao=funcao: executar_com_prazo(prazo, funcao))
+            for nome, funcao in tarefas.items()
+        }
+    futuros = {nome: submeter(funcao) for nome, funcao in tarefas.items()}
+    wait(futuros.values(), timeout=prazo.restante() if prazo is not None else None)
+
+    resultados: Dict[str, Any] = {}
+    falhas: Dict[str, str] = {}
+    for nome, futuro in futuros.items():
+        if not futuro.done():
+            logger.warning(f"⏱️ Especialista {nome} não concluiu dentro do prazo do turno")
+            falhas[nome] = MOTIVO_PRAZO
+            continue
+        try:
+            resultados[nome] = futuro.result()
+        except Exception as e:
+            logger.error(f"❌ Especialista {nome} falhou: {e}")
+            expirou = isinstance(e, TimeoutError) or (prazo is not None and prazo.expirado())
+            falhas[nome] = MOTIVO_PRAZO if expirou else MOTIVO_ERRO
+
+    return resultados, falhas
+
+def contribuicao_relevante(texto: Optional[str]) -> bool:
+    """Indica se o especialista trouxe algo além do marcador de ausência de contribuição"""
+    if not texto:
+        return False
+    return not texto.strip().strip("*\"'").upper().startswith(SEM_CONTRIBUICAO)
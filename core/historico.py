@@ -0,0 +1,48 @@
+"""
+Histórico da conversa em memória limitada
+Os orquestradores e a interface leem o mesmo anel com os turnos recentes; os turnos
+mais antigos ficam só no log do SessionStore (em disco) e são lidos sob demanda,
+então a memória por sessão não cresce com a conversa
+"""
+
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+def texto_resposta(resposta: Any) -> str:
+    """Texto da resposta de um agente (os dicts completos não entram no histórico)"""
+    if isinstance(resposta, dict):
+        return str(resposta.get("resposta") or resposta.get("erro") or "")
+    return str(resposta or "")
+
+
+class HistoricoConversa:
+    """Anel com os últimos `capacidade` turnos da sessão
+
+    Aceita as operações que os orquestradores usavam na lista: append, len, iteração,
+    índice e fatias (ex: historico[-3:]).
+    """
+
+    def __init__(self, capacidade: int, recentes: Optional[List[Dict[str, Any]]] = None):
+        self._anel = deque(recentes or [], maxlen=max(capacidade, 1))
+
+    @property
+    def capacidade(self) -> int:
+        return self._anel.maxlen
+
+    def append(self, entrada: Dict[str, Any]):
+        # O turno mais antigo sai do anel; ele continua no log do SessionStore
+        self._anel.append(entrada)
+
+    def __len__(self) -> int:
+        return len(self._anel)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._anel)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return list(self._anel)[indice]
+        return self._anel[indice]
+
+    def __repr__(self) -> str:
+        return f"HistoricoConversa({len(self._anel)}/{self.capacidade})"
@@ -0,0 +1,218 @@
+"""
+LLM falso, determinístico e em processo, para execuções offline (MODEL=fake/<perfil>)
+Segue o protocolo ReAct do CrewAI, inclusive a delegação do manager na crew hierárquica,
+com latência e número de tokens configuráveis - para benchmarks, testes de carga e testes
+"""
+
+import re
+import json
+import time
+import hashlib
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+from core.streaming import _coletor_atual
+from core.llm_streaming import StreamingLLM
+from core.prazo import PrazoExcedido, timeout_restante
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+FERRAMENTA_DELEGAR = "Delegate work to coworker"
+
+_PADRAO_COLEGAS = re.compile(r"Delegate a specific task to one of the following coworkers: (.+)")
+_PADRAO_DELEGACAO_FEITA = re.compile(r"^Action: " + re.escape(FERRAMENTA_DELEGAR) + r"\s*$", re.MULTILINE)
+_PADRAO_PAPEL = re.compile(r"You are (.+?)\. ")
+_PADRAO_TAREFA = re.compile(r"Current Task: (.+)", re.DOTALL)
+
+# Vocabulário de preenchimento para atingir o número de tokens configurado
+_PREENCHIMENTO = (
+    "Obrigado por compartilhar isso comigo. Percebo o quanto essa situação mexe com você "
+    "e com a sua família. Podemos olhar juntos para o que está acontecendo agora e para "
+    "as histórias que vieram antes. O que mais você gostaria de contar sobre isso?"
+).split()
+
+class _Contadores:
+    """Contadores agregados de todas as instâncias falsas do processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.zerar()
+
+    def zerar(self):
+        with self._lock:
+            self.chamadas = 0
+            self.delegacoes = 0
+            self.tokens_entrada = 0
+            self.tokens_saida = 0
+            self.bytes_prompt = 0
+
+    def registrar(self, bytes_prompt: int, tokens_entrada: int, tokens_saida: int, delegacao: bool):
+        with self._lock:
+            self.chamadas += 1
+            self.delegacoes += delegacao
+            self.tokens_entrada += tokens_entrada
+            self.tokens_saida += tokens_saida
+            self.bytes_prompt += bytes_prompt
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "chamadas": self.chamadas,
+                "delegacoes": self.delegacoes,
+                "tokens_entrada": self.tokens_entrada,
+                "tokens_saida": self.tokens_saida,
+                "bytes_prompt": self.bytes_prompt
+            }
+
+contadores_fake = _Contadores()
+
+
+def carregar_roteiro(caminho: Optional[str]) -> List[Dict[str, str]]:
+    """Lê o roteiro de respostas: lista JSON de {"contem", "papel", "resposta"}"""
+    if not caminho:
+        return []
+    with open(caminho, encoding="utf-8") as arquivo:
+        roteiro = json.load(arquivo)
+    logger.info(f"📜 Roteiro do LLM falso carregado: {len(roteiro)} regras")
+    return roteiro
+
+
+class FakeLLM(StreamingLLM):
+    """LLM do CrewAI que responde localmente, sem rede nem chave de API
+
+    - Com a ferramenta de delegação disponível (manager), delega a cada colega em ordem
+      até max_delegacoes e então dá a resposta final.
+    - Sem ela, responde "Final Answer:" com a primeira regra do roteiro que casar com
+      o prompt ou, sem regra, com um texto-modelo de tokens_saida palavras.
+    - Respeita o coletor de streaming, o agendador de cota e o prazo do turno.
+    """
+
+    def __init__(self, model: str, latencia_segundos: float = 0.0,
+                 latencia_por_token_segundos: float = 0.0, tokens_saida: int = 60,
+                 max_delegacoes: Optional[int] = None, roteiro: List[Dict[str, str]] = None,
+                 **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.latencia_segundos = latencia_segundos
+        self.latencia_por_token_segundos = latencia_por_token_segundos
+        self.tokens_saida = tokens_saida
+        self.max_delegacoes = max_delegacoes
+        self.roteiro = roteiro or []
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return 1_000_000
+
+    def _texto_modelo(self, papel: str, prompt: str) -> str:
+        referencia = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        palavras = [f"[{papel} #{referencia}]"]
+        while len(palavras) < self.tokens_saida:
+            palavras.append(_PREENCHIMENTO[(len(palavras) - 1) % len(_PREENCHIMENTO)])
+        return " ".join(palavras)
+
+    def _resposta_roteiro(self, papel: str, prompt: str) -> Optional[str]:
+        prompt_lower = prompt.lower()
+        papel_lower = papel.lower()
+        for regra in self.roteiro:
+            if regra.get("contem") and regra["contem"].lower() not in prompt_lower:
+                continue
+            if regra.get("papel") and regra["papel"].lower() not in papel_lower:
+                continue
+            tarefa = _PADRAO_TAREFA.search(prompt)
+            # Só os marcadores suportados: chaves literais (ex: JSON) ficam como estão
+            return (regra["resposta"]
+                    .replace("{papel}", papel)
+                    .replace("{tarefa}", (tarefa.group(1).strip() if tarefa else "")[:200]))
+        return None
+
+    def gerar(self, messages: List[Dict[str, str]]) -> str:
+        """Texto que o modelo falso produziria para a conversa (determinístico)"""
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        papel = _PADRAO_PAPEL.search(prompt)
+        papel = papel.group(1) if papel else "assistente"
+
+        colegas = _PADRAO_COLEGAS.search(prompt)
+        if colegas:
+            nomes = [nome.strip() for nome in colegas.group(1).split(",") if nome.strip()]
+            feitas = len(_PADRAO_DELEGACAO_FEITA.findall(prompt))
+            limite = len(nomes) if self.max_delegacoes is None else min(self.max_delegacoes, len(nomes))
+            if feitas < limite:
+                tarefa = _PADRAO_TAREFA.search(prompt)
+                entrada = {
+                    "task": "Contribua com sua especialidade para a mensagem do cliente",
+                    "context": (tarefa.group(1).strip() if tarefa else "")[:500],
+                    "coworker": nomes[feitas]
+                }
+                return (
+                    f"Thought: Preciso da contribuição de {nomes[feitas]}\n"
+                    f"Action: {FERRAMENTA_DELEGAR}\n"
+                    f"Action Input: {json.dumps(entrada, ensure_ascii=False)}"
+                )
+
+        resposta = self._resposta_roteiro(papel, prompt)
+        if resposta is None:
+            resposta = self._texto_modelo(papel, prompt)
+        if "Final Answer:" in resposta or "Action:" in resposta:
+            return resposta
+        return f"Thought: I now can give a great answer\nFinal Answer: {resposta}"
+
+    def _aguardar(self, segundos: float):
+        """Simula a latência do provedor, estourando como timeout se passar do prazo do turno"""
+        if segundos <= 0:
+            return
+        restante = timeout_restante(None)
+        if restante is not None and segundos > restante:
+            time.sleep(restante)
+            raise PrazoExcedido("Timeout simulado do LLM falso (prazo do turno)")
+        time.sleep(segundos)
+
+    def _chamar(self, messages: List[Dict[str, str]], callbacks: List[Any]) -> str:
+        texto = self.gerar(messages)
+        for parada in self.stop or []:
+            if parada and parada in texto:
+                texto = texto[:texto.index(parada)]
+
+        bytes_prompt = sum(len(str(m.get("content") or "").encode("utf-8")) for m in messages)
+        pedacos = re.findall(r"\S+\s*", texto)
+        contadores_fake.registrar(
+            bytes_prompt=bytes_prompt,
+            tokens_entrada=sum(len(str(m.get("content") or "").split()) for m in messages),
+            tokens_saida=len(pedacos),
+            delegacao=f"Action: {FERRAMENTA_DELEGAR}" in texto
+        )
+
+        self._aguardar(self.latencia_segundos)
+
+        coletor = _coletor_atual.get()
+        if coletor is None or not coletor.aceita(self):
+            self._aguardar(self.latencia_por_token_segundos * len(pedacos))
+            return texto
+
+        coletor.iniciar_chamada()
+        for pedaco in pedacos:
+            self._aguardar(self.latencia_por_token_segundos)
+            coletor.receber(pedaco)
+        coletor.finalizar_chamada()
+        return texto
+
+
+def criar_llm_fake(model: str, temperature: float, max_tokens: Optional[int]) -> FakeLLM:
+    """Cria o LLM falso com os parâmetros de Config (latência, tokens, roteiro)"""
+    from config import Config
+
+    return FakeLLM(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        latencia_segundos=Config.FAKE_LLM_LATENCY_SECONDS,
+        latencia_por_token_segundos=Config.FAKE_LLM_TOKEN_LATENCY_SECONDS,
+        tokens_saida=Config.FAKE_LLM_OUTPUT_TOKENS,
+        max_delegacoes=Config.FAKE_LLM_MAX_DELEGATIONS if Config.FAKE_LLM_MAX_DELEGATIONS >= 0 else None,
+        roteiro=carregar_roteiro(Config.FAKE_LLM_SCRIPT)
+    )
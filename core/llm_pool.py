@@ -0,0 +1,120 @@
+"""
+Pool de clientes LLM compartilhado pelo processo
+Reutiliza instâncias e conexões HTTP entre agentes e sessões do Streamlit
+"""
+
+import os
+import threading
+import logging
+from typing import Dict, Tuple, Optional, Any
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Modelos "fake/<perfil>" usam o LLM falso offline (core.llm_fake)
+PREFIXO_MODELO_FAKE = "fake/"
+
+def eh_modelo_fake(model: Optional[str]) -> bool:
+    return bool(model) and model.startswith(PREFIXO_MODELO_FAKE)
+
+class LLMPool:
+    """Registro thread-safe de instâncias LLM chaveado por (modelo, temperatura, max_tokens, canal)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clientes: Dict[Tuple[str, float, Optional[int], str], Any] = {}
+        self._ambiente_configurado = False
+
+    def obter(self, model: str, temperature: float, max_tokens: Optional[int] = None,
+              api_key: Optional[str] = None, fallback_openai_key: Optional[str] = None,
+              canal: str = "agentes") -> Any:
+        """Retorna a instância compartilhada para a chave, criando-a uma única vez
+
+        O canal separa instâncias com a mesma configuração que precisam ser
+        distinguíveis (ex: o manager da crew, alvo do streaming da resposta final).
+        """
+
+        chave = (model, temperature, max_tokens, canal)
+
+        # Caminho rápido sem lock: leitura de dict é atômica no CPython
+        llm = self._clientes.get(chave)
+        if llm is not None:
+            return llm
+
+        with self._lock:
+            llm = self._clientes.get(chave)
+            if llm is None:
+                self._configurar_ambiente(api_key, fallback_openai_key)
+                llm = self._criar_llm(model, temperature, max_tokens, api_key)
+                self._clientes[chave] = llm
+                logger.info(f"✅ LLM configurado: {model} (temperature={temperature}, max_tokens={max_tokens})")
+
+        return llm
+
+    def _criar_llm(self, model: str, temperature: float, max_tokens: Optional[int],
+                   api_key: Optional[str]) -> Any:
+        """Cria a instância LLM do CrewAI com a chave passada diretamente"""
+        from core.llm_fake import criar_llm_fake
+        from core.llm_streaming import StreamingLLM
+
+        if eh_modelo_fake(model):
+            self.configurar_offline()
+            return criar_llm_fake(model, temperature, max_tokens)
+
+        return StreamingLLM(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_key=api_key
+        )
+
+    def _configurar_ambiente(self, api_key: Optional[str], fallback_openai_key: Optional[str]):
+        """Configura variáveis de ambiente e o cliente HTTP uma única vez por processo"""
+        if self._ambiente_configurado:
+            return
+
+        # Alguns caminhos do CrewAI/litellm ainda leem as chaves do ambiente;
+        # definimos apenas se ausentes, sem reescrever a cada chamada
+        if api_key:
+            os.environ.setdefault("GEMINI_API_KEY", api_key)
+        if fallback_openai_key:
+            os.environ.setdefault("OPENAI_API_KEY", fallback_openai_key)
+
+        self._configurar_http_keepalive()
+        self._ambiente_configurado = True
+
+    def configurar_offline(self):
+        """Execução sem rede (LLM falso): desativa a telemetria do CrewAI"""
+        os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+    def _configurar_http_keepalive(self):
+        """Instala um cliente httpx compartilhado com keep-alive para o litellm"""
+        try:
+            import httpx
+            import litellm
+        except ImportError:
+            return
+
+        if getattr(litellm, "client_session", None) is not None:
+            return
+
+        max_conexoes = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+        litellm.client_session = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=max_conexoes,
+                max_keepalive_connections=max_conexoes,
+                keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", "60"))
+            )
+        )
+
+    def tamanho(self) -> int:
+        """Número de clientes distintos no pool"""
+        return len(self._clientes)
+
+    def limpar(self):
+        """Remove todos os clientes (útil ao trocar configuração em testes)"""
+        with self._lock:
+            self._clientes.clear()
+
+# Instância única compartilhada pelo processo
+llm_pool = LLMPool()
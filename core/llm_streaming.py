@@ -0,0 +1,99 @@
+"""
+LLM do CrewAI com streaming, prazo do turno e agendador de cota
+Módulo separado de core.streaming para que a interface importe o coletor sem
+carregar o CrewAI (e o litellm) antes da primeira chamada ao LLM
+"""
+
+import logging
+from typing import Any, Dict, List
+
+from crewai import LLM
+
+from core.agendador import ChamadaNaoRepetivel, get_agendador
+from core.prazo import verificar_prazo, timeout_restante
+from core.streaming import _coletor_atual
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+
+class StreamingLLM(LLM):
+    """LLM do CrewAI que usa stream=True quando existe um coletor ativo no contexto"""
+
+    def _parametros(self, messages: List[Dict[str, str]], stream: bool) -> Dict[str, Any]:
+        params = {
+            "model": self.model,
+            "messages": messages,
+            # Nenhuma requisição ultrapassa o prazo do turno
+            "timeout": timeout_restante(self.timeout),
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "n": self.n,
+            "stop": self.stop,
+            "max_tokens": self.max_tokens or self.max_completion_tokens,
+            "presence_penalty": self.presence_penalty,
+            "frequency_penalty": self.frequency_penalty,
+            "logit_bias": self.logit_bias,
+            "response_format": self.response_format,
+            "seed": self.seed,
+            "logprobs": self.logprobs,
+            "top_logprobs": self.top_logprobs,
+            "api_base": self.base_url,
+            "api_version": self.api_version,
+            "api_key": self.api_key,
+            "stream": stream,
+            **self.kwargs,
+        }
+        return {k: v for k, v in params.items() if v is not None}
+
+    def call(self, messages: List[Dict[str, str]], callbacks: List[Any] = []) -> str:
+        verificar_prazo()
+
+        # Toda chamada (tasks, manager, delegações) passa pelo agendador de cota
+        agendador = get_agendador()
+        if agendador is None:
+            return self._chamar(messages, callbacks)
+
+        from config import Config
+        return agendador.executar(
+            lambda: self._chamar(messages, callbacks),
+            texto_entrada="".join(str(m.get("content") or "") for m in messages),
+            tokens_saida_estimados=min(self.max_tokens or Config.LLM_OUTPUT_TOKENS_ESTIMATE,
+                                       Config.LLM_OUTPUT_TOKENS_ESTIMATE)
+        )
+
+    def _chamar(self, messages: List[Dict[str, str]], callbacks: List[Any]) -> str:
+        import litellm
+        from crewai.llm import suppress_warnings
+
+        coletor = _coletor_atual.get()
+        with suppress_warnings():
+            if callbacks and len(callbacks) > 0:
+                litellm.callbacks = callbacks
+
+            if coletor is None or not coletor.aceita(self):
+                try:
+                    resposta = litellm.completion(**self._parametros(messages, stream=False))
+                except Exception as e:
+                    logger.error(f"❌ Chamada ao LLM falhou: {e}")
+                    raise
+                return resposta["choices"][0]["message"]["content"]
+
+            coletor.iniciar_chamada()
+            partes = []
+            try:
+                for chunk in litellm.completion(**self._parametros(messages, stream=True)):
+                    delta = chunk.choices[0].delta.content or ""
+                    if delta:
+                        partes.append(delta)
+                        coletor.receber(delta)
+            except Exception as e:
+                # Antes do primeiro token a interface não viu nada e o agendador pode repetir;
+                # depois, nem ele nem o retry do CrewAI voltam a transmitir o mesmo trecho
+                if coletor.emitiu_na_chamada:
+                    coletor.interromper()
+                    raise ChamadaNaoRepetivel(f"Falha após iniciar o streaming da resposta: {e}") from e
+                raise
+            coletor.finalizar_chamada()
+
+        return "".join(partes)
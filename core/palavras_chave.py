@@ -0,0 +1,138 @@
+"""
+Detecção de palavras-chave em uma única passada pelo texto
+Os vocabulários de todos os detectores (knowledge.vocabularios) são compilados uma vez
+num autômato de Aho-Corasick (com as transições de falha já resolvidas, como um DFA);
+uma passada linear devolve todas as categorias presentes. Palavras e texto são comparados
+já normalizados (minúsculas, sem acentos), então "divórcio" e "divorcio" são a mesma
+palavra; a passada por mensagem é feita uma vez em core.caracteristicas
+"""
+
+import re
+import threading
+import logging
+import unicodedata
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Acima deste tamanho, um `in` nativo por palavra distinta sai mais barato que o laço do
+# autômato em Python (benchmarks/palavras_chave.py: cruzamento entre 5 e 10 mil caracteres)
+LIMITE_PASSADA_AUTOMATO = 8000
+
+Categoria = Tuple[str, str]  # (vocabulário, categoria)
+
+# Marcas combinantes que sobram da decomposição NFKD (acentos, til, cedilha)
+_PADRAO_ACENTOS = re.compile(r"[\u0300-\u036f]")
+
+def normalizar_texto(texto: str) -> str:
+    """Texto em minúsculas e sem acentos ("Divórcio" -> "divorcio")"""
+    return _PADRAO_ACENTOS.sub("", unicodedata.normalize("NFKD", texto.lower()))
+
+
+class AutomatoPalavrasChave:
+    """Autômato de Aho-Corasick sobre todas as palavras de vários vocabulários
+
+    `vocabularios` mapeia nome -> {categoria: [palavras]}; buscar() devolve, para cada
+    vocabulário, as categorias com alguma palavra no texto, na ordem em que foram definidas.
+    O texto recebido por buscar() já deve estar normalizado (normalizar_texto).
+    """
+
+    def __init__(self, vocabularios: Dict[str, Dict[str, Iterable[str]]]):
+        self._ordem: Dict[str, List[str]] = {
+            nome: list(categorias) for nome, categorias in vocabularios.items()
+        }
+
+        # Trie das palavras normalizadas com as categorias que terminam em cada nó
+        transicoes: List[Dict[str, int]] = [{}]
+        saidas: List[set] = [set()]
+        self._categorias_por_palavra: Dict[str, set] = {}
+        for nome, categorias in vocabularios.items():
+            for categoria, palavras in categorias.items():
+                for palavra in map(normalizar_texto, palavras):
+                    self._categorias_por_palavra.setdefault(palavra, set()).add((nome, categoria))
+                    no = 0
+                    for caractere in palavra:
+                        proximo = transicoes[no].get(caractere)
+                        if proximo is None:
+                            proximo = len(transicoes)
+                            transicoes.append({})
+                            saidas.append(set())
+                            transicoes[no][caractere] = proximo
+                        no = proximo
+                    saidas[no].add((nome, categoria))
+
+        # Links de falha em largura; cada nó herda as saídas do seu link (sufixos que
+        # também são palavras) e ganha as transições do link, virando um DFA: a busca
+        # faz um único acesso a dict por caractere, sem voltar pelos links
+        falha = [0] * len(transicoes)
+        fila = deque(transicoes[0].values())
+        while fila:
+            no = fila.popleft()
+            saidas[no] |= saidas[falha[no]]
+            for caractere, filho in transicoes[no].items():
+                fila.append(filho)
+                if no:
+                    falha[filho] = transicoes[falha[no]].get(caractere, 0)
+            if no:
+                for caractere, destino in transicoes[falha[no]].items():
+                    transicoes[no].setdefault(caractere, destino)
+
+        self._transicoes = transicoes
+        self._saidas: List[Optional[FrozenSet[Categoria]]] = [
+            frozenset(saida) if saida else None for saida in saidas
+        ]
+
+    @property
+    def num_estados(self) -> int:
+        return len(self._transicoes)
+
+    def categorias_presentes(self, texto: str) -> FrozenSet[Categoria]:
+        """Todas as (vocabulário, categoria) com alguma palavra no texto normalizado, em uma passada"""
+        if len(texto) > LIMITE_PASSADA_AUTOMATO:
+            return self._varrer_palavras(texto)
+
+        transicoes = self._transicoes
+        saidas = self._saidas
+        no = 0
+        encontradas = set()
+        for caractere in texto:
+            no = transicoes[no].get(caractere, 0)
+            saida = saidas[no]
+            if saida is not None:
+                encontradas |= saida
+        return frozenset(encontradas)
+
+    def _varrer_palavras(self, texto: str) -> FrozenSet[Categoria]:
+        """Mesmo resultado com um `in` por palavra distinta (textos muito longos)"""
+        encontradas = set()
+        for palavra, categorias in self._categorias_por_palavra.items():
+            # Como o any() antigo: categorias já encontradas não precisam de outra varredura
+            if not categorias <= encontradas and palavra in texto:
+                encontradas |= categorias
+        return frozenset(encontradas)
+
+    def buscar(self, texto: str) -> Dict[str, Tuple[str, ...]]:
+        """Categorias encontradas por vocabulário, na ordem de definição"""
+        encontradas = self.categorias_presentes(texto)
+        return {
+            nome: tuple(categoria for categoria in categorias if (nome, categoria) in encontradas)
+            for nome, categorias in self._ordem.items()
+        }
+
+
+_automato: Optional[AutomatoPalavrasChave] = None
+_automato_lock = threading.Lock()
+
+def get_automato() -> AutomatoPalavrasChave:
+    """Retorna o autômato com todos os vocabulários, compilado uma vez por processo"""
+    global _automato
+
+    if _automato is None:
+        with _automato_lock:
+            if _automato is None:
+                from knowledge.vocabularios import VOCABULARIOS
+                _automato = AutomatoPalavrasChave(VOCABULARIOS)
+                logger.info(f"🔤 Vocabulários compilados ({_automato.num_estados} estados)")
+    return _automato
@@ -0,0 +1,61 @@
+"""
+Prazo (deadline) por turno propagado a todas as chamadas ao LLM do turno
+O prazo vive em um contextvar e acompanha as threads do fan-out e da crew
+"""
+
+import time
+import contextvars
+from typing import Any, Callable, Optional
+
+class PrazoExcedido(TimeoutError):
+    """O orçamento de latência do turno terminou antes da chamada"""
+
+
+class Prazo:
+    """Instante limite (relógio monotônico) para concluir o trabalho do turno"""
+
+    def __init__(self, segundos: float, limite: float = None):
+        self.segundos = segundos
+        self.limite = limite if limite is not None else time.monotonic() + segundos
+
+    def restante(self) -> float:
+        return max(0.0, self.limite - time.monotonic())
+
+    def expirado(self) -> bool:
+        return time.monotonic() >= self.limite
+
+    def antecipado(self, reserva_segundos: float) -> "Prazo":
+        """Prazo que termina `reserva_segundos` antes deste (ex: especialistas antes da síntese)"""
+        limite = max(time.monotonic(), self.limite - reserva_segundos)
+        return Prazo(self.segundos - reserva_segundos, limite=limite)
+
+
+_prazo_atual: contextvars.ContextVar[Optional[Prazo]] = contextvars.ContextVar("prazo_turno", default=None)
+
+def iniciar_prazo(segundos: float) -> Optional[Prazo]:
+    """Define o prazo do turno no contexto atual (segundos <= 0 desativa)"""
+    prazo = Prazo(segundos) if segundos and segundos > 0 else None
+    _prazo_atual.set(prazo)
+    return prazo
+
+def prazo_atual() -> Optional[Prazo]:
+    return _prazo_atual.get()
+
+def executar_com_prazo(prazo: Optional[Prazo], funcao: Callable[[], Any]) -> Any:
+    """Executa a função com outro prazo (None = sem prazo, ex: análises em background)"""
+    _prazo_atual.set(prazo)
+    return funcao()
+
+def verificar_prazo(descricao: str = "chamada ao LLM"):
+    """Interrompe o trabalho se o prazo do turno já passou"""
+    prazo = _prazo_atual.get()
+    if prazo is not None and prazo.expirado():
+        raise PrazoExcedido(f"Prazo do turno ({prazo.segundos:.0f}s) esgotado antes da {descricao}")
+
+def timeout_restante(timeout_padrao: Optional[float] = None) -> Optional[float]:
+    """Timeout de uma requisição: o menor entre o padrão do LLM e o que resta do prazo"""
+    prazo = _prazo_atual.get()
+    if prazo is None:
+        return timeout_padrao
+    restante = prazo.restante()
+    return restante if timeout_padrao is None else min(timeout_padrao, restante)
@@ -0,0 +1,274 @@
+"""
+Recuperação dos trechos da base de conhecimento relevantes para a mensagem do turno
+As seções de Carter & McGoldrick do snapshot (knowledge.base_compilada) são divididas em
+passagens (um nó do conteúdo por passagem) e indexadas com BM25 na primeira consulta do
+processo. Cada chamada ao LLM do turno recebe só as melhores passagens para a mensagem,
+em vez de personas longas que repetem a teoria em toda chamada
+"""
+
+import re
+import math
+import time
+import heapq
+import threading
+import contextvars
+import logging
+from collections import Counter
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.agendador import estimar_tokens
+from core.caracteristicas import extrair_caracteristicas
+from core.contexto import formatar_valor
+from core.palavras_chave import normalizar_texto
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Seções indexadas (nome no snapshot -> título das passagens)
+SECOES_INDEXADAS = {
+    "CONCEITOS_FUNDAMENTAIS": "Conceitos fundamentais",
+    "TRIANGULACOES_FAMILIARES": "Triangulações familiares",
+    "INTERVENCOES_TERAPEUTICAS": "Intervenções terapêuticas",
+    "GENETOGRAMA_GUIDE": "Guia do genetograma"
+}
+
+# Nós maiores que isso viram uma passagem por chave
+MAX_PALAVRAS_PASSAGEM = 180
+
+# Parâmetros usuais do BM25
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Radical por prefixo: "triangulação"/"triangulações" e "divórcio"/"divorciada" caem no mesmo termo
+TAMANHO_RADICAL = 6
+
+# Palavras frequentes que não distinguem passagens (já normalizadas, sem acento)
+STOPWORDS = frozenset("""
+    a ao aos aquela aquele aquilo as ate com como da das de dela dele deles depois do dos e
+    ela ele eles em entre era essa esse esta estao estar este eu foi for ha isso isto ja la
+    lhe mais mas me mesmo meu meus minha minhas muito na nao nas nem no nos nossa nosso o os
+    ou para pela pelas pelo pelos por qual quando que quem se sem ser seu seus sua suas tambem
+    te tem tenho ter teu tua um uma umas uns voce voces vou estou sou tudo bem oi ola sobre
+""".split())
+
+_PADRAO_TOKEN = re.compile(r"\w+")
+
+def termos(tokens: List[str]) -> List[str]:
+    """Termos indexáveis (radicais) a partir de tokens já normalizados"""
+    return [
+        token[:TAMANHO_RADICAL] for token in tokens
+        if len(token) > 2 and token not in STOPWORDS and not token.isdigit()
+    ]
+
+def _rotulo(chave: str) -> str:
+    return chave.replace("_", " ")
+
+
+class Passagem:
+    """Trecho da base de conhecimento: título (caminho no conteúdo) e texto"""
+
+    __slots__ = ("titulo", "texto", "tokens")
+
+    def __init__(self, titulo: str, texto: str):
+        self.titulo = titulo
+        self.texto = texto
+        self.tokens = estimar_tokens(self.formatada())
+
+    def formatada(self) -> str:
+        return f"[{self.titulo}]\n{self.texto}"
+
+
+def _passagens_do_no(valor: Any, caminho: List[str]) -> Iterator[Passagem]:
+    """Uma passagem com as folhas de cada nó (listas e textos); os sub-dicts recursivamente"""
+    if not isinstance(valor, Mapping):
+        yield Passagem(" › ".join(caminho), formatar_valor(valor))
+        return
+
+    folhas = {chave: item for chave, item in valor.items() if not isinstance(item, Mapping)}
+    if folhas:
+        texto = formatar_valor(folhas)
+        if len(texto.split()) <= MAX_PALAVRAS_PASSAGEM:
+            yield Passagem(" › ".join(caminho), texto)
+        else:
+            for chave, item in folhas.items():
+                yield Passagem(" › ".join(caminho + [_rotulo(chave)]), formatar_valor(item))
+
+    for chave, item in valor.items():
+        if isinstance(item, Mapping):
+            yield from _passagens_do_no(item, caminho + [_rotulo(chave)])
+
+def passagens_da_base() -> List[Passagem]:
+    """Passagens das seções indexadas do snapshot da base de conhecimento"""
+    from knowledge.base_compilada import get_base_conhecimento
+    base = get_base_conhecimento()
+    passagens = []
+    for nome, titulo in SECOES_INDEXADAS.items():
+        passagens.extend(_passagens_do_no(base.secao(nome), [titulo]))
+    return passagens
+
+
+class IndiceBM25:
+    """Índice invertido com pontuação BM25 sobre uma lista de passagens"""
+
+    def __init__(self, passagens: List[Passagem], k1: float = BM25_K1, b: float = BM25_B):
+        self.passagens = passagens
+        self.k1 = k1
+        self.b = b
+
+        # termo -> [(passagem, frequência)]
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._tamanhos: List[int] = []
+        for i, passagem in enumerate(passagens):
+            texto = normalizar_texto(f"{passagem.titulo}\n{passagem.texto}")
+            frequencias = Counter(termos(_PADRAO_TOKEN.findall(texto)))
+            self._tamanhos.append(sum(frequencias.values()))
+            for termo, frequencia in frequencias.items():
+                self._postings.setdefault(termo, []).append((i, frequencia))
+
+        total = len(passagens)
+        self._tamanho_medio = (sum(self._tamanhos) / total) if total else 0.0
+        self._idf = {
+            termo: math.log(1 + (total - len(lista) + 0.5) / (len(lista) + 0.5))
+            for termo, lista in self._postings.items()
+        }
+
+    @property
+    def num_termos(self) -> int:
+        return len(self._postings)
+
+    def buscar(self, termos_consulta: List[str], k: int) -> List[Tuple[int, float]]:
+        """As k passagens de maior pontuação (índice, pontuação), só as com algum termo"""
+        pontuacoes: Dict[int, float] = {}
+        for termo in set(termos_consulta):
+            lista = self._postings.get(termo)
+            if not lista:
+                continue
+            idf = self._idf[termo]
+            for i, frequencia in lista:
+                normalizacao = self.k1 * (1 - self.b + self.b * self._tamanhos[i] / self._tamanho_medio)
+                pontuacoes[i] = pontuacoes.get(i, 0.0) + idf * frequencia * (self.k1 + 1) / (frequencia + normalizacao)
+        return heapq.nlargest(k, pontuacoes.items(), key=lambda item: item[1])
+
+
+class _EstatisticasRecuperacao:
+    """Totais das referências anexadas aos prompts no processo"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.com_referencias = 0
+        self.passagens = 0
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def registrar(self, passagens: List[Passagem]):
+        with self._lock:
+            self.consultas += 1
+            self.com_referencias += int(bool(passagens))
+            self.passagens += len(passagens)
+            self.tokens += sum(p.tokens for p in passagens)
+
+    def como_dict(self) -> dict:
+        with self._lock:
+            return {
+                "consultas": self.consultas,
+                "consultas_com_referencias": self.com_referencias,
+                "passagens_anexadas": self.passagens,
+                "tokens_anexados": self.tokens,
+                "tokens_medio": round(self.tokens / self.consultas, 1) if self.consultas else 0.0
+            }
+
+
+_estatisticas = _EstatisticasRecuperacao()
+
+_indice: Optional[IndiceBM25] = None
+_indice_lock = threading.Lock()
+
+def get_indice_conhecimento() -> IndiceBM25:
+    """Retorna o índice BM25 da base de conhecimento, construído uma vez por processo"""
+    global _indice
+
+    if _indice is None:
+        with _indice_lock:
+            if _indice is None:
+                inicio = time.perf_counter()
+                _indice = IndiceBM25(passagens_da_base())
+                logger.info(f"🔎 Índice da base de conhecimento: {len(_indice.passagens)} passagens, "
+                            f"{_indice.num_termos} termos em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+    return _indice
+
+@lru_cache(maxsize=64)
+def _buscar(consulta: str, k: int, max_tokens: int) -> Tuple[Passagem, ...]:
+    indice = get_indice_conhecimento()
+    selecionadas, total = [], 0
+    for i, _ in indice.buscar(termos(extrair_caracteristicas(consulta).tokens), k * 2):
+        passagem = indice.passagens[i]
+        if total + passagem.tokens > max_tokens:
+            continue
+        selecionadas.append(passagem)
+        total += passagem.tokens
+        if len(selecionadas) == k:
+            break
+    return tuple(selecionadas)
+
+def buscar_passagens(consulta: str, k: int = None, max_tokens: int = None) -> List[Passagem]:
+    """Melhores passagens para a consulta, até k e dentro de max_tokens (padrões do Config)"""
+    if not consulta:
+        return []
+    from config import Config
+    k = Config.RAG_TOP_K if k is None else k
+    max_tokens = Config.RAG_MAX_TOKENS if max_tokens is None else max_tokens
+    return list(_buscar(consulta, k, max_tokens))
+
+def formatar_referencias(passagens: List[Passagem]) -> str:
+    return "\n\n".join(passagem.formatada() for passagem in passagens)
+
+
+# Mensagem do turno em andamento: acompanha as threads do fan-out (core.fanout copia o contexto)
+_consulta_turno: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("consulta_turno", default=None)
+
+# Chamadas que não usam a teoria (ex.: resumo do histórico) desligam as referências no seu contexto
+_referencias_ativas: contextvars.ContextVar[bool] = contextvars.ContextVar("referencias_ativas", default=True)
+
+def definir_consulta_turno(mensagem: Optional[str]):
+    """Mensagem usada para recuperar as referências das chamadas ao LLM do contexto atual"""
+    _consulta_turno.set(mensagem or None)
+
+def consulta_turno() -> Optional[str]:
+    return _consulta_turno.get()
+
+def desativar_referencias():
+    """As chamadas ao LLM do contexto atual não recebem referências da base"""
+    _referencias_ativas.set(False)
+
+def referencias_turno(consulta_padrao: Optional[str] = None) -> str:
+    """Referências da base para a mensagem do turno, ou para consulta_padrao fora de um turno
+
+    Retorna "" sem consulta, com as referências desativadas ou sem passagens relevantes.
+    """
+    from config import Config
+    consulta = _consulta_turno.get() or consulta_padrao
+    if not Config.RAG_ENABLED or not consulta or not _referencias_ativas.get():
+        return ""
+    passagens = buscar_passagens(consulta)
+    _estatisticas.registrar(passagens)
+    return formatar_referencias(passagens)
+
+def anexar_referencias(prompt: str) -> str:
+    """Prompt com as passagens da base relevantes para a mensagem do turno ao final
+
+    Chamadas diretas aos agentes, fora de um turno do orquestrador, buscam pelo próprio
+    prompt: as personas são curtas e a teoria chega só por aqui.
+    """
+    referencias = referencias_turno(consulta_padrao=prompt)
+    if not referencias:
+        return prompt
+    return (f"{prompt}\n\nREFERÊNCIAS DE CARTER & McGOLDRICK (trechos da base relacionados à "
+            f"mensagem; use apenas o que for pertinente):\n{referencias}")
+
+def estatisticas_recuperacao() -> dict:
+    indice = _indice
+    dados = _estatisticas.como_dict()
+    dados["indice"] = {"passagens": len(indice.passagens), "termos": indice.num_termos} if indice else None
+    return dados
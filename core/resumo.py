@@ -0,0 +1,127 @@
+"""
+Resumo incremental do histórico da sessão
+A cada K turnos, os turnos que saíram da janela literal são incorporados em background
+ao resumo corrente; os prompts levam o resumo + todos os turnos que ele ainda não cobre
+(no mínimo os últimos turnos literais), então nenhum turno fica fora do contexto e o
+tamanho dele fica estável à medida que a sessão cresce
+"""
+
+import logging
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.fanout import submeter_background
+from core.recuperacao import desativar_referencias
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+def formatar_turno(entrada: Dict[str, Any]) -> str:
+    """Texto de um turno do histórico (formatos dos dois orquestradores)"""
+    fala = entrada.get("contexto") or entrada.get("conteudo") or ""
+    resposta = entrada.get("resposta_crew", entrada.get("resposta", ""))
+    if isinstance(resposta, dict):
+        resposta = resposta.get("resposta", "")
+    return f"Cliente: {fala}\nEquipe: {resposta}"
+
+
+class ResumidorIncremental:
+    """Mantém session_state["resumo"] atualizado sem bloquear o turno
+
+    Campos usados no estado da sessão (persistidos pelo SessionStore):
+    - "num_interacoes": total de turnos da sessão
+    - "resumo": resumo dos turnos anteriores à janela literal
+    - "resumo_ate": quantos turnos (desde o início) o resumo já cobre
+    """
+
+    def __init__(self, resumir: Callable[[str, List[str]], str], a_cada_turnos: int = 4,
+                 turnos_literais: int = 3, max_caracteres: int = 2000,
+                 carregar_turnos: Callable[[int, int], List[Dict[str, Any]]] = None):
+        self.resumir = resumir
+        self.a_cada_turnos = a_cada_turnos
+        self.turnos_literais = turnos_literais
+        self.max_caracteres = max_caracteres
+        # Turnos [inicio, fim) que já saíram do anel em memória (ex: SessionStore.pagina_historico)
+        self.carregar_turnos = carregar_turnos
+        self._em_andamento: Optional[Future] = None
+
+    def recentes(self, estado: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Turnos que entram literalmente no prompt: todos os que o resumo ainda não cobre,
+        no mínimo os últimos `turnos_literais`"""
+        historico = estado["historico"]
+        # Posição absoluta de historico[0]: o histórico carregado pode trazer só o recente
+        base = estado["num_interacoes"] - len(historico)
+        inicio = min(estado["resumo_ate"], estado["num_interacoes"] - self.turnos_literais)
+        anteriores: List[Dict[str, Any]] = []
+        if inicio < base and self.carregar_turnos is not None:
+            # Resumo atrasado: os turnos descobertos que já saíram do anel vêm do log
+            anteriores = list(self.carregar_turnos(max(inicio, 0), base))
+        return anteriores + historico[max(inicio - base, 0):]
+
+    def _pendentes(self, estado: Dict[str, Any]) -> Tuple[int, List[Dict[str, Any]]]:
+        """(posição do primeiro, turnos) que já saíram da janela literal e ainda não estão no resumo"""
+        historico = estado["historico"]
+        total = estado["num_interacoes"]
+        fim = total - self.turnos_literais
+        inicio = estado["resumo_ate"]
+        if fim - inicio < self.a_cada_turnos:
+            return inicio, []
+
+        base = total - len(historico)
+        anteriores: List[Dict[str, Any]] = []
+        if inicio < base:
+            # Turnos que já saíram do anel (ex: resumo atrasado): lidos do log da sessão
+            if self.carregar_turnos is not None:
+                anteriores = list(self.carregar_turnos(inicio, base))
+            if len(anteriores) != base - inicio:
+                logger.warning(f"⚠️ Turnos {inicio}-{base} fora do anel e do log; o resumo segue a partir de {base}")
+                inicio, anteriores = base, []
+        return inicio, anteriores + historico[max(inicio - base, 0):fim - base]
+
+    def atualizar(self, estado: Dict[str, Any],
+                  ao_concluir: Callable[[Dict[str, Any]], None] = None) -> Optional[Future]:
+        """Agenda a atualização do resumo se houver K turnos pendentes (uma por vez por sessão)"""
+        if self._em_andamento is not None and not self._em_andamento.done():
+            return None
+
+        inicio, pendentes = self._pendentes(estado)
+        if not pendentes:
+            return None
+
+        resumo_anterior = estado["resumo"]
+        # Cobertura contada pelos turnos entregues ao resumo, não pelo total da sessão
+        cobertos = inicio + len(pendentes)
+        turnos = [formatar_turno(entrada) for entrada in pendentes]
+
+        # Fora do caminho da resposta: pool e prazo próprios, sem as referências do turno
+        futuro = submeter_background(lambda: self._resumir_sem_referencias(resumo_anterior, turnos))
+        futuro.add_done_callback(lambda f: self._anexar(estado, cobertos, f, ao_concluir))
+        self._em_andamento = futuro
+        return futuro
+
+    def _resumir_sem_referencias(self, resumo_anterior: str, turnos: List[str]) -> str:
+        desativar_referencias()
+        return self.resumir(resumo_anterior, turnos)
+
+    def _anexar(self, estado: Dict[str, Any], cobertos: int, futuro: Future,
+                ao_concluir: Callable[[Dict[str, Any]], None] = None):
+        try:
+            resumo = futuro.result()
+        except Exception as e:
+            # O resumo anterior continua valendo; a próxima atualização tenta de novo
+            logger.warning(f"⚠️ Falha ao atualizar o resumo da sessão: {e}")
+            return
+
+        estado["resumo"] = resumo.strip()[:self.max_caracteres]
+        estado["resumo_ate"] = cobertos
+        logger.info(f"📝 Resumo da sessão atualizado ({cobertos} turnos, {len(estado['resumo'])} caracteres)")
+        if ao_concluir:
+            ao_concluir(estado)
+
+    def aguardar(self, timeout: Optional[float] = None):
+        """Espera a atualização em andamento (benchmarks, encerramento)"""
+        if self._em_andamento is not None:
+            try:
+                self._em_andamento.result(timeout=timeout)
+            except Exception:
+                pass
@@ -0,0 +1,83 @@
+"""
+Roteador local (sem LLM) que decide quais especialistas participam de cada turno
+Baseado nas tabelas de palavras-chave do orquestrador e da base de conhecimento
+"""
+
+import re
+import time
+from typing import Dict, Any, List, Union
+
+from core.caracteristicas import MessageFeatures, extrair_caracteristicas
+from knowledge.vocabularios import PALAVRAS_CHAVE_AGENTES
+
+ESPECIALISTAS = ("genetograma", "ciclo_vida", "padroes", "reflexao")
+
+# Palavras-chave por agente: knowledge.vocabularios.PALAVRAS_CHAVE_AGENTES (compiladas em
+# core.palavras_chave; as sugestões da interface sem crew usam SUGESTOES_AGENTES)
+
+# Cumprimentos e check-ins curtos que não precisam de especialistas nem do manager
+# (comparados com o texto normalizado: minúsculas e sem acentos)
+_PADRAO_SAUDACAO = re.compile(
+    r"^\W*(oi+|ola|e ai|bom dia|boa tarde|boa noite|tudo bem|tudo bom|"
+    r"obrigad[oa]|valeu|ok|certo|entendi|tchau|ate mais)\b"
+)
+
+# Abaixo deste número de palavras, mensagens sem sinais são tratadas como check-in
+MAX_PALAVRAS_CHECKIN = 8
+
+# Mensagens longas sem sinais específicos ainda recebem o facilitador de reflexão
+MIN_PALAVRAS_REFLEXAO = 15
+
+def sugerir_agentes_por_palavras(texto: Union[str, MessageFeatures]) -> List[str]:
+    """Agentes cujas palavras-chave aparecem no texto"""
+    return extrair_caracteristicas(texto).categorias_de("agentes")
+
+class RoteadorLocal:
+    """Decide, em CPU e sem chamadas ao LLM, a composição da equipe para o turno"""
+
+    def rotear(self, mensagem: Union[str, MessageFeatures]) -> Dict[str, Any]:
+        """Retorna especialistas selecionados, se o manager pode ser pulado e o motivo"""
+        inicio = time.perf_counter()
+
+        # Uma extração para todos os detectores do turno (os especialistas reaproveitam)
+        caracteristicas = extrair_caracteristicas(mensagem)
+        num_palavras = caracteristicas.num_palavras
+        sinais: Dict[str, List[str]] = {}
+
+        encontradas = caracteristicas.categorias
+        selecionados = set(a for a in encontradas["agentes"] if a in ESPECIALISTAS)
+
+        triangulacoes = list(encontradas["triangulacoes"])
+        padroes = list(encontradas["padroes_geracionais"])
+        if triangulacoes or padroes:
+            selecionados.add("padroes")
+            sinais["padroes"] = triangulacoes + padroes
+
+        variacoes = list(encontradas["variacoes_ciclo_vida"])
+        if variacoes or caracteristicas.idades:
+            selecionados.add("ciclo_vida")
+            sinais["ciclo_vida"] = variacoes
+
+        saudacao = bool(_PADRAO_SAUDACAO.match(caracteristicas.texto_normalizado))
+
+        if not selecionados and (saudacao or num_palavras <= MAX_PALAVRAS_CHECKIN):
+            motivo = "saudacao" if saudacao else "checkin_curto"
+            pular_manager = True
+        elif not selecionados and num_palavras >= MIN_PALAVRAS_REFLEXAO:
+            selecionados.add("reflexao")
+            motivo = "relato_sem_sinais_especificos"
+            pular_manager = False
+        elif not selecionados:
+            motivo = "sem_sinais"
+            pular_manager = True
+        else:
+            motivo = "palavras_chave"
+            pular_manager = False
+
+        return {
+            "especialistas": [e for e in ESPECIALISTAS if e in selecionados],
+            "pular_manager": pular_manager,
+            "motivo": motivo,
+            "sinais": sinais,
+            "tempo_ms": (time.perf_counter() - inicio) * 1000
+        }
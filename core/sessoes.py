@@ -0,0 +1,419 @@
+"""
+Armazenamento do estado das sessões de conversa
+Em memória (padrão, por processo) ou em SQLite WAL, para que qualquer instância
+retome uma sessão pelo id; o histórico é um log por sessão (em disco nos dois casos)
+e o carregamento traz apenas as entradas recentes, então nem o tempo de carga nem a
+memória crescem com a conversa
+"""
+
+import os
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import weakref
+import logging
+from abc import ABC, abstractmethod
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+CHAVE_HISTORICO = "historico"
+
+def _sem_historico(estado: Dict[str, Any]) -> Dict[str, Any]:
+    return {chave: valor for chave, valor in estado.items() if chave != CHAVE_HISTORICO}
+
+def _serializar(valor: Any) -> str:
+    # Respostas dos agentes podem trazer objetos não-JSON; guardamos a representação textual
+    return json.dumps(valor, ensure_ascii=False, default=str)
+
+
+class SessionStore(ABC):
+    """Interface dos armazenamentos de sessão usados pelos orquestradores
+
+    O estado é um dict; a chave "historico" é tratada à parte como um log só de
+    acréscimo (anexar_historico), e carregar() devolve só as últimas entradas.
+    """
+
+    # Frequência (em gravações de estado) da remoção de sessões expiradas
+    INTERVALO_EXPIRACAO = 100
+
+    def __init__(self, limite_historico: int = 20):
+        self.limite_historico = limite_historico
+
+    @abstractmethod
+    def carregar(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Estado da sessão com as últimas `limite_historico` entradas (None se não existe)"""
+
+    @abstractmethod
+    def salvar_estado(self, session_id: str, estado: Dict[str, Any]):
+        """Grava os campos do estado (exceto o histórico)"""
+
+    @abstractmethod
+    def anexar_historico(self, session_id: str, entrada: Dict[str, Any]):
+        """Acrescenta uma entrada ao histórico da sessão"""
+
+    @abstractmethod
+    def historico(self, session_id: str) -> List[Dict[str, Any]]:
+        """Histórico completo da sessão, em ordem cronológica"""
+
+    @abstractmethod
+    def pagina_historico(self, session_id: str, inicio: int, fim: int) -> List[Dict[str, Any]]:
+        """Turnos nas posições [inicio, fim) do histórico (0 = primeiro turno)"""
+
+    @abstractmethod
+    def remover(self, session_id: str):
+        """Apaga o estado e o histórico da sessão"""
+
+    def manter_viva(self, session_id: str, dono: Any):
+        """Registra quem está com a sessão aberta (ex: o orquestrador de uma aba)
+
+        Stores com expiração curta não removem a sessão enquanto algum dono existir.
+        """
+
+
+class LogArquivoHistorico:
+    """Log de histórico só de acréscimo em JSONL, um arquivo por sessão
+
+    Em memória fica só o offset de cada linha (8 bytes por turno), o que permite ler
+    qualquer página com um seek em vez de percorrer o arquivo.
+    """
+
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+        self._offsets: Dict[str, array] = {}
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, session_id: str) -> str:
+        # O id pode vir da URL: o nome do arquivo é um hash, nunca o id em si
+        nome = hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.diretorio, f"{nome}.jsonl")
+
+    def _indice(self, session_id: str) -> array:
+        """Offsets das linhas; reconstruído do arquivo na primeira leitura após um restart"""
+        offsets = self._offsets.get(session_id)
+        if offsets is None:
+            offsets = array("q")
+            caminho = self._caminho(session_id)
+            if os.path.exists(caminho):
+                posicao = 0
+                with open(caminho, "rb") as arquivo:
+                    for linha in arquivo:
+                        offsets.append(posicao)
+                        posicao += len(linha)
+            self._offsets[session_id] = offsets
+        return offsets
+
+    def anexar(self, session_id: str, entrada: Dict[str, Any]):
+        linha = (_serializar(entrada) + "\n").encode("utf-8")
+        with self._lock:
+            offsets = self._indice(session_id)
+            with open(self._caminho(session_id), "ab") as arquivo:
+                posicao = arquivo.seek(0, os.SEEK_END)
+                arquivo.write(linha)
+            offsets.append(posicao)
+
+    def total(self, session_id: str) -> int:
+        with self._lock:
+            return len(self._indice(session_id))
+
+    def pagina(self, session_id: str, inicio: int, fim: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            offsets = self._indice(session_id)
+            inicio, fim = max(inicio, 0), min(fim, len(offsets))
+            if inicio >= fim:
+                return []
+            posicao = offsets[inicio]
+
+        with open(self._caminho(session_id), "rb") as arquivo:
+            arquivo.seek(posicao)
+            return [json.loads(arquivo.readline()) for _ in range(fim - inicio)]
+
+    def remover(self, session_id: str):
+        with self._lock:
+            self._offsets.pop(session_id, None)
+            try:
+                os.remove(self._caminho(session_id))
+            except FileNotFoundError:
+                pass
+
+    def expirar(self, limite: float, manter: Iterable[str] = ()) -> int:
+        """Apaga os logs sem acréscimos desde `limite` (epoch), exceto os das sessões em
+        `manter`; cobre os de sessões que ficaram para trás num restart"""
+        manter = {os.path.basename(self._caminho(session_id)) for session_id in manter}
+        removidos = 0
+        with self._lock:
+            for entrada in os.scandir(self.diretorio):
+                if not entrada.name.endswith(".jsonl") or entrada.name in manter:
+                    continue
+                try:
+                    if entrada.stat().st_mtime < limite:
+                        os.remove(entrada.path)
+                        removidos += 1
+                except FileNotFoundError:
+                    pass
+        return removidos
+
+
+class MemoriaSessionStore(SessionStore):
+    """Estado das sessões no próprio processo (perdido ao reciclar a instância)
+
+    O histórico vai para o log em disco (LogArquivoHistorico); sem diretório, fica em
+    listas na memória, como antes. Sessões sem atividade há mais de ttl_segundos e sem
+    nenhum dono vivo (manter_viva) são removidas (estado, histórico e arquivo de log),
+    como no SQLiteSessionStore: uma aba ociosa mas aberta não perde a conversa, e a
+    sessão expira depois que o orquestrador dela sai da memória.
+    """
+
+    def __init__(self, limite_historico: int = 20, diretorio_log: Optional[str] = None,
+                 ttl_segundos: float = 3600):
+        super().__init__(limite_historico)
+        self.ttl_segundos = ttl_segundos
+        self._estados: Dict[str, Dict[str, Any]] = {}
+        self._historicos: Dict[str, List[Dict[str, Any]]] = {}
+        self._atualizado_em: Dict[str, float] = {}
+        self._donos: Dict[str, "weakref.WeakSet"] = {}
+        self._gravacoes = 0
+        self._log = LogArquivoHistorico(diretorio_log) if diretorio_log else None
+        self._lock = threading.Lock()
+        # Logs deixados por um processo anterior cujo estado já se perdeu
+        if self._log is not None:
+            self._log.expirar(time.time() - self.ttl_segundos)
+
+    def manter_viva(self, session_id: str, dono: Any):
+        with self._lock:
+            self._donos.setdefault(session_id, weakref.WeakSet()).add(dono)
+
+    def _tem_dono(self, session_id: str) -> bool:
+        donos = self._donos.get(session_id)
+        if donos is not None and not donos:
+            del self._donos[session_id]
+            return False
+        return donos is not None
+
+    def _expirada(self, session_id: str, limite: float = None) -> bool:
+        """Sem atividade desde `limite` (padrão: agora menos o TTL) e sem dono vivo"""
+        limite = time.time() - self.ttl_segundos if limite is None else limite
+        atualizado_em = self._atualizado_em.get(session_id)
+        return atualizado_em is not None and atualizado_em < limite and not self._tem_dono(session_id)
+
+    def carregar(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            estado = self._estados.get(session_id)
+            if estado is None or self._expirada(session_id):
+                return None
+            estado = copy.deepcopy(estado)
+
+        total = self._total(session_id)
+        estado[CHAVE_HISTORICO] = self.pagina_historico(session_id, total - self.limite_historico, total)
+        return estado
+
+    def salvar_estado(self, session_id: str, estado: Dict[str, Any]):
+        with self._lock:
+            self._estados[session_id] = copy.deepcopy(_sem_historico(estado))
+            self._atualizado_em[session_id] = time.time()
+            self._gravacoes += 1
+            executar_expiracao = self._gravacoes % self.INTERVALO_EXPIRACAO == 0
+        if executar_expiracao:
+            self.expirar()
+
+    def anexar_historico(self, session_id: str, entrada: Dict[str, Any]):
+        if self._log is not None:
+            self._log.anexar(session_id, entrada)
+            with self._lock:
+                self._atualizado_em[session_id] = time.time()
+            return
+        with self._lock:
+            self._historicos.setdefault(session_id, []).append(copy.deepcopy(entrada))
+            self._atualizado_em[session_id] = time.time()
+
+    def _total(self, session_id: str) -> int:
+        if self._log is not None:
+            return self._log.total(session_id)
+        with self._lock:
+            return len(self._historicos.get(session_id, []))
+
+    def historico(self, session_id: str) -> List[Dict[str, Any]]:
+        return self.pagina_historico(session_id, 0, self._total(session_id))
+
+    def pagina_historico(self, session_id: str, inicio: int, fim: int) -> List[Dict[str, Any]]:
+        if self._log is not None:
+            return self._log.pagina(session_id, inicio, fim)
+        with self._lock:
+            return copy.deepcopy(self._historicos.get(session_id, [])[max(inicio, 0):max(fim, 0)])
+
+    def remover(self, session_id: str):
+        if self._log is not None:
+            self._log.remover(session_id)
+        with self._lock:
+            self._estados.pop(session_id, None)
+            self._historicos.pop(session_id, None)
+            self._atualizado_em.pop(session_id, None)
+
+    def expirar(self):
+        """Remove sessões sem atividade há mais de ttl_segundos (e logs órfãos no diretório)"""
+        limite = time.time() - self.ttl_segundos
+        with self._lock:
+            expiradas = [sid for sid in self._atualizado_em if self._expirada(sid, limite)]
+            for session_id in [sid for sid, donos in self._donos.items() if not donos]:
+                del self._donos[session_id]
+            for session_id in expiradas:
+                self._estados.pop(session_id, None)
+                self._historicos.pop(session_id, None)
+                del self._atualizado_em[session_id]
+                if self._log is not None:
+                    self._log.remover(session_id)
+            ativas = list(self._atualizado_em)
+        if self._log is not None:
+            self._log.expirar(limite, manter=ativas)
+        if expiradas:
+            logger.info(f"🧹 {len(expiradas)} sessões expiradas removidas da memória")
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessões em SQLite (WAL): leitores concorrentes, um escritor por vez, vários processos
+
+    Para escalar horizontalmente o arquivo precisa estar em um volume compartilhado
+    entre as instâncias.
+    """
+
+    def __init__(self, caminho: str, limite_historico: int = 20, ttl_segundos: float = 604800):
+        super().__init__(limite_historico)
+        self.caminho = caminho
+        self.ttl_segundos = ttl_segundos
+        self._local = threading.local()
+        self._gravacoes = 0
+        self._lock = threading.Lock()
+
+        diretorio = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(diretorio, exist_ok=True)
+
+        conexao = self._conexao()
+        conexao.execute("""
+            CREATE TABLE IF NOT EXISTS sessoes (
+                session_id TEXT PRIMARY KEY,
+                estado TEXT NOT NULL,
+                atualizado_em REAL NOT NULL
+            )
+        """)
+        conexao.execute("""
+            CREATE TABLE IF NOT EXISTS historico (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                entrada TEXT NOT NULL,
+                criado_em REAL NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            )
+        """)
+        conexao.execute("CREATE INDEX IF NOT EXISTS idx_sessoes_atualizado ON sessoes(atualizado_em)")
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Uma conexão por thread; WAL permite leitores concorrentes com um escritor"""
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=5.0, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+        return conexao
+
+    def carregar(self, session_id: str) -> Optional[Dict[str, Any]]:
+        conexao = self._conexao()
+        linha = conexao.execute(
+            "SELECT estado FROM sessoes WHERE session_id = ? AND atualizado_em >= ?",
+            (session_id, time.time() - self.ttl_segundos)
+        ).fetchone()
+        if linha is None:
+            return None
+
+        # Últimas entradas pela chave primária (session_id, seq): custo limitado ao recorte
+        recentes = conexao.execute(
+            "SELECT entrada FROM historico WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+            (session_id, self.limite_historico)
+        ).fetchall()
+
+        estado = json.loads(linha[0])
+        estado[CHAVE_HISTORICO] = [json.loads(entrada) for (entrada,) in reversed(recentes)]
+        return estado
+
+    def salvar_estado(self, session_id: str, estado: Dict[str, Any]):
+        self._conexao().execute(
+            "INSERT OR REPLACE INTO sessoes (session_id, estado, atualizado_em) VALUES (?, ?, ?)",
+            (session_id, _serializar(_sem_historico(estado)), time.time())
+        )
+
+        with self._lock:
+            self._gravacoes += 1
+            executar_expiracao = self._gravacoes % self.INTERVALO_EXPIRACAO == 0
+        if executar_expiracao:
+            self.expirar()
+
+    def anexar_historico(self, session_id: str, entrada: Dict[str, Any]):
+        # Um único INSERT: o próximo seq é calculado dentro da transação do escritor
+        self._conexao().execute("""
+            INSERT INTO historico (session_id, seq, entrada, criado_em)
+            SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ? FROM historico WHERE session_id = ?
+        """, (session_id, _serializar(entrada), time.time(), session_id))
+
+    def historico(self, session_id: str) -> List[Dict[str, Any]]:
+        linhas = self._conexao().execute(
+            "SELECT entrada FROM historico WHERE session_id = ? ORDER BY seq",
+            (session_id,)
+        ).fetchall()
+        return [json.loads(entrada) for (entrada,) in linhas]
+
+    def pagina_historico(self, session_id: str, inicio: int, fim: int) -> List[Dict[str, Any]]:
+        # seq começa em 1: a posição p do histórico é o seq p + 1
+        linhas = self._conexao().execute(
+            "SELECT entrada FROM historico WHERE session_id = ? AND seq > ? AND seq <= ? ORDER BY seq",
+            (session_id, inicio, fim)
+        ).fetchall()
+        return [json.loads(entrada) for (entrada,) in linhas]
+
+    def remover(self, session_id: str):
+        conexao = self._conexao()
+        conexao.execute("DELETE FROM historico WHERE session_id = ?", (session_id,))
+        conexao.execute("DELETE FROM sessoes WHERE session_id = ?", (session_id,))
+
+    def expirar(self):
+        """Remove sessões sem atividade há mais de ttl_segundos"""
+        conexao = self._conexao()
+        limite = time.time() - self.ttl_segundos
+        conexao.execute("""
+            DELETE FROM historico WHERE session_id IN (
+                SELECT session_id FROM sessoes WHERE atualizado_em < ?
+            )
+        """, (limite,))
+        conexao.execute("DELETE FROM sessoes WHERE atualizado_em < ?", (limite,))
+
+
+_session_store: Optional[SessionStore] = None
+_session_store_lock = threading.Lock()
+
+def get_session_store() -> SessionStore:
+    """Retorna o armazenamento de sessões do processo conforme Config"""
+    global _session_store
+    from config import Config
+
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                if Config.SESSION_STORE == "sqlite":
+                    _session_store = SQLiteSessionStore(
+                        Config.SESSION_STORE_PATH,
+                        limite_historico=Config.SESSION_HISTORY_LOAD_LIMIT,
+                        ttl_segundos=Config.SESSION_TTL_SECONDS
+                    )
+                    logger.info(f"💾 Sessões em SQLite: {Config.SESSION_STORE_PATH}")
+                else:
+                    _session_store = MemoriaSessionStore(
+                        limite_historico=Config.SESSION_HISTORY_LOAD_LIMIT,
+                        diretorio_log=Config.HISTORY_LOG_DIR or None,
+                        ttl_segundos=Config.SESSION_MEMORY_TTL_SECONDS
+                    )
+    return _session_store
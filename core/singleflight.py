@@ -0,0 +1,96 @@
+"""
+Coalescência de requisições idênticas em andamento (single-flight)
+Chamadores concorrentes com a mesma chave aguardam uma única execução
+"""
+
+import threading
+import logging
+from concurrent.futures import Future, TimeoutError as FuturoTimeout
+from typing import Any, Callable, Dict, Optional
+
+from core.prazo import PrazoExcedido, prazo_atual
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Garante no máximo uma execução em andamento por chave; os demais reutilizam o resultado"""
+
+    def __init__(self):
+        self._em_andamento: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.execucoes = 0
+        self.coalescidas = 0
+
+    def executar(self, chave: str, funcao: Callable[[], Any]) -> Any:
+        """Executa funcao() ou aguarda a execução já em andamento para a mesma chave
+        
+        Quem aguarda respeita o próprio prazo do turno (core.prazo), não o de quem executa:
+        se a execução compartilhada estourar o prazo do líder e ainda houver tempo, tenta de novo.
+        """
+        while True:
+            with self._lock:
+                futuro = self._em_andamento.get(chave)
+                # Um futuro já concluído só está à espera de sair do mapa
+                lider = futuro is None or futuro.done()
+                if lider:
+                    futuro = Future()
+                    self._em_andamento[chave] = futuro
+                    self.execucoes += 1
+                else:
+                    self.coalescidas += 1
+
+            if lider:
+                break
+
+            logger.debug("🔗 Requisição idêntica em andamento, aguardando resultado compartilhado")
+            prazo = prazo_atual()
+            try:
+                return futuro.result(timeout=prazo.restante() if prazo is not None else None)
+            except PrazoExcedido:
+                # Prazo de quem executava, não o nosso
+                if prazo is not None and prazo.expirado():
+                    raise
+                logger.debug("🔗 Execução compartilhada estourou o prazo do líder, tentando de novo")
+            except FuturoTimeout:
+                if futuro.done():
+                    raise
+                raise PrazoExcedido(f"Prazo do turno ({prazo.segundos:.0f}s) esgotado aguardando chamada idêntica em andamento")
+
+        try:
+            resultado = funcao()
+        except BaseException as e:
+            futuro.set_exception(e)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado
+        finally:
+            with self._lock:
+                self._em_andamento.pop(chave, None)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "execucoes": self.execucoes,
+                "coalescidas": self.coalescidas,
+                "em_andamento": len(self._em_andamento)
+            }
+
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """Retorna o coalescedor do processo conforme Config (None se desabilitado)"""
+    global _single_flight
+    from config import Config
+
+    if not Config.SINGLE_FLIGHT_ENABLED:
+        return None
+
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
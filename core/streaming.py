@@ -0,0 +1,224 @@
+"""
+Streaming de tokens da resposta final para a interface
+O LLM do pool (core.llm_streaming) passa a emitir deltas quando há um coletor ativo
+no contexto da chamada
+"""
+
+import re
+import queue
+import threading
+import contextvars
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Marcador do formato ReAct do CrewAI que antecede a resposta final
+MARCADOR_RESPOSTA_FINAL = "Final Answer:"
+
+# Separa a resposta ao cliente da análise interna no modo de insights estruturado
+MARCADOR_ANALISE = "### ANALISE_INTERNA"
+
+_FIM = object()
+
+_coletor_atual: contextvars.ContextVar[Optional["ColetorTokens"]] = contextvars.ContextVar(
+    "coletor_tokens", default=None
+)
+
+def fatiar_em_sentencas(texto: str) -> List[str]:
+    """Divide um texto pronto em sentenças (fallback quando não houve streaming real)"""
+    partes = re.split(r"(?<=[.!?…])(\s+)", texto)
+    fatias = []
+    for i in range(0, len(partes), 2):
+        sentenca = partes[i] + (partes[i + 1] if i + 1 < len(partes) else "")
+        if sentenca:
+            fatias.append(sentenca)
+    return fatias
+
+
+def executar_sem_streaming(funcao: Callable[[], Any]) -> Any:
+    """Executa a função com o coletor desativado (ex: especialistas em threads auxiliares)"""
+    _coletor_atual.set(None)
+    return funcao()
+
+
+def ramo_streaming() -> Optional["RamoColetor"]:
+    """Acesso desligável ao coletor ativo para trabalho em outra thread (None sem coletor)"""
+    coletor = _coletor_atual.get()
+    return RamoColetor(coletor) if coletor is not None else None
+
+
+def executar_no_ramo(ramo: Optional["RamoColetor"], funcao: Callable[[], Any]) -> Any:
+    """Executa a função transmitindo pelo ramo (sem ramo, sem streaming)"""
+    _coletor_atual.set(ramo)
+    return funcao()
+
+
+def redirecionar_streaming(llm_alvo: Any = None):
+    """Troca o LLM alvo do coletor ativo (ex: turno respondido sem o manager)"""
+    coletor = _coletor_atual.get()
+    if coletor is not None:
+        coletor.llm_alvo = llm_alvo
+
+
+class ColetorTokens:
+    """Recebe deltas do LLM e repassa apenas o trecho após 'Final Answer:'"""
+
+    def __init__(self, llm_alvo: Any = None, apenas_primeira_resposta: bool = True):
+        # llm_alvo restringe o streaming a uma instância (ex: o manager da crew)
+        self.llm_alvo = llm_alvo
+        self.apenas_primeira_resposta = apenas_primeira_resposta
+        self.fila: "queue.Queue[Any]" = queue.Queue()
+        self.encerrado = False
+        self.emitiu = False
+        self.emitiu_na_chamada = False
+        self._texto = ""
+        self._emitido_ate: Optional[int] = None
+        self._inicio_resposta = 0
+        self._cortado = False
+
+    def aceita(self, llm: Any) -> bool:
+        if self.encerrado:
+            return False
+        return self.llm_alvo is None or llm is self.llm_alvo
+
+    def iniciar_chamada(self):
+        self.emitiu_na_chamada = False
+        self._texto = ""
+        self._emitido_ate = None
+        self._inicio_resposta = 0
+        self._cortado = False
+
+    def _emitir_ate(self, fim: int):
+        novo = self._texto[self._emitido_ate:fim]
+        if novo:
+            self._emitido_ate = fim
+            self.emitiu = True
+            self.emitiu_na_chamada = True
+            self.fila.put(novo)
+
+    def receber(self, delta: str):
+        self._texto += delta
+        if self._cortado:
+            return
+
+        if self._emitido_ate is None:
+            posicao = self._texto.find(MARCADOR_RESPOSTA_FINAL)
+            if posicao < 0:
+                return
+            self._emitido_ate = posicao + len(MARCADOR_RESPOSTA_FINAL)
+            # Ignorar o espaço logo após o marcador
+            while self._emitido_ate < len(self._texto) and self._texto[self._emitido_ate] in " \n":
+                self._emitido_ate += 1
+            self._inicio_resposta = self._emitido_ate
+
+        # A análise interna (modo estruturado) nunca chega à interface
+        corte = self._texto.find(MARCADOR_ANALISE, self._inicio_resposta)
+        if corte >= 0:
+            self._emitir_ate(len(self._texto[:corte].rstrip()))
+            self._cortado = True
+            return
+
+        # Segurar um possível início do marcador até o próximo delta
+        retido = 0
+        for tamanho in range(min(len(MARCADOR_ANALISE) - 1, len(self._texto)), 0, -1):
+            if self._texto.endswith(MARCADOR_ANALISE[:tamanho]):
+                retido = tamanho
+                break
+        self._emitir_ate(max(self._emitido_ate, len(self._texto) - retido))
+
+    def interromper(self):
+        """A chamada falhou depois de emitir tokens: nenhuma repetição volta a transmitir"""
+        self.encerrado = True
+
+    def finalizar_chamada(self):
+        if self._emitido_ate is None:
+            return
+        if not self._cortado:
+            self._emitir_ate(len(self._texto))
+        if self.apenas_primeira_resposta:
+            self.encerrado = True
+
+
+class RamoColetor:
+    """Coletor do turno visto por uma thread auxiliar; desligado, nada mais dela chega à interface
+
+    Ex: a crew hierárquica abandonada por prazo continua rodando até a próxima verificação
+    do prazo, mas seus tokens não se misturam à resposta de fallback do terapeuta.
+    """
+
+    def __init__(self, coletor: ColetorTokens):
+        self.coletor = coletor
+        self.ativo = True
+
+    def desligar(self):
+        self.ativo = False
+
+    @property
+    def emitiu_na_chamada(self) -> bool:
+        return self.coletor.emitiu_na_chamada
+
+    def aceita(self, llm: Any) -> bool:
+        return self.ativo and self.coletor.aceita(llm)
+
+    def iniciar_chamada(self):
+        if self.ativo:
+            self.coletor.iniciar_chamada()
+
+    def receber(self, delta: str):
+        if self.ativo:
+            self.coletor.receber(delta)
+
+    def interromper(self):
+        if self.ativo:
+            self.coletor.interromper()
+
+    def finalizar_chamada(self):
+        if self.ativo:
+            self.coletor.finalizar_chamada()
+
+
+class RespostaStream:
+    """Iterável de fragmentos de texto; após consumido, expõe o dict de resultado em .resultado"""
+
+    def __init__(self, executar: Callable[[], Dict[str, Any]], coletor: ColetorTokens,
+                 campo_resposta: str = "resposta"):
+        self._executar = executar
+        self._coletor = coletor
+        self._campo_resposta = campo_resposta
+        self.resultado: Optional[Dict[str, Any]] = None
+
+    def _rodar(self):
+        _coletor_atual.set(self._coletor)
+        try:
+            self.resultado = self._executar()
+        except Exception as e:
+            logger.error(f"❌ Erro durante streaming: {e}")
+            self.resultado = {"success": False, "error": str(e)}
+        finally:
+            self._coletor.fila.put(_FIM)
+
+    def __iter__(self) -> Iterator[str]:
+        contexto = contextvars.copy_context()
+        thread = threading.Thread(target=contexto.run, args=(self._rodar,), daemon=True)
+        thread.start()
+
+        while True:
+            item = self._coletor.fila.get()
+            if item is _FIM:
+                break
+            yield item
+        thread.join()
+
+        # Sem tokens reais (cache ou modelo sem streaming): entregar em sentenças
+        if not self._coletor.emitiu and self.resultado and self.resultado.get("success"):
+            for sentenca in fatiar_em_sentencas(self.texto_resposta()):
+                yield sentenca
+
+    def texto_resposta(self) -> str:
+        """Extrai o texto exibível do resultado"""
+        resposta = (self.resultado or {}).get(self._campo_resposta, "")
+        if isinstance(resposta, dict):
+            resposta = resposta.get("resposta", resposta.get("avaliacao_inicial", str(resposta)))
+        return str(resposta)
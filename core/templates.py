@@ -0,0 +1,163 @@
+"""
+Templates de crew reutilizáveis, montados uma vez por processo
+Validação da Crew/Task, cópia dos agentes e ferramentas do manager acontecem na construção;
+a cada chamada só os inputs do kickoff mudam
+"""
+
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Descrição e saída esperada da task de agente único: o prompt entra via kickoff(inputs)
+DESCRICAO_TAREFA_UNICA = "{prompt}"
+SAIDA_TAREFA_UNICA = "{saida_esperada}"
+
+def chave_definicao_agente(agent: Any) -> Tuple:
+    """Identifica a definição do agente (não a instância): papel, persona e LLM"""
+    llm = getattr(agent, "llm", None)
+    return (agent.role, agent.goal, agent.backstory, id(llm))
+
+def copiar_agente(agent: Any) -> Any:
+    """Cópia do agente para uso exclusivo de um template, mantendo o LLM compartilhado do pool"""
+    copia = agent.copy()
+    # Agent.copy() faz cópia rasa do LLM; o template usa a instância do pool (conexões,
+    # identidade usada pelo streaming)
+    copia.llm = agent.llm
+    return copia
+
+
+class PoolTemplates:
+    """Templates livres por chave; cria um novo só quando todos os existentes estão em uso"""
+
+    def __init__(self):
+        self._livres: Dict[Any, List[Any]] = {}
+        self._lock = threading.Lock()
+        self.construidos = 0
+        self.reutilizados = 0
+
+    @contextmanager
+    def usar(self, chave: Any, construir: Callable[[], Any]) -> Iterator[Any]:
+        with self._lock:
+            livres = self._livres.setdefault(chave, [])
+            template = livres.pop() if livres else None
+            if template is not None:
+                self.reutilizados += 1
+
+        if template is None:
+            template = construir()
+            with self._lock:
+                self.construidos += 1
+
+        try:
+            yield template
+        finally:
+            with self._lock:
+                self._livres[chave].append(template)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {
+                "construidos": self.construidos,
+                "reutilizados": self.reutilizados,
+                "chaves": len(self._livres)
+            }
+
+    def limpar(self):
+        with self._lock:
+            self._livres.clear()
+
+
+_pool_tarefas = PoolTemplates()
+_pool_hierarquicos = PoolTemplates()
+
+def _templates_habilitados() -> bool:
+    from config import Config
+    return Config.CREW_TEMPLATES_ENABLED
+
+
+class TemplateTarefaUnica:
+    """Crew sequencial de um agente com uma task parametrizada pelo prompt"""
+
+    def __init__(self, agent: Any):
+        from crewai import Task, Crew
+
+        self.agent = copiar_agente(agent)
+        self.task = Task(
+            description=DESCRICAO_TAREFA_UNICA,
+            expected_output=SAIDA_TAREFA_UNICA,
+            agent=self.agent
+        )
+        self.crew = Crew(agents=[self.agent], tasks=[self.task], verbose=False)
+
+    def executar(self, prompt: str, expected_output: str) -> str:
+        return str(self.crew.kickoff(inputs={"prompt": prompt, "saida_esperada": expected_output}))
+
+
+class TemplateHierarquico:
+    """Crew hierárquica com agentes copiados, task parametrizada e manager reaproveitado"""
+
+    def __init__(self, agentes: List[Any], descricao: str, expected_output: str,
+                 manager_llm: Any, verbose: bool = False):
+        from crewai import Task, Crew, Process
+
+        self.agentes = [copiar_agente(agente) for agente in agentes]
+        self.task = Task(
+            description=descricao,
+            expected_output=expected_output
+            # Sem agent específico - o manager decidirá quem executa
+        )
+        self.crew = Crew(
+            agents=self.agentes,
+            tasks=[self.task],
+            process=Process.hierarchical,
+            manager_llm=manager_llm,
+            verbose=verbose
+        )
+
+    def executar(self, inputs: Dict[str, Any]) -> str:
+        # O CrewAI cria o manager no primeiro kickoff e recusa um manager que já tenha
+        # ferramentas; limpá-las permite reaproveitar o mesmo Agent a cada turno
+        if self.crew.manager_agent is not None:
+            self.crew.manager_agent.tools = []
+        # Task.execute_sync grava o manager em task.agent; sem limpar, no kickoff seguinte o
+        # manager só poderia delegar a si mesmo
+        self.task.agent = None
+        self.task.output = None
+        return str(self.crew.kickoff(inputs=inputs))
+
+
+def executar_tarefa_unica(agent: Any, prompt: str, expected_output: str) -> str:
+    """Executa o prompt em uma crew de agente único, reaproveitando o template do agente"""
+    if not _templates_habilitados():
+        return TemplateTarefaUnica(agent).executar(prompt, expected_output)
+
+    with _pool_tarefas.usar(chave_definicao_agente(agent), lambda: TemplateTarefaUnica(agent)) as template:
+        return template.executar(prompt, expected_output)
+
+
+def executar_crew_hierarquica(nome: str, agentes: List[Any], descricao: str, expected_output: str,
+                              inputs: Dict[str, Any], manager_llm: Any, verbose: bool = False) -> str:
+    """Executa uma crew hierárquica a partir do template (nome, composição da equipe, manager)
+
+    `descricao` é um modelo str.format preenchido pelos `inputs` no kickoff.
+    """
+    def construir():
+        return TemplateHierarquico(agentes, descricao, expected_output, manager_llm, verbose)
+
+    if not _templates_habilitados():
+        return construir().executar(inputs)
+
+    chave = (nome, tuple(chave_definicao_agente(agente) for agente in agentes), id(manager_llm))
+    with _pool_hierarquicos.usar(chave, construir) as template:
+        return template.executar(inputs)
+
+
+def estatisticas_templates() -> dict:
+    return {
+        "tarefa_unica": _pool_tarefas.estatisticas(),
+        "hierarquicos": _pool_hierarquicos.estatisticas()
+    }
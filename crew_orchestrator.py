@@ -3,110 +3,226 @@ Orquestrador CrewAI para sistema de terapia familiar
 Usa todos os agentes trabalhando em conjunto como uma crew
 """
 
-from crewai import Crew, Process
-from agents.terapeuta_principal import TerapeutaPrincipal  
-from agents.genetograma_expert import GenetogramaExpert
-from agents.ciclo_vida_analyzer import CicloVidaAnalyzer
-from agents.padrao_analyzer import PadraoAnalyzer
-from agents.reflexao_facilitator import ReflexaoFacilitator
+from agents.registro import RegistroAgentes, get_registro_agentes
 from config import Config
-from typing import Dict, Any
+from core.streaming import (
+    RespostaStream, ColetorTokens, redirecionar_streaming, ramo_streaming, executar_no_ramo
+)
+from core.agendador import definir_sessao_llm
+from core.roteador import RoteadorLocal, ESPECIALISTAS
+from core.fanout import executar_em_paralelo, contribuicao_relevante, submeter
+from core.prazo import iniciar_prazo, prazo_atual, executar_com_prazo
+from core.execucao import estatisticas_execucao
+from core.templates import executar_crew_hierarquica
+from core.recuperacao import definir_consulta_turno, referencias_turno
+from core.sessoes import SessionStore, get_session_store
+from core.resumo import ResumidorIncremental
+from core.historico import HistoricoConversa
+from typing import Dict, Any, List, Callable
+import uuid
 import logging
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Modos de execução disponíveis
+MODO_HIERARQUICO = "hierarquico"  # Manager delega aos especialistas (serial)
+MODO_PARALELO = "paralelo"        # Especialistas em paralelo + síntese do terapeuta principal
+MODOS_EXECUCAO = (MODO_HIERARQUICO, MODO_PARALELO)
+
+# Tasks da crew hierárquica: modelos preenchidos pelos inputs do kickoff
+TAREFA_INICIO_SESSAO = """
+            CONTEXTO DO CLIENTE: {contexto}
+            
+            REFERÊNCIAS DE CARTER & McGOLDRICK (trechos da base relacionados ao relato):
+            {referencias}
+            
+            INSTRUÇÕES IMPORTANTES:
+            - RESPONDA APENAS com base nas informações fornecidas pelo cliente
+            - NÃO invente ou assuma informações não mencionadas
+            - Se o cliente apenas cumprimentou, faça um acolhimento simples e pergunte como pode ajudar
+            - Se há informações específicas, trabalhe com elas
+            - Mantenha respostas proporcionais ao que foi compartilhado
+            
+            Como equipe terapêutica, trabalhem de forma integrada:
+            
+            1. TERAPEUTA PRINCIPAL: Liderar com acolhimento empático apropriado ao contexto
+            2. ESPECIALISTAS: Contribuir APENAS se houver informações relevantes no relato:
+               - Genetograma Expert: Só mencionar se houver informações familiares
+               - Ciclo de Vida: Só analisar se houver dados sobre estágio familiar
+               - Padrão Analyzer: Só identificar padrões se mencionados
+               - Reflexão Facilitator: Fazer perguntas apropriadas ao nível de informação compartilhada
+            
+            OBJETIVO: Resposta terapêutica proporcional que:
+            - Acolha o cliente adequadamente
+            - Não assuma informações não fornecidas
+            - Seja empática mas não excessiva
+            - Convide ao diálogo de forma natural
+            
+            IMPORTANTE: Se o cliente apenas cumprimentou, responda com acolhimento simples e convite para compartilhar.
+            """
+
+TAREFA_MENSAGEM = """
+            CONTEXTO DA SESSÃO: {contexto_familia}
+            
+            HISTÓRICO RECENTE:
+            {historico}
+            
+            NOVA MENSAGEM DO CLIENTE: {mensagem}
+            
+            REFERÊNCIAS DE CARTER & McGOLDRICK (trechos da base relacionados à mensagem):
+            {referencias}
+            
+            INSTRUÇÕES IMPORTANTES:
+            - RESPONDA com base apenas nas informações fornecidas pelo cliente
+            - NÃO invente detalhes ou faça análises sem dados concretos
+            - Mantenha a resposta proporcional à complexidade da mensagem
+            - Use o histórico para manter continuidade, mas não para criar informações
+            
+            Como equipe terapêutica, trabalhem de forma integrada:
+            
+            1. TERAPEUTA PRINCIPAL: Coordenar resposta empática e contextual
+            2. ESPECIALISTAS: Contribuir APENAS quando há dados relevantes:
+               - Genetograma: Só se mencionou família/relacionamentos
+               - Ciclo de Vida: Só se há informações sobre estágio familiar
+               - Padrões: Só se identificou padrões reais na mensagem
+               - Reflexão: Perguntas apropriadas ao que foi compartilhado
+            
+            OBJETIVO: Resposta terapêutica contextual que:
+            - Demonstre escuta ativa do que foi realmente dito
+            - Seja empática mas não excessiva
+            - Promova diálogo natural
+            - Não assuma informações não fornecidas
+            
+            IMPORTANTE: Se a mensagem é simples, responda de forma simples e acolhedora.
+            """
+
 class TerapiaCrewOrchestrator:
     """Orquestrador que usa CrewAI para coordenar todos os agentes"""
     
-    def __init__(self):
+    def __init__(self, modo_execucao: str = None, agentes: RegistroAgentes = None,
+                 session_id: str = None, store: SessionStore = None):
         # Validar configuração
         Config.validate_config()
         
-        # Instanciar todos os agentes especializados
-        self.terapeuta_principal = TerapeutaPrincipal()
-        self.genetograma_expert = GenetogramaExpert()
-        self.ciclo_vida_analyzer = CicloVidaAnalyzer()
-        self.padrao_analyzer = PadraoAnalyzer()
-        self.reflexao_facilitator = ReflexaoFacilitator()
+        self.modo_execucao = modo_execucao or Config.EXECUTION_MODE
+        if self.modo_execucao not in MODOS_EXECUCAO:
+            logger.warning(f"⚠️ Modo de execução desconhecido '{self.modo_execucao}', usando {MODO_HIERARQUICO}")
+            self.modo_execucao = MODO_HIERARQUICO
+        
+        # Agentes especializados compartilhados pelo processo, instanciados no primeiro uso
+        # (o roteador costuma dispensar a maioria dos especialistas). Por sessão ficam só
+        # o estado da conversa, o id no agendador e os descartes do turno
+        self.agentes = get_registro_agentes() if agentes is None else agentes
+        
+        # Roteador local: decide especialistas sem chamar o LLM
+        self.roteador = RoteadorLocal() if Config.ROUTER_ENABLED else None
+        
+        # Identifica a sessão no agendador de cota do LLM (fila justa entre sessões) e no
+        # armazenamento de sessões: com um session_id existente, a conversa é retomada
+        self.session_id = session_id or uuid.uuid4().hex
+        self.store = get_session_store() if store is None else store
+        # Enquanto este orquestrador existir (aba aberta), o store não expira a sessão
+        self.store.manter_viva(self.session_id, self)
+        
+        # Partes do turno atual que ficaram de fora (especialista/crew -> motivo)
+        self._descartados_turno: Dict[str, str] = {}
         
         # Estado da sessão
-        self.session_state = {
-            "historico": [],
+        self.session_state = self._carregar_estado()
+        
+        # Resumo incremental dos turnos que saem da janela literal (atualizado em background)
+        self.resumidor = ResumidorIncremental(
+            resumir=self._resumir_historico,
+            a_cada_turnos=Config.SUMMARY_EVERY_TURNS,
+            turnos_literais=Config.SUMMARY_VERBATIM_TURNS,
+            carregar_turnos=lambda inicio, fim: self.store.pagina_historico(self.session_id, inicio, fim)
+        ) if Config.SUMMARY_ENABLED else None
+        
+        logger.info(f"✅ TerapiaCrewOrchestrator inicializado com CrewAI (modo: {self.modo_execucao})")
+    
+    @staticmethod
+    def _estado_inicial() -> Dict[str, Any]:
+        return {
+            "historico": HistoricoConversa(Config.SESSION_HISTORY_LOAD_LIMIT),
             "contexto_familia": "",
             "insights_coletivos": [],
-            "sessao_ativa": False
+            "sessao_ativa": False,
+            "num_interacoes": 0,  # O histórico carregado do store traz só as entradas recentes
+            "resumo": "",         # Resumo incremental dos turnos fora da janela literal
+            "resumo_ate": 0       # Quantos turnos o resumo já cobre
         }
-        
-        logger.info("✅ TerapiaCrewOrchestrator inicializado com CrewAI")
+    
+    def _carregar_estado(self) -> Dict[str, Any]:
+        """Estado salvo da sessão (se houver), com os turnos recentes no anel em memória"""
+        carregado = self.store.carregar(self.session_id) or {}
+        return {
+            **self._estado_inicial(),
+            **carregado,
+            "historico": HistoricoConversa(Config.SESSION_HISTORY_LOAD_LIMIT, carregado.get("historico"))
+        }
+    
+    def _registrar_turno(self, entrada: Dict[str, Any]):
+        """Acrescenta o turno ao histórico, persiste o estado e agenda o resumo se for a vez"""
+        self.session_state["historico"].append(entrada)
+        self.session_state["num_interacoes"] += 1
+        self.store.anexar_historico(self.session_id, entrada)
+        self.store.salvar_estado(self.session_id, self.session_state)
+        if self.resumidor is not None:
+            self.resumidor.atualizar(self.session_state, ao_concluir=self._persistir_estado)
+    
+    def _persistir_estado(self, estado: Dict[str, Any]):
+        """Grava atualizações em background, a menos que a sessão tenha sido limpa nesse meio tempo"""
+        if estado is self.session_state:
+            self.store.salvar_estado(self.session_id, estado)
+    
+    def _turnos_literais(self) -> List[Dict[str, Any]]:
+        """Turnos que vão literalmente no prompt: os que o resumo ainda não cobre (sem resumo, os últimos)"""
+        if self.resumidor is None:
+            return self.session_state["historico"][-Config.SUMMARY_VERBATIM_TURNS:]
+        return self.resumidor.recentes(self.session_state)
+    
+    def _resumir_historico(self, resumo_anterior: str, turnos: List[str]) -> str:
+        return self.agentes["terapeuta"].resumir_historico(
+            resumo_anterior, turnos, max_palavras=Config.SUMMARY_MAX_WORDS
+        )["resumo"]
     
     def iniciar_sessao(self, contexto_inicial: str) -> Dict[str, Any]:
         """Inicia uma sessão terapêutica com toda a crew trabalhando juntas"""
         try:
-            logger.info(f"🚀 Iniciando sessão com contexto: {contexto_inicial[:100]}...")
+            definir_sessao_llm(self.session_id)
+            iniciar_prazo(Config.TURN_DEADLINE_SECONDS)
+            definir_consulta_turno(contexto_inicial)
+            self._descartados_turno = {}
             
-            # Criar crew dinâmica para esta sessão específica
-            from crewai import Task
-            
-            task_inicial = Task(
-                description=f"""
-                CONTEXTO DO CLIENTE: {contexto_inicial}
-                
-                INSTRUÇÕES IMPORTANTES:
-                - RESPONDA APENAS com base nas informações fornecidas pelo cliente
-                - NÃO invente ou assuma informações não mencionadas
-                - Se o cliente apenas cumprimentou, faça um acolhimento simples e pergunte como pode ajudar
-                - Se há informações específicas, trabalhe com elas
-                - Mantenha respostas proporcionais ao que foi compartilhado
-                
-                Como equipe terapêutica, trabalhem de forma integrada:
-                
-                1. TERAPEUTA PRINCIPAL: Liderar com acolhimento empático apropriado ao contexto
-                2. ESPECIALISTAS: Contribuir APENAS se houver informações relevantes no relato:
-                   - Genetograma Expert: Só mencionar se houver informações familiares
-                   - Ciclo de Vida: Só analisar se houver dados sobre estágio familiar
-                   - Padrão Analyzer: Só identificar padrões se mencionados
-                   - Reflexão Facilitator: Fazer perguntas apropriadas ao nível de informação compartilhada
-                
-                OBJETIVO: Resposta terapêutica proporcional que:
-                - Acolha o cliente adequadamente
-                - Não assuma informações não fornecidas
-                - Seja empática mas não excessiva
-                - Convide ao diálogo de forma natural
-                
-                IMPORTANTE: Se o cliente apenas cumprimentou, responda com acolhimento simples e convite para compartilhar.
-                """,
-                expected_output="Resposta terapêutica apropriada e proporcional ao contexto compartilhado"
-                # Sem agent específico - o manager decidirá quem executa
-            )
+            logger.info(f"🚀 Iniciando sessão com contexto: {contexto_inicial[:100]}...")
             
-            # Criar crew específica para esta sessão
-            crew_sessao = Crew(
-                agents=[
-                    self.terapeuta_principal.get_agent(),
-                    self.genetograma_expert.get_agent(),
-                    self.ciclo_vida_analyzer.get_agent(),
-                    self.padrao_analyzer.get_agent(),
-                    self.reflexao_facilitator.get_agent()
-                ],
-                tasks=[task_inicial],
-                process=Process.hierarchical,
-                manager_llm=Config.get_llm(),  # Usar manager_llm em vez de manager_agent
-                verbose=Config.DEBUG
-                # Removido memory=Config.ENABLE_MEMORY para evitar erros de embeddings
-            )
+            decisao = self._rotear(contexto_inicial)
             
-            # Executar a crew com inputs
-            resultado = crew_sessao.kickoff(inputs={"contexto": contexto_inicial})
+            if decisao["pular_manager"]:
+                resultado = self._responder_direto(contexto_inicial, contexto_sessao=contexto_inicial)
+            elif self.modo_execucao == MODO_PARALELO:
+                resultado = self._executar_fanout(
+                    contexto_inicial,
+                    contexto_sessao=contexto_inicial,
+                    especialistas=decisao["especialistas"]
+                )
+            else:
+                resultado = self._executar_hierarquica_com_prazo(
+                    lambda: self._iniciar_sessao_hierarquica(contexto_inicial, decisao["especialistas"]),
+                    contexto_inicial,
+                    contexto_sessao=contexto_inicial
+                )
             
             # Atualizar estado da sessão
             self.session_state["contexto_familia"] = contexto_inicial
             self.session_state["sessao_ativa"] = True
-            self.session_state["historico"].append({
+            self._registrar_turno({
                 "tipo": "inicio_sessao",
                 "contexto": contexto_inicial,
-                "resposta_crew": str(resultado)
+                "resposta_crew": str(resultado),
+                "partes_descartadas": dict(self._descartados_turno)
             })
             
             logger.info("✅ Sessão iniciada com sucesso pela crew")
@@ -116,7 +232,8 @@ class TerapiaCrewOrchestrator:
                 "agente": "🤝 Equipe Terapêutica Completa",
                 "resposta": str(resultado),
                 "tipo": "inicio_sessao",
-                "emoji": "🚀"
+                "emoji": "🚀",
+                "partes_descartadas": dict(self._descartados_turno)
             }
             
         except Exception as e:
@@ -126,79 +243,147 @@ class TerapiaCrewOrchestrator:
                 "error": f"Erro ao iniciar sessão: {str(e)}"
             }
     
+    def _contexto_historico(self) -> str:
+        """Resumo incremental da sessão + interações que ele ainda não cobre (tamanho estável)"""
+        recentes = "\n".join([
+            f"- {item['contexto']}: {item['resposta_crew'][:200]}..." 
+            for item in self._turnos_literais()
+        ])
+        if not self.session_state["resumo"]:
+            return recentes
+        return f"Resumo da conversa até aqui: {self.session_state['resumo']}\n\nÚltimas interações:\n{recentes}"
+    
+    def _rotear(self, mensagem: str) -> Dict[str, Any]:
+        """Decide a composição da equipe para o turno (todos os especialistas sem roteador)"""
+        if self.roteador is None:
+            return {"especialistas": list(ESPECIALISTAS), "pular_manager": False, "motivo": "roteador_desativado"}
+        
+        decisao = self.roteador.rotear(mensagem)
+        logger.info(
+            f"🧭 Roteamento: {decisao['especialistas'] or 'apenas terapeuta'} "
+            f"({decisao['motivo']}, {decisao['tempo_ms']:.2f} ms)"
+        )
+        return decisao
+    
+    def _agentes_crew(self, especialistas: List[str] = None) -> List[Any]:
+        """Agentes CrewAI da crew hierárquica: terapeuta principal + especialistas selecionados"""
+        selecionados = ESPECIALISTAS if especialistas is None else especialistas
+        return [self.agentes.get_agent("terapeuta")] + [
+            self.agentes.get_agent(nome) for nome in ESPECIALISTAS if nome in selecionados
+        ]
+    
+    def _responder_direto(self, mensagem: str, contexto_historico: str = "",
+                          contexto_sessao: str = "") -> str:
+        """Resposta do terapeuta principal sozinho - sem manager (cumprimentos, check-ins)"""
+        # A resposta final agora vem do terapeuta, não do manager
+        redirecionar_streaming(self.agentes.get_agent("terapeuta").llm)
+        
+        resposta = self.agentes["terapeuta"].sintetizar_contribuicoes(
+            mensagem,
+            {},
+            contexto_historico=contexto_historico,
+            contexto_sessao=contexto_sessao
+        )
+        return resposta["resposta"]
+    
+    def _prazo_especialistas(self):
+        """Prazo dos especialistas/crew: o do turno menos a reserva para a resposta do terapeuta"""
+        prazo = prazo_atual()
+        if prazo is None:
+            return None
+        return prazo.antecipado(Config.TURN_FALLBACK_RESERVE_SECONDS)
+    
+    def _executar_hierarquica_com_prazo(self, executar_crew: Callable[[], str], mensagem: str,
+                                        contexto_historico: str = "", contexto_sessao: str = "") -> str:
+        """Executa a crew hierárquica dentro do prazo; se estourar, responde o terapeuta sozinho
+        
+        As delegações ficam no raciocínio do manager, então não há saída parcial dos
+        especialistas para aproveitar: a crew inteira é registrada como descartada.
+        A crew abandonada para na próxima chamada ao LLM (verificar_prazo com o prazo dela)
+        e é desligada do streaming antes da resposta do terapeuta.
+        """
+        prazo_crew = self._prazo_especialistas()
+        if prazo_crew is None:
+            return executar_crew()
+        
+        ramo = ramo_streaming()
+        futuro = submeter(
+            lambda: executar_no_ramo(ramo, lambda: executar_com_prazo(prazo_crew, executar_crew)),
+            com_streaming=True
+        )
+        try:
+            return futuro.result(timeout=prazo_crew.restante())
+        except Exception as e:
+            if not prazo_crew.expirado():
+                raise
+            if ramo is not None:
+                ramo.desligar()
+            futuro.cancel()
+            logger.warning(f"⏱️ Crew hierárquica excedeu o prazo do turno ({e.__class__.__name__}), "
+                           "respondendo com o terapeuta principal")
+            self._descartados_turno["crew_hierarquica"] = "prazo"
+            return self._responder_direto(
+                mensagem,
+                contexto_historico=contexto_historico,
+                contexto_sessao=contexto_sessao
+            )
+    
+    def _iniciar_sessao_hierarquica(self, contexto_inicial: str, especialistas: List[str] = None) -> str:
+        """Abertura da sessão pela crew hierárquica completa"""
+        # Template da crew para esta composição de equipe, montado uma vez por processo
+        return executar_crew_hierarquica(
+            nome="inicio_sessao",
+            agentes=self._agentes_crew(especialistas),
+            descricao=TAREFA_INICIO_SESSAO,
+            expected_output="Resposta terapêutica apropriada e proporcional ao contexto compartilhado",
+            inputs={"contexto": contexto_inicial, "referencias": referencias_turno() or "(nenhuma)"},
+            manager_llm=Config.get_manager_llm(),  # Instância dedicada: alvo do streaming
+            verbose=Config.DEBUG
+        )
+    
     def processar_mensagem(self, mensagem: str) -> Dict[str, Any]:
         """Processa uma mensagem usando toda a crew"""
         try:
+            definir_sessao_llm(self.session_id)
+            iniciar_prazo(Config.TURN_DEADLINE_SECONDS)
+            definir_consulta_turno(mensagem)
+            self._descartados_turno = {}
+            
             logger.info(f"💬 Processando mensagem: {mensagem[:100]}...")
             
-            from crewai import Task
-            
-            # Criar contexto com histórico
-            contexto_historico = "\n".join([
-                f"- {item['contexto']}: {item['resposta_crew'][:200]}..." 
-                for item in self.session_state["historico"][-3:]  # Últimas 3 interações
-            ])
-            
-            task_resposta = Task(
-                description=f"""
-                CONTEXTO DA SESSÃO: {self.session_state.get('contexto_familia', '')}
-                
-                HISTÓRICO RECENTE:
-                {contexto_historico}
-                
-                NOVA MENSAGEM DO CLIENTE: {mensagem}
-                
-                INSTRUÇÕES IMPORTANTES:
-                - RESPONDA com base apenas nas informações fornecidas pelo cliente
-                - NÃO invente detalhes ou faça análises sem dados concretos
-                - Mantenha a resposta proporcional à complexidade da mensagem
-                - Use o histórico para manter continuidade, mas não para criar informações
-                
-                Como equipe terapêutica, trabalhem de forma integrada:
-                
-                1. TERAPEUTA PRINCIPAL: Coordenar resposta empática e contextual
-                2. ESPECIALISTAS: Contribuir APENAS quando há dados relevantes:
-                   - Genetograma: Só se mencionou família/relacionamentos
-                   - Ciclo de Vida: Só se há informações sobre estágio familiar
-                   - Padrões: Só se identificou padrões reais na mensagem
-                   - Reflexão: Perguntas apropriadas ao que foi compartilhado
-                
-                OBJETIVO: Resposta terapêutica contextual que:
-                - Demonstre escuta ativa do que foi realmente dito
-                - Seja empática mas não excessiva
-                - Promova diálogo natural
-                - Não assuma informações não fornecidas
-                
-                IMPORTANTE: Se a mensagem é simples, responda de forma simples e acolhedora.
-                """,
-                expected_output="Resposta terapêutica contextual e apropriada"
-                # Sem agent específico - o manager decidirá quem executa
-            )
+            contexto_historico = self._contexto_historico()
             
-            # Criar crew específica para esta mensagem
-            crew_resposta = Crew(
-                agents=[
-                    self.terapeuta_principal.get_agent(),
-                    self.genetograma_expert.get_agent(),
-                    self.ciclo_vida_analyzer.get_agent(),
-                    self.padrao_analyzer.get_agent(),
-                    self.reflexao_facilitator.get_agent()
-                ],
-                tasks=[task_resposta],
-                process=Process.hierarchical,
-                manager_llm=Config.get_llm(),  # Usar manager_llm em vez de manager_agent
-                verbose=Config.DEBUG
-                # Removido memory=Config.ENABLE_MEMORY para evitar erros de embeddings
-            )
+            decisao = self._rotear(mensagem)
             
-            # Executar crew com inputs
-            resultado = crew_resposta.kickoff(inputs={"mensagem": mensagem, "historico": contexto_historico})
+            if decisao["pular_manager"]:
+                resultado = self._responder_direto(
+                    mensagem,
+                    contexto_historico=contexto_historico,
+                    contexto_sessao=self.session_state.get('contexto_familia', '')
+                )
+            elif self.modo_execucao == MODO_PARALELO:
+                resultado = self._executar_fanout(
+                    mensagem,
+                    contexto_historico=contexto_historico,
+                    contexto_sessao=self.session_state.get('contexto_familia', ''),
+                    especialistas=decisao["especialistas"]
+                )
+            else:
+                resultado = self._executar_hierarquica_com_prazo(
+                    lambda: self._processar_mensagem_hierarquica(
+                        mensagem, contexto_historico, decisao["especialistas"]
+                    ),
+                    mensagem,
+                    contexto_historico=contexto_historico,
+                    contexto_sessao=self.session_state.get('contexto_familia', '')
+                )
             
             # Atualizar histórico
-            self.session_state["historico"].append({
+            self._registrar_turno({
                 "tipo": "mensagem",
                 "contexto": mensagem,
-                "resposta_crew": str(resultado)
+                "resposta_crew": str(resultado),
+                "partes_descartadas": dict(self._descartados_turno)
             })
             
             logger.info("✅ Mensagem processada pela crew")
@@ -208,7 +393,8 @@ class TerapiaCrewOrchestrator:
                 "agente": "🤝 Equipe Terapêutica",
                 "resposta": str(resultado),
                 "tipo": "resposta",
-                "emoji": "💭"
+                "emoji": "💭",
+                "partes_descartadas": dict(self._descartados_turno)
             }
             
         except Exception as e:
@@ -218,20 +404,105 @@ class TerapiaCrewOrchestrator:
                 "error": f"Erro ao processar mensagem: {str(e)}"
             }
     
+    def _processar_mensagem_hierarquica(self, mensagem: str, contexto_historico: str,
+                                        especialistas: List[str] = None) -> str:
+        """Resposta a uma mensagem pela crew hierárquica completa"""
+        return executar_crew_hierarquica(
+            nome="mensagem",
+            agentes=self._agentes_crew(especialistas),
+            descricao=TAREFA_MENSAGEM,
+            expected_output="Resposta terapêutica contextual e apropriada",
+            inputs={
+                "contexto_familia": self.session_state.get('contexto_familia', ''),
+                "historico": contexto_historico,
+                "mensagem": mensagem,
+                "referencias": referencias_turno() or "(nenhuma)"
+            },
+            manager_llm=Config.get_manager_llm(),  # Instância dedicada: alvo do streaming
+            verbose=Config.DEBUG
+        )
+    
+    def _executar_fanout(self, mensagem: str, contexto_historico: str = "",
+                         contexto_sessao: str = "", especialistas: List[str] = None) -> str:
+        """Executa os especialistas em paralelo e sintetiza com o terapeuta principal
+        
+        Cada especialista é uma chamada independente ao LLM, então a latência do turno
+        fica próxima de max(especialista) + síntese, em vez da soma das delegações.
+        """
+        selecionados = ESPECIALISTAS if especialistas is None else especialistas
+        
+        resultados, falhas = executar_em_paralelo({
+            nome: (lambda nome=nome: self.agentes[nome].contribuir(mensagem, contexto_historico))
+            for nome in selecionados
+        }, prazo=self._prazo_especialistas())
+        
+        contribuicoes = {
+            nome: resultado["contribuicao"]
+            for nome, resultado in resultados.items()
+            if contribuicao_relevante(resultado.get("contribuicao"))
+        }
+        
+        if falhas:
+            logger.warning(f"⚠️ Especialistas sem resposta neste turno: {falhas}")
+            self._descartados_turno.update(falhas)
+        
+        sintese = self.agentes["terapeuta"].sintetizar_contribuicoes(
+            mensagem,
+            contribuicoes,
+            contexto_historico=contexto_historico,
+            contexto_sessao=contexto_sessao
+        )
+        
+        return sintese["resposta"]
+    
+    def iniciar_sessao_stream(self, contexto_inicial: str) -> RespostaStream:
+        """Versão em streaming de iniciar_sessao - itera a resposta final conforme chega"""
+        return RespostaStream(
+            lambda: self.iniciar_sessao(contexto_inicial),
+            ColetorTokens(llm_alvo=self._llm_alvo_streaming())
+        )
+    
+    def processar_mensagem_stream(self, mensagem: str) -> RespostaStream:
+        """Versão em streaming de processar_mensagem - itera a resposta final conforme chega
+        
+        Após consumir o iterável, o dict completo fica disponível em .resultado
+        """
+        return RespostaStream(
+            lambda: self.processar_mensagem(mensagem),
+            ColetorTokens(llm_alvo=self._llm_alvo_streaming())
+        )
+    
+    def _llm_alvo_streaming(self):
+        """LLM cuja resposta final é transmitida: o manager ou, no modo paralelo, a síntese
+        
+        No modo paralelo os especialistas rodam sem coletor (ver core.fanout), então a
+        primeira resposta final no contexto do turno é a do terapeuta principal.
+        """
+        if self.modo_execucao == MODO_PARALELO:
+            return None
+        return Config.get_manager_llm()
+    
+    def obter_historico(self) -> List[Dict]:
+        """Retorna o histórico completo da sessão (session_state guarda só o recente)"""
+        return self.store.historico(self.session_id)
+    
+    def obter_turnos_anteriores(self, antes_de: int, limite: int = None) -> List[Dict]:
+        """Até `limite` turnos imediatamente anteriores à posição `antes_de`, lidos do store"""
+        limite = limite or Config.HISTORY_PAGE_SIZE
+        return self.store.pagina_historico(self.session_id, max(antes_de - limite, 0), antes_de)
+    
     def limpar_sessao(self):
         """Limpa o estado da sessão"""
-        self.session_state = {
-            "historico": [],
-            "contexto_familia": "",
-            "insights_coletivos": [],
-            "sessao_ativa": False
-        }
+        self.store.remover(self.session_id)
+        self.session_state = self._estado_inicial()
         logger.info("🗑️ Sessão limpa")
     
     def get_status(self) -> Dict[str, Any]:
         """Retorna status da sessão"""
         return {
             "sessao_ativa": self.session_state["sessao_ativa"],
-            "num_interacoes": len(self.session_state["historico"]),
-            "contexto_definido": bool(self.session_state["contexto_familia"])
+            "num_interacoes": self.session_state["num_interacoes"],
+            "contexto_definido": bool(self.session_state["contexto_familia"]),
+            "agentes_instanciados": self.agentes.instanciados(),
+            "execucao_llm": estatisticas_execucao()
         }
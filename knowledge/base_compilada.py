@@ -0,0 +1,267 @@
+"""
+Snapshot compilado e somente leitura da base de conhecimento
+Os dicts de knowledge/fontes são compilados num arquivo binário versionado; cada processo
+abre o arquivo com mmap (as páginas ficam no cache do sistema e são compartilhadas entre
+workers) na primeira consulta a uma seção, e decodifica só as entradas consultadas.
+
+Formato (VERSAO_FORMATO 1):
+    cabeçalho   MAGIC, versão do formato (uint16) e tamanho do índice (uint32)
+    índice      JSON: versão do conteúdo e, por seção, [chave, deslocamento, tamanho]
+    conteúdo    um JSON por entrada de primeiro nível de cada seção
+
+Compilação (no build da imagem; em execução, um snapshot ausente ou desatualizado é
+recompilado na primeira abertura):
+    python -m knowledge.base_compilada [--saida caminho]
+"""
+
+import os
+import json
+import mmap
+import struct
+import hashlib
+import argparse
+import importlib
+import threading
+import logging
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TFKB"
+VERSAO_FORMATO = 1
+_CABECALHO = struct.Struct("<4sHI")
+
+DIR_FONTES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fontes")
+
+# Seção -> módulo de knowledge.fontes que a define
+SECOES = {
+    "CONCEITOS_FUNDAMENTAIS": "knowledge.fontes.carter_mcgoldrick",
+    "TRIANGULACOES_FAMILIARES": "knowledge.fontes.carter_mcgoldrick",
+    "INTERVENCOES_TERAPEUTICAS": "knowledge.fontes.carter_mcgoldrick",
+    "INTERVENCOES_POR_ESTAGIO": "knowledge.fontes.carter_mcgoldrick",
+    "ESTRATEGIAS_DETRIANGULACAO": "knowledge.fontes.carter_mcgoldrick",
+    "GENETOGRAMA_GUIDE": "knowledge.fontes.genetograma_guide",
+    "TRIANGULACOES_COMUNS": "knowledge.fontes.genetograma_guide",
+    "QUEBRA_GELOS": "knowledge.fontes.quebra_gelos"
+}
+
+def caminho_snapshot() -> str:
+    from config import Config
+    return Config.KNOWLEDGE_SNAPSHOT_PATH
+
+def versao_fontes() -> Optional[str]:
+    """Hash dos arquivos-fonte (sem importá-los); None se as fontes não acompanham o deploy"""
+    arquivos = sorted({modulo.rsplit(".", 1)[-1] + ".py" for modulo in SECOES.values()})
+    h = hashlib.sha256(f"formato={VERSAO_FORMATO}".encode("utf-8"))
+    for arquivo in arquivos:
+        try:
+            with open(os.path.join(DIR_FONTES, arquivo), "rb") as f:
+                conteudo = f.read()
+        except FileNotFoundError:
+            return None
+        h.update(arquivo.encode("utf-8"))
+        h.update(conteudo)
+    return h.hexdigest()[:16]
+
+def compilar() -> bytes:
+    """Snapshot com todas as seções de SECOES (importa as fontes)"""
+    indice_secoes: Dict[str, List[list]] = {}
+    conteudo = bytearray()
+    for nome, modulo in SECOES.items():
+        dados = getattr(importlib.import_module(modulo), nome)
+        entradas = []
+        for chave, valor in dados.items():
+            blob = json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            entradas.append([chave, len(conteudo), len(blob)])
+            conteudo += blob
+        indice_secoes[nome] = entradas
+
+    indice = json.dumps(
+        {"versao_conteudo": versao_fontes(), "secoes": indice_secoes},
+        ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    return _CABECALHO.pack(MAGIC, VERSAO_FORMATO, len(indice)) + indice + bytes(conteudo)
+
+def gravar(dados: bytes, caminho: str):
+    """Grava o snapshot de forma atômica (workers abrindo ao mesmo tempo veem o antigo ou o novo)"""
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(dados)
+    os.replace(temporario, caminho)
+
+
+class SecaoCompilada(Mapping):
+    """Seção da base de conhecimento, somente leitura, decodificada entrada por entrada
+
+    Comporta-se como o dict da fonte (get, items, in, índice); cada acesso decodifica a
+    entrada do mmap num objeto novo, então quem altera o valor recebido não afeta os outros.
+    """
+
+    def __init__(self, nome: str, buffer: Union[mmap.mmap, bytes], inicio: int, entradas: List[list]):
+        self.nome = nome
+        self._buffer = buffer
+        self._posicoes: Dict[str, Tuple[int, int]] = {
+            chave: (inicio + deslocamento, tamanho) for chave, deslocamento, tamanho in entradas
+        }
+        self._consultadas: Set[str] = set()
+
+    def __getitem__(self, chave: str) -> Any:
+        inicio, tamanho = self._posicoes[chave]
+        self._consultadas.add(chave)
+        return json.loads(self._buffer[inicio:inicio + tamanho])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._posicoes)
+
+    def __len__(self) -> int:
+        return len(self._posicoes)
+
+    @property
+    def decodificadas(self) -> int:
+        return len(self._consultadas)
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+
+class SecaoSobDemanda(Mapping):
+    """Seção que só abre o snapshot (get_base_conhecimento) no primeiro acesso
+
+    Usada nas constantes de módulo de knowledge: importar o módulo não compila nem lê o snapshot.
+    """
+
+    def __init__(self, nome: str):
+        self.nome = nome
+
+    @property
+    def secao(self) -> SecaoCompilada:
+        return get_base_conhecimento().secao(self.nome)
+
+    def __getitem__(self, chave: str) -> Any:
+        return self.secao[chave]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.secao)
+
+    def __len__(self) -> int:
+        return len(self.secao)
+
+    def __repr__(self) -> str:
+        return repr(self.secao)
+
+
+class BaseConhecimento:
+    """Snapshot aberto: índice lido na abertura, seções decodificadas sob demanda"""
+
+    def __init__(self, buffer: Union[mmap.mmap, bytes], origem: str):
+        if len(buffer) < _CABECALHO.size:
+            raise ValueError("snapshot truncado")
+        magic, versao_formato, tamanho_indice = _CABECALHO.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("arquivo não é um snapshot da base de conhecimento")
+        if versao_formato != VERSAO_FORMATO:
+            raise ValueError(f"formato {versao_formato} (esperado {VERSAO_FORMATO})")
+
+        inicio_indice = _CABECALHO.size
+        indice = json.loads(buffer[inicio_indice:inicio_indice + tamanho_indice])
+        inicio_conteudo = inicio_indice + tamanho_indice
+
+        self.origem = origem
+        self.tamanho = len(buffer)
+        self.versao_conteudo: Optional[str] = indice["versao_conteudo"]
+        self._buffer = buffer
+        self._secoes = {
+            nome: SecaoCompilada(nome, buffer, inicio_conteudo, entradas)
+            for nome, entradas in indice["secoes"].items()
+        }
+
+    @classmethod
+    def abrir(cls, caminho: str) -> "BaseConhecimento":
+        """Mapeia o arquivo em memória, somente leitura"""
+        with open(caminho, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(buffer, origem=caminho)
+        except Exception:
+            buffer.close()
+            raise
+
+    def secao(self, nome: str) -> SecaoCompilada:
+        return self._secoes[nome]
+
+    def fechar(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def estatisticas(self) -> dict:
+        return {
+            "origem": self.origem,
+            "versao_conteudo": self.versao_conteudo,
+            "bytes": self.tamanho,
+            "secoes": {
+                nome: {"entradas": len(secao), "decodificadas": secao.decodificadas}
+                for nome, secao in self._secoes.items()
+            }
+        }
+
+
+def carregar_base(caminho: str) -> BaseConhecimento:
+    """Abre o snapshot; se faltar ou estiver desatualizado em relação às fontes, recompila"""
+    versao = versao_fontes()
+    try:
+        base = BaseConhecimento.abrir(caminho)
+        if versao is None or base.versao_conteudo == versao:
+            return base
+        logger.info(f"♻️ Snapshot da base de conhecimento desatualizado ({base.versao_conteudo} != {versao})")
+        base.fechar()
+    except FileNotFoundError:
+        logger.info(f"📦 Snapshot da base de conhecimento não encontrado em {caminho}, compilando")
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Snapshot da base de conhecimento inválido ({e}), recompilando")
+
+    dados = compilar()
+    try:
+        gravar(dados, caminho)
+        return BaseConhecimento.abrir(caminho)
+    except OSError as e:
+        # Sistema de arquivos somente leitura: o processo usa o snapshot em memória
+        logger.warning(f"⚠️ Não foi possível gravar o snapshot em {caminho} ({e}), usando cópia em memória")
+        return BaseConhecimento(dados, origem="memoria")
+
+
+_base: Optional[BaseConhecimento] = None
+_base_lock = threading.Lock()
+
+def get_base_conhecimento() -> BaseConhecimento:
+    """Retorna o snapshot da base de conhecimento, aberto uma vez por processo"""
+    global _base
+
+    if _base is None:
+        with _base_lock:
+            if _base is None:
+                _base = carregar_base(caminho_snapshot())
+                logger.info(f"📚 Base de conhecimento {_base.versao_conteudo} ({_base.tamanho} bytes, {_base.origem})")
+    return _base
+
+def main():
+    parser = argparse.ArgumentParser(description="Compila o snapshot da base de conhecimento")
+    parser.add_argument("--saida", default=None, help="Caminho do snapshot (padrão: KNOWLEDGE_SNAPSHOT_PATH)")
+    args = parser.parse_args()
+
+    caminho = args.saida or caminho_snapshot()
+    dados = compilar()
+    gravar(dados, caminho)
+
+    base = BaseConhecimento.abrir(caminho)
+    print(f"📦 Snapshot {base.versao_conteudo} gravado em {caminho} ({base.tamanho} bytes)")
+    for nome, info in base.estatisticas()["secoes"].items():
+        print(f"   {nome}: {info['entradas']} entradas")
+    base.fechar()
+
+if __name__ == "__main__":
+    main()
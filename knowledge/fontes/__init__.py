@@ -0,0 +1 @@
+# Fontes da base de conhecimento (compiladas em knowledge.base_compilada)
@@ -0,0 +1,289 @@
+"""
+Índice vetorial local para ranquear quebra-gelos e sinais de triangulação
+As perguntas e follow-ups de QUEBRA_GELOS e os sinais de TRIANGULACOES_COMUNS e
+TRIANGULACOES_FAMILIARES viram vetores TF-IDF com hashing (radicais, pares de radicais e
+n-gramas de caracteres em DIMENSAO posições, sem vocabulário para guardar). Os vetores, já
+normalizados, ficam em .npy ao lado do snapshot; cada mensagem é vetorizada uma vez e
+pontuada contra todos os documentos num único produto matriz-vetor (similaridade de cosseno)
+
+Arquivos (em VECTOR_INDEX_DIR):
+    vetores.npy       float32 [DIMENSAO x documentos], colunas com norma 1
+    idf.npy           float32 [DIMENSAO]
+    documentos.json   versão e, por documento, [coleção, chave, campo, texto]
+
+Compilação (no build da imagem; em execução, um índice ausente ou de outra versão da
+base é recompilado na primeira abertura):
+    python -m knowledge.indice_vetorial [--saida diretorio]
+"""
+
+import io
+import os
+import re
+import json
+import zlib
+import argparse
+import threading
+import logging
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from core.caracteristicas import MessageFeatures, extrair_caracteristicas
+from core.palavras_chave import normalizar_texto
+from core.recuperacao import termos
+from knowledge.base_compilada import get_base_conhecimento, gravar
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Mude ao alterar a extração de termos ou a ponderação: índices gravados são recompilados
+VERSAO_INDICE = 1
+DIMENSAO = 2 ** 12
+TAMANHO_NGRAMA = 4
+
+COLECAO_QUEBRA_GELOS = "quebra_gelos"
+COLECAO_TRIANGULACOES = "triangulacoes"
+
+# Mensagens recentes com as pontuações calculadas (quebra-gelo e triangulações do mesmo
+# turno reaproveitam o mesmo produto)
+TEXTOS_EM_CACHE = 64
+
+_PADRAO_TOKEN = re.compile(r"\w+")
+
+ARQUIVO_VETORES = "vetores.npy"
+ARQUIVO_IDF = "idf.npy"
+ARQUIVO_DOCUMENTOS = "documentos.json"
+
+Documento = Tuple[str, str, str, str]  # (coleção, chave, campo, texto)
+
+def diretorio_indice() -> str:
+    from config import Config
+    return Config.VECTOR_INDEX_DIR
+
+def versao_indice() -> str:
+    """Versão da base de conhecimento + parâmetros do índice"""
+    return f"{get_base_conhecimento().versao_conteudo}-v{VERSAO_INDICE}-d{DIMENSAO}"
+
+def documentos_da_base() -> List[Documento]:
+    """Perguntas e follow-ups dos quebra-gelos e sinais de triangulação, um documento por frase"""
+    base = get_base_conhecimento()
+    documentos: List[Documento] = []
+
+    for tipo, quebra_gelo in base.secao("QUEBRA_GELOS").items():
+        documentos.append((COLECAO_QUEBRA_GELOS, tipo, "pergunta", quebra_gelo["pergunta"]))
+        documentos.extend(
+            (COLECAO_QUEBRA_GELOS, tipo, campo, quebra_gelo[campo])
+            for campo in ("foco", "objetivo") if quebra_gelo.get(campo)
+        )
+        documentos.extend(
+            (COLECAO_QUEBRA_GELOS, tipo, "followup", pergunta)
+            for pergunta in quebra_gelo.get("followup_questions", [])
+        )
+
+    triangulacoes = base.secao("TRIANGULACOES_FAMILIARES")
+    for tipo, info in list(triangulacoes["tipos_comuns"].items()) + list(base.secao("TRIANGULACOES_COMUNS").items()):
+        documentos.extend((COLECAO_TRIANGULACOES, tipo, "sinal", sinal) for sinal in info.get("sinais", []))
+    documentos.extend(
+        (COLECAO_TRIANGULACOES, "sinais_gerais", "sinal", sinal)
+        for sinal in triangulacoes.get("sinais_triangulacao", [])
+    )
+    return documentos
+
+def _atributos(tokens: List[str]) -> List[int]:
+    """Posições dos radicais, pares de radicais vizinhos e n-gramas de caracteres
+
+    Os n-gramas aproximam flexões que o radical por prefixo separa ("perdi"/"perdas",
+    "mudei"/"mudança"). crc32 em vez de hash(): posições estáveis entre processos.
+    """
+    radicais = termos(tokens)
+    atributos = radicais + [f"{a} {b}" for a, b in zip(radicais, radicais[1:])]
+    for radical in radicais:
+        palavra = f"#{radical}#"
+        atributos.extend(palavra[i:i + TAMANHO_NGRAMA] for i in range(len(palavra) - TAMANHO_NGRAMA + 1))
+    return [_posicao(atributo) for atributo in atributos]
+
+@lru_cache(maxsize=8192)
+def _posicao(atributo: str) -> int:
+    return zlib.crc32(atributo.encode("utf-8")) % DIMENSAO
+
+def _frequencias(tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Posições presentes e TF sublinear (1 + log tf) de cada uma"""
+    contagens = Counter(_atributos(tokens))
+    posicoes = np.fromiter(contagens.keys(), dtype=np.int64, count=len(contagens))
+    valores = np.fromiter(contagens.values(), dtype=np.float32, count=len(contagens))
+    return posicoes, 1.0 + np.log(valores)
+
+def _normalizar_linhas(matriz: np.ndarray) -> np.ndarray:
+    normas = np.linalg.norm(matriz, axis=-1, keepdims=True)
+    return matriz / np.where(normas == 0, 1.0, normas)
+
+def _tokens_documento(texto: str) -> List[str]:
+    # Mesma tokenização de MessageFeatures.tokens, sem passar pelo cache de mensagens
+    return _PADRAO_TOKEN.findall(normalizar_texto(texto))
+
+
+class IndiceVetorial:
+    """Vetores TF-IDF dos documentos e pontuação de mensagens por similaridade de cosseno"""
+
+    def __init__(self, documentos: List[Documento], vetores: np.ndarray, idf: np.ndarray,
+                 versao: str, origem: str):
+        self.documentos = documentos
+        self.vetores = vetores
+        self.idf = idf
+        self.versao = versao
+        self.origem = origem
+        # ndarray sobre o mesmo buffer: o produto com um np.memmap passa pelo __array_wrap__ da subclasse
+        self._matriz = np.asarray(vetores)
+        # Linhas de cada coleção, para ranquear só a fatia pedida
+        self._linhas: Dict[str, np.ndarray] = {}
+        for colecao in {documento[0] for documento in documentos}:
+            self._linhas[colecao] = np.array(
+                [i for i, documento in enumerate(documentos) if documento[0] == colecao], dtype=np.int64
+            )
+
+    @classmethod
+    def construir(cls, documentos: List[Documento], versao: str) -> "IndiceVetorial":
+        frequencias = np.zeros((len(documentos), DIMENSAO), dtype=np.float32)
+        for linha, (_, _, _, texto) in zip(frequencias, documentos):
+            posicoes, valores = _frequencias(_tokens_documento(texto))
+            linha[posicoes] = valores
+        total = len(documentos)
+        df = np.count_nonzero(frequencias, axis=0)
+        idf = (np.log((1 + total) / (1 + df)) + 1.0).astype(np.float32)
+        # Transposta: uma linha por posição, e a mensagem só lê as linhas das posições que tem
+        vetores = np.ascontiguousarray(_normalizar_linhas(frequencias * idf).T, dtype=np.float32)
+        return cls(documentos, vetores, idf, versao, origem="memoria")
+
+    @classmethod
+    def abrir(cls, diretorio: str) -> "IndiceVetorial":
+        """Lê os .npy mapeados em memória (somente leitura)"""
+        with open(os.path.join(diretorio, ARQUIVO_DOCUMENTOS), encoding="utf-8") as f:
+            metadados = json.load(f)
+        vetores = np.load(os.path.join(diretorio, ARQUIVO_VETORES), mmap_mode="r")
+        idf = np.load(os.path.join(diretorio, ARQUIVO_IDF))
+        documentos = [tuple(documento) for documento in metadados["documentos"]]
+        if vetores.shape != (DIMENSAO, len(documentos)) or idf.shape != (DIMENSAO,):
+            raise ValueError(f"dimensões {vetores.shape}/{idf.shape} não conferem com os documentos")
+        return cls(documentos, vetores, idf, metadados["versao"], origem=diretorio)
+
+    def gravar(self, diretorio: str):
+        """Grava os três arquivos de forma atômica; documentos.json por último (marca a versão)"""
+        for arquivo, matriz in ((ARQUIVO_VETORES, self.vetores), (ARQUIVO_IDF, self.idf)):
+            buffer = io.BytesIO()
+            np.save(buffer, np.ascontiguousarray(matriz))
+            gravar(buffer.getvalue(), os.path.join(diretorio, arquivo))
+        metadados = {"versao": self.versao, "documentos": [list(documento) for documento in self.documentos]}
+        gravar(json.dumps(metadados, ensure_ascii=False).encode("utf-8"), os.path.join(diretorio, ARQUIVO_DOCUMENTOS))
+
+    def vetorizar(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vetor TF-IDF normalizado da mensagem, esparso: (posições, pesos)"""
+        posicoes, valores = _frequencias(tokens)
+        return posicoes, _normalizar_linhas(valores * self.idf[posicoes])
+
+    def pontuar(self, tokens: List[str]) -> np.ndarray:
+        """Similaridade da mensagem com cada documento: um produto matriz-vetor
+
+        Restrito às posições presentes na mensagem (as demais contribuem com zero): algumas
+        dezenas de linhas da matriz em vez das DIMENSAO.
+        """
+        posicoes, pesos = self.vetorizar(tokens)
+        return pesos @ self._matriz[posicoes]
+
+    def ranquear(self, pontuacoes: np.ndarray, colecao: str, k: int = None,
+                 minimo: float = 0.0) -> List[Dict[str, Any]]:
+        """Chaves da coleção por pontuação (melhor documento de cada chave), com o trecho mais próximo"""
+        melhores: Dict[str, Tuple[float, int]] = {}
+        linhas = self._linhas.get(colecao, np.array([], dtype=np.int64))
+        for i in linhas[np.argsort(-pontuacoes[linhas], kind="stable")]:
+            pontuacao = float(pontuacoes[i])
+            if pontuacao <= minimo:
+                break
+            melhores.setdefault(self.documentos[i][1], (pontuacao, int(i)))
+        ranking = [
+            {"chave": chave, "score": round(pontuacao, 4),
+             "campo": self.documentos[i][2], "trecho": self.documentos[i][3]}
+            for chave, (pontuacao, i) in melhores.items()
+        ]
+        return ranking[:k] if k else ranking
+
+    def estatisticas(self) -> dict:
+        return {
+            "origem": self.origem,
+            "versao": self.versao,
+            "documentos": len(self.documentos),
+            "dimensao": DIMENSAO,
+            "colecoes": {colecao: len(linhas) for colecao, linhas in self._linhas.items()}
+        }
+
+
+def carregar_indice(diretorio: str) -> IndiceVetorial:
+    """Abre o índice gravado; se faltar ou for de outra versão da base, recompila"""
+    versao = versao_indice()
+    try:
+        indice = IndiceVetorial.abrir(diretorio)
+        if indice.versao == versao:
+            return indice
+        logger.info(f"♻️ Índice vetorial desatualizado ({indice.versao} != {versao})")
+    except FileNotFoundError:
+        logger.info(f"📦 Índice vetorial não encontrado em {diretorio}, compilando")
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"⚠️ Índice vetorial inválido ({e}), recompilando")
+
+    indice = IndiceVetorial.construir(documentos_da_base(), versao)
+    try:
+        indice.gravar(diretorio)
+        return IndiceVetorial.abrir(diretorio)
+    except OSError as e:
+        logger.warning(f"⚠️ Não foi possível gravar o índice vetorial em {diretorio} ({e}), usando cópia em memória")
+        return indice
+
+
+_indice: Optional[IndiceVetorial] = None
+_indice_lock = threading.Lock()
+
+def get_indice_vetorial() -> IndiceVetorial:
+    """Retorna o índice vetorial, aberto uma vez por processo"""
+    global _indice
+
+    if _indice is None:
+        with _indice_lock:
+            if _indice is None:
+                _indice = carregar_indice(diretorio_indice())
+                logger.info(f"🧭 Índice vetorial {_indice.versao} ({len(_indice.documentos)} documentos, {_indice.origem})")
+    return _indice
+
+@lru_cache(maxsize=TEXTOS_EM_CACHE)
+def _pontuar(texto: str) -> np.ndarray:
+    pontuacoes = get_indice_vetorial().pontuar(extrair_caracteristicas(texto).tokens)
+    pontuacoes.setflags(write=False)
+    return pontuacoes
+
+def ranquear(texto: Union[str, MessageFeatures], colecao: str, k: int = None,
+             minimo: float = None) -> List[Dict[str, Any]]:
+    """Chaves da coleção mais parecidas com o texto, com score (cosseno) e trecho mais próximo
+
+    A mensagem é pontuada uma vez contra todas as coleções; minimo padrão: SEMANTIC_MIN_SCORE.
+    """
+    if minimo is None:
+        from config import Config
+        minimo = Config.SEMANTIC_MIN_SCORE
+    texto = extrair_caracteristicas(texto).texto
+    return get_indice_vetorial().ranquear(_pontuar(texto), colecao, k=k, minimo=minimo)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compila o índice vetorial de quebra-gelos e triangulações")
+    parser.add_argument("--saida", default=None, help="Diretório do índice (padrão: VECTOR_INDEX_DIR)")
+    args = parser.parse_args()
+
+    diretorio = args.saida or diretorio_indice()
+    indice = IndiceVetorial.construir(documentos_da_base(), versao_indice())
+    indice.gravar(diretorio)
+
+    print(f"📦 Índice vetorial {indice.versao} gravado em {diretorio}")
+    for colecao, total in indice.estatisticas()["colecoes"].items():
+        print(f"   {colecao}: {total} documentos")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Vocabulários de palavras-chave dos detectores locais (sem LLM)
+Cada vocabulário mapeia categoria -> palavras; uma categoria é detectada quando qualquer
+uma das suas palavras aparece no texto. A comparação ignora maiúsculas e acentos
+("divórcio" também encontra "divorcio"), então não é preciso repetir variantes sem acento.
+Todos são compilados juntos em core.palavras_chave, então a ordem das categorias é a
+ordem de prioridade dos detectores
+"""
+
+# Agentes sugeridos pela interface sem crew (TerapiaOrchestrator.obter_sugestoes_agente)
+SUGESTOES_AGENTES = {
+    "terapeuta": ["família", "pais", "relacionamento"],
+    "genetograma": ["árvore", "mapa", "gerações"],
+    "ciclo_vida": ["idade", "fase", "estágio"],
+    "padroes": ["padrão", "repete", "sempre igual"],
+    "reflexao": ["refletir", "pensar", "sentir"]
+}
+
+# Especialistas acionados pelo roteador local da crew (core.roteador): as palavras das
+# sugestões acrescidas de sinais mais específicos de cada especialidade
+PALAVRAS_CHAVE_AGENTES = {
+    "terapeuta": ["família", "pais", "relacionamento"],
+    "genetograma": [
+        "árvore", "mapa", "gerações", "genetograma", "genealogia",
+        "avô", "avó", "avós", "bisavô", "bisavó", "antepassados"
+    ],
+    "ciclo_vida": [
+        "idade", "fase", "estágio", "casamento", "casei", "aposent", "divorci",
+        "adolescente", "saiu de casa", "ninho vazio", "nasceu", "bebê",
+        "gravidez", "grávida", "faculdade"
+    ],
+    "padroes": [
+        "padrão", "repete", "sempre igual", "igual ao meu pai",
+        "igual à minha mãe", "no meio", "herança"
+    ],
+    "reflexao": [
+        "refletir", "pensar", "pensando", "sentir", "sinto", "sente", "sentem",
+        "sentindo", "não sei", "confus", "perdid", "saudade", "luto", "perda",
+        "dói", "mágoa", "triste"
+    ]
+}
+
+# Triangulações ativas descritas no relato (identificar_triangulacoes_ativas)
+PADROES_TRIANGULACAO = {
+    "pai_mae_filho": ["conflito casal", "criança meio", "brigas pais"],
+    "sogra_casal": ["sogra interfere", "familia origem", "conflito sogra"],
+    "irmao_do_meio": ["irmão meio", "mediador família", "sempre no meio"],
+    "trabalho_familia": ["trabalho demais", "nunca em casa", "carreira vs família"],
+    "ex_parceiro": ["ex-marido", "ex-esposa", "pai biológico", "mãe biológica"],
+    "doenca_familia": ["doente família", "cuidador único", "toda responsabilidade"],
+    "filho_adulto_dependente": ["filho não sai", "depende pais", "não trabalha"],
+    "segredo_familiar": ["segredo", "ninguém fala", "todos sabem mas"],
+    "alcool_drogas": ["bebe demais", "problema bebida", "usa drogas"],
+    "dinheiro_poder": ["questões dinheiro", "controla financeiro", "quem decide"]
+}
+
+# Padrões que se repetem através das gerações (analisar_padroes_multigeracionais)
+PADROES_GERACIONAIS = {
+    "divorcio_repetitivo": ["pais divorciados", "avós divorciados", "separações família"],
+    "alcoolismo_familiar": ["pai bebia", "avô alcoólatra", "problema bebida família"],
+    "violencia_domestica": ["pai batia", "violência casa", "agressivo família"],
+    "doenca_mental": ["depressão família", "ansiedade gerações", "problema mental"],
+    "segredos_familia": ["nunca falavam", "segredos família", "ninguém conta"],
+    "abandono_emocional": ["pai ausente", "mãe fria", "não demonstravam afeto"],
+    "conflitos_dinheiro": ["problemas financeiros", "brigas por dinheiro", "questões herança"],
+    "papeis_rigidos": ["homem provedor", "mulher casa", "papéis definidos"],
+    "triangulacoes_cronicas": ["sempre no meio", "mediador conflitos", "nunca direto"],
+    "lealdades_cegas": ["família primeiro", "nunca questionar", "sempre obedecer"]
+}
+
+# Variações do ciclo de vida (identificar_variacoes_aplicaveis)
+VARIACOES_CICLO_VIDA = {
+    "divorcio_recasamento": ["divórcio", "separação", "ex-"],
+    "doenca_cronica": ["doença", "câncer", "diabetes", "depressão"],
+    "familias_monoparentais": ["mãe solteira", "pai solteiro", "monoparental"],
+    "familias_negras_pobres": ["pobre", "baixa renda", "assistência", "desemprego"],
+    "familias_profissionais": ["médico", "advogado", "professor", "engenheiro", "pós-graduação"]
+}
+
+# Sinais da situação familiar usados junto com a idade (determinar_estagio_por_idade_situacao)
+SINAIS_ESTAGIO = {
+    "casal": ["casado", "casamento", "casal", "esposo", "esposa"],
+    "filhos_ou_bebe": ["filho", "filha", "bebê", "criança"],
+    "filhos": ["filho", "filha", "criança"],
+    "filhos_adolescentes": ["adolescente", "teenager", "ensino médio"],
+    "saida_filhos": ["saindo", "faculdade", "independente", "ninho vazio"]
+}
+
+# Marcadores de reflexão profunda (ReflexaoFacilitator._avaliar_profundidade)
+MARCADORES_PROFUNDIDADE = {
+    "reflexao_profunda": ["sinto", "percebo", "descobri", "nunca"]
+}
+
+# Quebra-gelo pelo contexto da conversa (get_quebra_gelo_by_context): tipos encontrados
+# ganham BONUS_PALAVRA_CHAVE no ranking por similaridade (knowledge.quebra_gelos)
+CONTEXTO_QUEBRA_GELO = {
+    "transicoes_atuais": ["transição", "mudança"],
+    "padroes_familiares": ["padrão", "repetição"],
+    "papeis_familiares": ["papel", "responsabilidade"],
+    "perdas_transformacoes": ["perda", "luto"],
+    "genetograma_intro": ["genetograma", "mapa"]
+}
+
+# Quebra-gelo pela mensagem do usuário (TerapiaOrchestrator._identificar_tipo_quebra_gelo), mesmo bônus
+TIPO_QUEBRA_GELO_MENSAGEM = {
+    "transicoes_atuais": ["mudou", "diferente", "novo"],
+    "padroes_familiares": ["família", "pais", "herança"],
+    "papeis_familiares": ["papel", "responsabilidade", "sempre"],
+    "perdas_transformacoes": ["perda", "perdeu", "saudade"],
+    "genetograma_intro": ["mapa", "árvore", "genealogia"]
+}
+
+# Padrões citados na análise do PadraoAnalyzer (_extrair_padroes): a categoria é o próprio termo
+PADROES_ANALISE = {
+    termo: [termo] for termo in [
+        "triangulação", "coalição", "papéis rígidos", "lealdade invisível",
+        "padrão repetitivo", "herança emocional", "segredo familiar"
+    ]
+}
+
+# Temas das reflexões do ReflexaoFacilitator (_extrair_temas)
+TEMAS_REFLEXAO = {
+    tema: [tema] for tema in [
+        "relacionamentos", "família de origem", "papéis", "expectativas",
+        "padrões", "mudanças", "perdas", "crescimento", "conflitos"
+    ]
+}
+
+VOCABULARIOS = {
+    "agentes": PALAVRAS_CHAVE_AGENTES,
+    "sugestoes_agentes": SUGESTOES_AGENTES,
+    "triangulacoes": PADROES_TRIANGULACAO,
+    "padroes_geracionais": PADROES_GERACIONAIS,
+    "variacoes_ciclo_vida": VARIACOES_CICLO_VIDA,
+    "sinais_estagio": SINAIS_ESTAGIO,
+    "profundidade": MARCADORES_PROFUNDIDADE,
+    "contexto_quebra_gelo": CONTEXTO_QUEBRA_GELO,
+    "tipo_quebra_gelo": TIPO_QUEBRA_GELO_MENSAGEM,
+    "padroes_analise": PADROES_ANALISE,
+    "temas_reflexao": TEMAS_REFLEXAO
+}
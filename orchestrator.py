@@ -2,42 +2,109 @@
 Orquestrador principal do sistema de terapia MVP
 """
 
-from agents.terapeuta_principal import TerapeutaPrincipal
-from agents.genetograma_expert import GenetogramaExpert
-from agents.ciclo_vida_analyzer import CicloVidaAnalyzer
-from agents.padrao_analyzer import PadraoAnalyzer
-from agents.reflexao_facilitator import ReflexaoFacilitator
-from typing import Dict, Any, List
+from agents.registro import RegistroAgentes, get_registro_agentes
+from typing import Dict, Any, List, Union
+import uuid
 from config import Config
-
-# Validar configuração na inicialização
-Config.validate_config()
+from core.streaming import RespostaStream, ColetorTokens
+from core.agendador import definir_sessao_llm
+from core.prazo import iniciar_prazo
+from core.recuperacao import definir_consulta_turno
+from core.caracteristicas import MessageFeatures, extrair_caracteristicas
+from core.sessoes import SessionStore, get_session_store
+from core.resumo import ResumidorIncremental
+from core.historico import HistoricoConversa, texto_resposta
+from knowledge.quebra_gelos import tipo_quebra_gelo_por_texto
 
 class TerapiaOrchestrator:
-    def __init__(self):
-        # Inicializar agentes
-        self.terapeuta = TerapeutaPrincipal()
-        self.genetograma_expert = GenetogramaExpert()
-        self.ciclo_vida_analyzer = CicloVidaAnalyzer()
-        self.padrao_analyzer = PadraoAnalyzer()
-        self.reflexao_facilitator = ReflexaoFacilitator()
+    def __init__(self, agentes: RegistroAgentes = None, session_id: str = None,
+                 store: SessionStore = None):
+        # Validar configuração (na criação do orquestrador, não na importação do módulo)
+        Config.validate_config()
+        
+        # Agentes compartilhados pelo processo e instanciados no primeiro uso (a maioria das
+        # sessões só usa o terapeuta); o orquestrador guarda apenas o estado da conversa
+        self.agentes = get_registro_agentes() if agentes is None else agentes
+        
+        # Identifica a sessão no agendador de cota do LLM (fila justa entre sessões) e no
+        # armazenamento de sessões: com um session_id existente, a conversa é retomada
+        self.session_id = session_id or uuid.uuid4().hex
+        self.store = get_session_store() if store is None else store
+        # Enquanto este orquestrador existir (aba aberta), o store não expira a sessão
+        self.store.manter_viva(self.session_id, self)
         
         # Estado da sessão
-        self.session_state = {
-            "historico": [],
+        self.session_state = self._carregar_estado()
+        
+        # Resumo incremental dos turnos que saem da janela literal (atualizado em background)
+        self.resumidor = ResumidorIncremental(
+            resumir=self._resumir_historico,
+            a_cada_turnos=Config.SUMMARY_EVERY_TURNS,
+            turnos_literais=Config.SUMMARY_VERBATIM_TURNS,
+            carregar_turnos=lambda inicio, fim: self.store.pagina_historico(self.session_id, inicio, fim)
+        ) if Config.SUMMARY_ENABLED else None
+    
+    @staticmethod
+    def _estado_inicial() -> Dict[str, Any]:
+        return {
+            "historico": HistoricoConversa(Config.SESSION_HISTORY_LOAD_LIMIT),
             "contexto_familia": "",
             "estagio_identificado": None,
             "padroes_identificados": [],
-            "genetograma_ativo": False
+            "genetograma_ativo": False,
+            "insights": [],
+            "quebra_gelo_sugerido": None,
+            "proximos_passos": [],
+            "num_interacoes": 0,
+            "resumo": "",      # Resumo incremental dos turnos fora da janela literal
+            "resumo_ate": 0    # Quantos turnos o resumo já cobre
+        }
+    
+    def _carregar_estado(self) -> Dict[str, Any]:
+        """Estado salvo da sessão (se houver), com os turnos recentes no anel em memória"""
+        carregado = self.store.carregar(self.session_id) or {}
+        return {
+            **self._estado_inicial(),
+            **carregado,
+            "historico": HistoricoConversa(Config.SESSION_HISTORY_LOAD_LIMIT, carregado.get("historico"))
         }
     
+    def _registrar_turno(self, entrada: Dict[str, Any]):
+        """Acrescenta o turno ao histórico, persiste o estado e agenda o resumo se for a vez"""
+        self.session_state["historico"].append(entrada)
+        self.session_state["num_interacoes"] += 1
+        self.store.anexar_historico(self.session_id, entrada)
+        self.store.salvar_estado(self.session_id, self.session_state)
+        if self.resumidor is not None:
+            self.resumidor.atualizar(self.session_state, ao_concluir=self._persistir_estado)
+    
+    def _persistir_estado(self, estado: Dict[str, Any]):
+        """Grava atualizações em background, a menos que a sessão tenha sido limpa nesse meio tempo"""
+        if estado is self.session_state:
+            self.store.salvar_estado(self.session_id, estado)
+    
+    def _turnos_literais(self) -> List[Dict[str, Any]]:
+        """Turnos que vão literalmente no prompt: os que o resumo ainda não cobre (sem resumo, os últimos)"""
+        if self.resumidor is None:
+            return self.session_state["historico"][-Config.SUMMARY_VERBATIM_TURNS:]
+        return self.resumidor.recentes(self.session_state)
+    
+    def _resumir_historico(self, resumo_anterior: str, turnos: List[str]) -> str:
+        return self.agentes["terapeuta"].resumir_historico(
+            resumo_anterior, turnos, max_palavras=Config.SUMMARY_MAX_WORDS
+        )["resumo"]
+    
     def iniciar_sessao(self, contexto_inicial: str = None) -> Dict[str, Any]:
         """Inicia uma nova sessão terapêutica"""
         try:
-            resposta = self.terapeuta.iniciar_sessao(contexto_inicial)
+            definir_sessao_llm(self.session_id)
+            iniciar_prazo(Config.TURN_DEADLINE_SECONDS)
+            definir_consulta_turno(contexto_inicial)
+            
+            resposta = self.agentes["terapeuta"].iniciar_sessao(contexto_inicial)
             
             # Adicionar ao histórico
-            self.session_state["historico"].append({
+            self._registrar_turno({
                 "tipo": "inicio_sessao",
                 "agente": "terapeuta_principal",
                 "contexto": contexto_inicial,
@@ -49,7 +116,7 @@ class TerapiaOrchestrator:
                 "agente": "Terapeuta Principal",
                 "resposta": resposta["resposta"],
                 "quebra_gelo": resposta.get("quebra_gelo", {}),
-                "session_id": len(self.session_state["historico"])
+                "session_id": self.session_state["num_interacoes"]
             }
         except Exception as e:
             return {
@@ -61,50 +128,52 @@ class TerapiaOrchestrator:
     def processar_mensagem(self, mensagem: str, agente_preferido: str = "terapeuta") -> Dict[str, Any]:
         """Processa uma mensagem do usuário"""
         try:
-            agente_map = {
-                "terapeuta": self.terapeuta,
-                "genetograma": self.genetograma_expert,
-                "ciclo_vida": self.ciclo_vida_analyzer,
-                "padroes": self.padrao_analyzer,
-                "reflexao": self.reflexao_facilitator
-            }
+            definir_sessao_llm(self.session_id)
+            iniciar_prazo(Config.TURN_DEADLINE_SECONDS)
+            definir_consulta_turno(mensagem)
+            
+            agente_map = self.agentes
             
             if agente_preferido not in agente_map:
                 agente_preferido = "terapeuta"
             
             agente = agente_map[agente_preferido]
             
+            # Extraída uma vez no turno; os agentes reaproveitam pela mesma mensagem
+            caracteristicas = extrair_caracteristicas(mensagem)
+            
             # Processar mensagem baseado no agente
             if agente_preferido == "terapeuta":
                 resposta = agente.processar_mensagem(
                     mensagem, 
-                    self.session_state["historico"][-3:] if self.session_state["historico"] else []
+                    self._turnos_literais(),
+                    ao_concluir_insights=self._anexador_insights(self.session_state),
+                    resumo_sessao=self.session_state["resumo"]
                 )
             elif agente_preferido == "genetograma":
                 resposta = agente.iniciar_genetograma(mensagem)
             elif agente_preferido == "ciclo_vida":
-                # Extrair idade se possível (implementação simples)
-                idade = self._extrair_idade(mensagem)
+                idade = self._extrair_idade(caracteristicas)
                 resposta = agente.identificar_estagio_atual(idade, mensagem)
             elif agente_preferido == "padroes":
                 resposta = agente.analisar_conversa([{"conteudo": mensagem, "tipo": "user"}])
             else:  # reflexao
-                quebra_gelo_tipo = self._identificar_tipo_quebra_gelo(mensagem)
+                quebra_gelo_tipo = self._identificar_tipo_quebra_gelo(caracteristicas)
                 resposta = agente.aplicar_quebra_gelo(quebra_gelo_tipo, mensagem)
             
             # Adicionar ao histórico
-            self.session_state["historico"].append({
+            self._registrar_turno({
                 "tipo": "mensagem_usuario",
                 "conteudo": mensagem,
                 "agente_resposta": agente_preferido,
-                "resposta": resposta
+                "resposta": texto_resposta(resposta)  # O dict completo vai só no retorno
             })
             
             return {
                 "success": True,
                 "agente": agente_preferido.title(),
                 "resposta": resposta,
-                "session_id": len(self.session_state["historico"])
+                "session_id": self.session_state["num_interacoes"]
             }
             
         except Exception as e:
@@ -114,74 +183,64 @@ class TerapiaOrchestrator:
                 "agente": "Sistema"
             }
     
-    def _extrair_idade(self, texto: str) -> int:
-        """Extrai idade do texto (implementação simples)"""
-        import re
-        # Procura por padrões como "30 anos", "tenho 25", etc.
-        patterns = [
-            r'(\d+)\s*anos?',
-            r'tenho\s*(\d+)',
-            r'idade\s*(\d+)',
-            r'sou\s*(\d+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, texto.lower())
-            if match:
-                return int(match.group(1))
+    def _anexador_insights(self, estado: Dict[str, Any]):
+        """Callback que leva os insights em background ao estado da sessão em que o turno ocorreu"""
+        def anexar(resultado: Dict[str, Any]):
+            estado["insights"].extend(resultado.get("insights_detectados", []))
+            estado["proximos_passos"] = resultado.get("proximos_passos", [])
+            if resultado.get("quebra_gelo_sugerido"):
+                estado["quebra_gelo_sugerido"] = resultado["quebra_gelo_sugerido"]
+            # Só persiste se a sessão não foi limpa enquanto a análise rodava
+            self._persistir_estado(estado)
+        return anexar
+    
+    def iniciar_sessao_stream(self, contexto_inicial: str = None) -> RespostaStream:
+        """Versão em streaming de iniciar_sessao - itera a resposta conforme chega"""
+        return RespostaStream(
+            lambda: self.iniciar_sessao(contexto_inicial),
+            ColetorTokens(apenas_primeira_resposta=True)
+        )
+    
+    def processar_mensagem_stream(self, mensagem: str, agente_preferido: str = "terapeuta") -> RespostaStream:
+        """Versão em streaming de processar_mensagem
         
-        return 35  # Idade padrão se não encontrar
+        Transmite a primeira resposta final produzida no turno (a resposta ao usuário);
+        chamadas auxiliares posteriores, como a análise de insights, não são transmitidas.
+        Após consumir o iterável, o dict completo fica disponível em .resultado
+        """
+        return RespostaStream(
+            lambda: self.processar_mensagem(mensagem, agente_preferido),
+            ColetorTokens(apenas_primeira_resposta=True)
+        )
     
-    def _identificar_tipo_quebra_gelo(self, texto: str) -> str:
+    def _extrair_idade(self, texto: Union[str, MessageFeatures]) -> int:
+        """Idade citada na mensagem ("30 anos", "tenho 25", etc.), extraída em core.caracteristicas"""
+        idade = extrair_caracteristicas(texto).idade
+        return 35 if idade is None else idade  # Idade padrão se não encontrar
+    
+    def _identificar_tipo_quebra_gelo(self, texto: Union[str, MessageFeatures]) -> str:
         """Identifica tipo de quebra-gelo baseado no contexto"""
-        texto_lower = texto.lower()
-        
-        if any(palavra in texto_lower for palavra in ["mudou", "diferente", "novo"]):
-            return "transicoes_atuais"
-        elif any(palavra in texto_lower for palavra in ["família", "pais", "herança"]):
-            return "padroes_familiares"
-        elif any(palavra in texto_lower for palavra in ["papel", "responsabilidade", "sempre"]):
-            return "papeis_familiares"
-        elif any(palavra in texto_lower for palavra in ["perda", "perdeu", "saudade"]):
-            return "perdas_transformacoes"
-        elif any(palavra in texto_lower for palavra in ["mapa", "árvore", "genealogia"]):
-            return "genetograma_intro"
-        else:
-            return "transicoes_atuais"
+        # Similaridade com as perguntas de cada tipo + palavras de knowledge.vocabularios.TIPO_QUEBRA_GELO_MENSAGEM
+        return tipo_quebra_gelo_por_texto(texto, vocabulario="tipo_quebra_gelo")
     
     def obter_historico(self) -> List[Dict]:
-        """Retorna o histórico da sessão"""
-        return self.session_state["historico"]
+        """Retorna o histórico completo da sessão (session_state guarda só o recente)"""
+        return self.store.historico(self.session_id)
+    
+    def obter_turnos_anteriores(self, antes_de: int, limite: int = None) -> List[Dict]:
+        """Até `limite` turnos imediatamente anteriores à posição `antes_de`, lidos do store"""
+        limite = limite or Config.HISTORY_PAGE_SIZE
+        return self.store.pagina_historico(self.session_id, max(antes_de - limite, 0), antes_de)
     
     def limpar_sessao(self):
         """Limpa o estado da sessão"""
-        self.session_state = {
-            "historico": [],
-            "contexto_familia": "",
-            "estagio_identificado": None,
-            "padroes_identificados": [],
-            "genetograma_ativo": False
-        }
+        self.store.remover(self.session_id)
+        self.session_state = self._estado_inicial()
     
     def obter_sugestoes_agente(self, mensagem: str) -> List[str]:
         """Sugere agentes baseado na mensagem"""
-        texto_lower = mensagem.lower()
-        sugestoes = []
-        
-        if any(palavra in texto_lower for palavra in ["família", "pais", "relacionamento"]):
-            sugestoes.append("terapeuta")
-        
-        if any(palavra in texto_lower for palavra in ["árvore", "mapa", "gerações"]):
-            sugestoes.append("genetograma")
-        
-        if any(palavra in texto_lower for palavra in ["idade", "fase", "estágio"]):
-            sugestoes.append("ciclo_vida")
-        
-        if any(palavra in texto_lower for palavra in ["padrão", "repete", "sempre igual"]):
-            sugestoes.append("padroes")
-        
-        if any(palavra in texto_lower for palavra in ["refletir", "pensar", "sentir"]):
-            sugestoes.append("reflexao")
+        # Tabela própria: as palavras extras do roteador da crew não mudam as sugestões
+        sugestoes = extrair_caracteristicas(mensagem).categorias_de("sugestoes_agentes")
         
         # Se nenhuma sugestão específica, usar terapeuta principal
         if not sugestoes:
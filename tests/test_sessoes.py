@@ -0,0 +1,68 @@
+"""
+Expiração do MemoriaSessionStore com a aba (orquestrador) ainda aberta
+Roda offline com o LLM falso: python -m pytest tests
+"""
+
+import gc
+import os
+import time
+import weakref
+
+os.environ.setdefault("MODEL", "fake/eco")
+os.environ.setdefault("VERBOSE", "false")
+
+from core.sessoes import MemoriaSessionStore
+from orchestrator import TerapiaOrchestrator
+
+
+def _envelhecer(store: MemoriaSessionStore, segundos: float):
+    """Simula inatividade sem esperar o TTL"""
+    for session_id in store._atualizado_em:
+        store._atualizado_em[session_id] -= segundos
+    for entrada in os.scandir(store._log.diretorio):
+        os.utime(entrada.path, (time.time() - segundos,) * 2)
+
+
+def test_sessao_ociosa_com_aba_aberta_continua(tmp_path):
+    store = MemoriaSessionStore(limite_historico=2, diretorio_log=str(tmp_path), ttl_segundos=60)
+    orquestrador = TerapiaOrchestrator(store=store)
+    for mensagem in ("Oi", "Minha mãe e meu pai brigam", "Eu fico no meio"):
+        orquestrador.processar_mensagem(mensagem)
+
+    _envelhecer(store, 120)
+    store.expirar()
+
+    orquestrador.processar_mensagem("Voltei depois de um tempo")
+    historico = store.historico(orquestrador.session_id)
+    assert [turno["conteudo"] for turno in historico] == [
+        "Oi", "Minha mãe e meu pai brigam", "Eu fico no meio", "Voltei depois de um tempo"
+    ]
+    # Paginação da interface ("carregar anteriores") alinhada com num_interacoes
+    assert orquestrador.session_state["num_interacoes"] == 4
+    assert orquestrador.obter_turnos_anteriores(2, limite=2) == historico[:2]
+    # Retomada por ?sessao= em outra aba
+    retomado = TerapiaOrchestrator(session_id=orquestrador.session_id, store=store)
+    assert retomado.session_state["num_interacoes"] == 4
+
+
+def test_sessao_expira_depois_que_a_aba_fecha(tmp_path):
+    store = MemoriaSessionStore(limite_historico=2, diretorio_log=str(tmp_path), ttl_segundos=60)
+    orquestrador = TerapiaOrchestrator(store=store)
+    orquestrador.processar_mensagem("Oi")
+    session_id = orquestrador.session_id
+
+    # Os insights em background seguram o orquestrador até concluir
+    aba = weakref.ref(orquestrador)
+    del orquestrador
+    limite = time.monotonic() + 10
+    gc.collect()
+    while aba() is not None and time.monotonic() < limite:
+        time.sleep(0.05)
+        gc.collect()
+    assert aba() is None
+    _envelhecer(store, 120)
+    store.expirar()
+
+    assert store.carregar(session_id) is None
+    assert store.historico(session_id) == []
+    assert os.listdir(tmp_path) == []